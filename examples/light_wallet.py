@@ -0,0 +1,30 @@
+# examples/light_wallet.py
+"""
+Wallet ringan: hanya mengunduh header dan transaksi milik alamat sendiri.
+
+    python -m examples.light_wallet            # alamat alice & bob dari file .pem
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.light import LightClient
+
+NODE_URL = 'http://localhost:8001'
+BASE_DIR = Path(__file__).resolve().parent
+
+
+def load_public_key(name: str) -> str:
+    return BASE_DIR.joinpath(f'{name}_public.pem').read_text().strip()
+
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or ['alice', 'bob']
+    addresses = {name: load_public_key(name) for name in names}
+    client = LightClient(NODE_URL, addresses.values())
+    new_headers = client.sync()
+    print(f"✅ {new_headers} header diverifikasi, {len(client.history)} transaksi relevan, "
+          f"{client.bytes_received} byte diterima")
+    for name, address in addresses.items():
+        print(f"   Saldo {name}: {client.balance(address):.2f} koin")
@@ -0,0 +1,184 @@
+# src/admission.py
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Optional
+from .config import (
+    CLIENT_RATE, CLIENT_BURST, PEER_RATE, PEER_BURST,
+    MAX_TX_BYTES, MAX_BLOCK_PAYLOAD_BYTES,
+    VERIFY_QUEUE_SIZE, VERIFY_PER_CLIENT,
+    PEER_BAN_THRESHOLD, PEER_BAN_SECONDS,
+)
+
+
+class AdmissionError(Exception):
+    """Request ditolak sebelum pekerjaan mahal (parsing / verifikasi ECDSA) dilakukan."""
+    def __init__(self, status_code: int, detail: str, retry_after: Optional[float] = None):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Token bucket klasik: `rate` token per detik, maksimum `capacity` token."""
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.last = time.monotonic()
+
+    def consume(self, n: float = 1.0, now: Optional[float] = None) -> bool:
+        now = time.monotonic() if now is None else now
+        self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+        if self.tokens >= n:
+            self.tokens -= n
+            return True
+        return False
+
+    def retry_after(self, n: float = 1.0) -> float:
+        return max(0.0, (n - self.tokens) / self.rate) if self.rate else 1.0
+
+
+class RateLimiter:
+    """Kumpulan token bucket per kunci (IP klien atau alamat peer), dibatasi LRU."""
+    def __init__(self, rate: float, burst: float, max_keys: int = 10000):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def allow(self, key: str) -> bool:
+        with self._lock:
+            bucket = self._bucket(key)
+            return bucket.consume()
+
+    def retry_after(self, key: str) -> float:
+        with self._lock:
+            return self._bucket(key).retry_after()
+
+    def _bucket(self, key: str) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(self.rate, self.burst)
+            self._buckets[key] = bucket
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket
+
+
+class VerificationQueue:
+    """
+    Antrian verifikasi berkapasitas tetap. Jika penuh, request langsung ditolak
+    (load shedding) alih-alih menunggu. Satu klien juga hanya boleh memegang
+    `per_client` slot sekaligus agar tidak memonopoli antrian.
+    """
+    def __init__(self, capacity: int = VERIFY_QUEUE_SIZE, per_client: int = VERIFY_PER_CLIENT):
+        self.capacity = capacity
+        self.per_client = per_client
+        self.in_flight = 0
+        self._per_key: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def try_acquire(self, key: str) -> bool:
+        with self._lock:
+            if self.in_flight >= self.capacity:
+                return False
+            if self._per_key.get(key, 0) >= self.per_client:
+                return False
+            self.in_flight += 1
+            self._per_key[key] = self._per_key.get(key, 0) + 1
+            return True
+
+    def release(self, key: str):
+        with self._lock:
+            self.in_flight -= 1
+            left = self._per_key.get(key, 1) - 1
+            if left <= 0:
+                self._per_key.pop(key, None)
+            else:
+                self._per_key[key] = left
+
+    @contextmanager
+    def slot(self, key: str):
+        if not self.try_acquire(key):
+            raise AdmissionError(429, "Verification queue saturated, retry later", retry_after=1.0)
+        try:
+            yield
+        finally:
+            self.release(key)
+
+
+class AdmissionController:
+    """Pemeriksaan murah sebelum verifikasi: rate limit, ukuran, duplikat, peer buruk."""
+
+    def __init__(self):
+        self.clients = RateLimiter(CLIENT_RATE, CLIENT_BURST)
+        self.peers = RateLimiter(PEER_RATE, PEER_BURST)
+        self.verify_queue = VerificationQueue()
+        self._strikes: Dict[str, int] = {}
+        self._banned_until: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    # -----------------------------------
+    # Rate limit & ban
+    # -----------------------------------
+    def check_client(self, key: str):
+        if not self.clients.allow(key):
+            self.rejected += 1
+            raise AdmissionError(429, "Rate limit exceeded", retry_after=self.clients.retry_after(key))
+
+    def check_peer(self, key: str):
+        if self.is_banned(key):
+            self.rejected += 1
+            raise AdmissionError(403, "Peer is temporarily banned")
+        if not self.peers.allow(key):
+            self.rejected += 1
+            raise AdmissionError(429, "Peer rate limit exceeded", retry_after=self.peers.retry_after(key))
+
+    def is_banned(self, key: str) -> bool:
+        with self._lock:
+            until = self._banned_until.get(key)
+            if until is None:
+                return False
+            if until <= time.time():
+                del self._banned_until[key]
+                return False
+            return True
+
+    def record_invalid(self, key: str):
+        """Catat payload invalid dari peer; blokir sementara setelah melewati ambang."""
+        with self._lock:
+            strikes = self._strikes.get(key, 0) + 1
+            if strikes >= PEER_BAN_THRESHOLD:
+                self._banned_until[key] = time.time() + PEER_BAN_SECONDS
+                strikes = 0
+            self._strikes[key] = strikes
+
+    # -----------------------------------
+    # Pre-check payload
+    # -----------------------------------
+    def check_size(self, size: Optional[int], kind: str = "tx"):
+        limit = MAX_BLOCK_PAYLOAD_BYTES if kind == "block" else MAX_TX_BYTES
+        if size is not None and size > limit:
+            self.rejected += 1
+            raise AdmissionError(413, f"Payload too large ({size} > {limit} bytes)")
+
+    def check_duplicate(self, tx_id: Optional[str], mempool):
+        if tx_id and mempool.contains(tx_id):
+            self.rejected += 1
+            raise AdmissionError(409, "Duplicate transaction")
+
+    def stats(self) -> dict:
+        return {
+            "verify_in_flight": self.verify_queue.in_flight,
+            "verify_capacity": self.verify_queue.capacity,
+            "banned_peers": [k for k in list(self._banned_until) if self.is_banned(k)],
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,327 @@
+# src/analytics.py
+"""
+Analitik chain berbasis kolom untuk endpoint /stats/*.
+
+Data chain disalin sekali ke array bertipe tetap (satu kolom per atribut),
+bukan list objek Transaction:
+
+- tabel transaksi: pengirim (kode integer), debit (amount + fee), fee, ukuran;
+- tabel kredit: penerima (kode integer), jumlah, penanda coinbase. Satu baris
+  per output, jadi transaksi multi-output ikut terhitung;
+- tabel block: height, timestamp, jumlah transaksi, byte, miner, reward, serta
+  offset baris pertamanya di tabel transaksi & kredit (untuk memotong saat reorg).
+
+`sync(chain)` hanya menambahkan block baru (atau memotong dari titik fork),
+dan query agregat dijalankan sebagai operasi vektor NumPy (bincount,
+argpartition, sort) jika numpy terpasang. Tanpa numpy kolom memakai
+`array.array` dan query memakai loop Python biasa dengan hasil yang sama.
+"""
+import heapq
+import threading
+from array import array
+from typing import Any, Dict, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # opsional; tanpa numpy query memakai loop Python
+    np = None
+
+_DTYPES = {"q": "int64", "d": "float64"}
+
+
+class Column:
+    """Kolom bertipe tetap yang tumbuh amortized (numpy array berkapasitas, atau array.array)."""
+
+    def __init__(self, typecode: str):
+        self.size = 0
+        self._data = np.empty(1024, dtype=_DTYPES[typecode]) if np is not None else array(typecode)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, i: int):
+        return self._data[i]
+
+    def extend(self, values: List):
+        if np is None:
+            self._data.extend(values)
+        else:
+            need = self.size + len(values)
+            if need > len(self._data):
+                grown = np.empty(max(need, 2 * len(self._data)), dtype=self._data.dtype)
+                grown[:self.size] = self._data[:self.size]
+                self._data = grown
+            self._data[self.size:need] = values
+        self.size += len(values)
+
+    def truncate(self, size: int):
+        if size < self.size:
+            if np is None:
+                del self._data[size:]
+            self.size = size
+
+    def values(self, start: int = 0, stop: Optional[int] = None):
+        """Isi kolom [start, stop): view numpy (tanpa salin) atau potongan array.array."""
+        stop = self.size if stop is None else stop
+        return self._data[start:stop]
+
+
+class ChainAnalytics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._codes: Dict[str, int] = {}
+        self._addresses: List[str] = []
+        self._hashes: List[str] = []
+        # Tabel transaksi
+        self.tx_sender = Column("q")
+        self.tx_debit = Column("d")
+        self.tx_fee = Column("d")
+        self.tx_size = Column("q")
+        # Tabel kredit (satu baris per penerima)
+        self.cr_recipient = Column("q")
+        self.cr_amount = Column("d")
+        self.cr_minted = Column("q")
+        # Tabel block
+        self.b_height = Column("q")
+        self.b_timestamp = Column("d")
+        self.b_txs = Column("q")
+        self.b_bytes = Column("q")
+        self.b_miner = Column("q")
+        self.b_reward = Column("d")
+        self.b_tx_start = Column("q")
+        self.b_cr_start = Column("q")
+        self.coinbase = self._code("coinbase")
+
+    @property
+    def backend(self) -> str:
+        return "numpy" if np is not None else "array"
+
+    def _code(self, address: str) -> int:
+        code = self._codes.get(address)
+        if code is None:
+            code = self._codes[address] = len(self._addresses)
+            self._addresses.append(address)
+        return code
+
+    # -----------------------------------
+    # Pembaruan inkremental
+    # -----------------------------------
+    def sync(self, chain) -> int:
+        """Samakan kolom dengan `chain`: potong dari titik fork lalu tambahkan block baru."""
+        with self._lock:
+            keep = min(len(self._hashes), len(chain))
+            while keep and self._hashes[keep - 1] != chain[keep - 1].hash:
+                keep -= 1
+            self._truncate(keep)
+            for block in chain[keep:]:
+                self._append(block)
+            return len(chain) - keep
+
+    def _truncate(self, blocks: int):
+        if blocks >= len(self._hashes):
+            return
+        tx_rows, cr_rows = int(self.b_tx_start[blocks]), int(self.b_cr_start[blocks])
+        for column in (self.tx_sender, self.tx_debit, self.tx_fee, self.tx_size):
+            column.truncate(tx_rows)
+        for column in (self.cr_recipient, self.cr_amount, self.cr_minted):
+            column.truncate(cr_rows)
+        for column in (self.b_height, self.b_timestamp, self.b_txs, self.b_bytes, self.b_miner,
+                       self.b_reward, self.b_tx_start, self.b_cr_start):
+            column.truncate(blocks)
+        del self._hashes[blocks:]
+
+    def _append(self, block):
+        senders, debits, fees, sizes = [], [], [], []
+        recipients, amounts, minted = [], [], []
+        miner, reward, coinbase_txs = -1, 0.0, 0
+        for tx in block.transactions:
+            is_coinbase = tx.sender == 'coinbase'
+            senders.append(self._code(tx.sender))
+            debits.append(tx.total_debit)
+            fees.append(tx.fee)
+            sizes.append(tx.size())
+            for address, amount in tx.credits():
+                recipients.append(self._code(address))
+                amounts.append(amount)
+                minted.append(int(is_coinbase))
+            if is_coinbase:
+                coinbase_txs += 1
+                if miner < 0:
+                    miner, reward = self._code(tx.recipient), tx.amount
+        self.b_tx_start.extend([len(self.tx_sender)])
+        self.b_cr_start.extend([len(self.cr_recipient)])
+        self.b_height.extend([block.index])
+        self.b_timestamp.extend([block.timestamp])
+        self.b_txs.extend([len(block.transactions) - coinbase_txs])
+        self.b_bytes.extend([sum(sizes)])
+        self.b_miner.extend([miner])
+        self.b_reward.extend([reward])
+        self.tx_sender.extend(senders)
+        self.tx_debit.extend(debits)
+        self.tx_fee.extend(fees)
+        self.tx_size.extend(sizes)
+        self.cr_recipient.extend(recipients)
+        self.cr_amount.extend(amounts)
+        self.cr_minted.extend(minted)
+        self._hashes.append(block.hash)
+
+    # -----------------------------------
+    # Query agregat
+    # -----------------------------------
+    def _balances(self):
+        """Saldo per kode alamat (kredit - debit); alamat coinbase bernilai 0."""
+        size = len(self._addresses)
+        if np is not None:
+            balances = np.bincount(self.cr_recipient.values(), weights=self.cr_amount.values(), minlength=size)
+            balances -= np.bincount(self.tx_sender.values(), weights=self.tx_debit.values(), minlength=size)
+        else:
+            credited, debited = [0.0] * size, [0.0] * size
+            for code, amount in zip(self.cr_recipient.values(), self.cr_amount.values()):
+                credited[code] += amount
+            for code, debit in zip(self.tx_sender.values(), self.tx_debit.values()):
+                debited[code] += debit
+            balances = [c - d for c, d in zip(credited, debited)]
+        balances[self.coinbase] = 0.0
+        return balances
+
+    def supply(self) -> Dict[str, Any]:
+        with self._lock:
+            if np is not None:
+                issued = float(self.cr_amount.values()[self.cr_minted.values() == 1].sum())
+                fees = float(self.tx_fee.values().sum())
+                transactions = int(np.count_nonzero(self.tx_sender.values() != self.coinbase))
+                holders = int(np.count_nonzero(self._balances() > 1e-9))
+            else:
+                issued = sum(a for a, m in zip(self.cr_amount.values(), self.cr_minted.values()) if m)
+                fees = sum(self.tx_fee.values())
+                transactions = sum(1 for c in self.tx_sender.values() if c != self.coinbase)
+                holders = sum(1 for b in self._balances() if b > 1e-9)
+            return {
+                "height": len(self._hashes),
+                "issued": issued,
+                "fees": fees,
+                # Fee dipotong dari pengirim lalu dibayarkan ulang lewat coinbase
+                "supply": issued - fees,
+                "transactions": transactions,
+                "holders": holders,
+                "backend": self.backend,
+            }
+
+    def top_holders(self, limit: int = 10) -> Dict[str, Any]:
+        with self._lock:
+            balances = self._balances()
+            total = float(sum(balances)) if np is None else float(balances.sum())
+            limit = min(limit, len(balances))
+            if np is not None and limit:
+                top = np.argpartition(-balances, limit - 1)[:limit]
+                top = top[np.argsort(-balances[top], kind="stable")].tolist()
+            else:
+                top = heapq.nlargest(limit, range(len(balances)), key=balances.__getitem__)
+            holders = [
+                {"address": self._addresses[code], "balance": float(balances[code]),
+                 "share": float(balances[code]) / total if total > 0 else 0.0}
+                for code in top if balances[code] > 1e-9
+            ]
+            return {"height": len(self._hashes), "supply": total, "holders": holders}
+
+    def _window(self, blocks: int) -> range:
+        # Genesis (posisi 0) tidak punya transaksi dan timestamp-nya tetap, jadi tidak dihitung
+        return range(max(1, len(self._hashes) - blocks), len(self._hashes))
+
+    def throughput(self, blocks: int = 100) -> Dict[str, Any]:
+        with self._lock:
+            window = self._window(blocks)
+            if not window:
+                return {"blocks": 0, "transactions": 0, "bytes": 0, "avg_txs_per_block": 0.0,
+                        "avg_block_time": None, "tps": None, "per_block": []}
+            start, stop = window.start, window.stop
+            ref = max(start - 1, 1)
+            stamps = self.b_timestamp.values(ref, stop)
+            txs, sizes = self.b_txs.values(start, stop), self.b_bytes.values(start, stop)
+            if np is not None:
+                intervals = np.diff(stamps)
+                transactions, total_bytes = int(txs.sum()), int(sizes.sum())
+                avg_block_time = float(intervals.mean()) if len(intervals) else None
+            else:
+                intervals = [b - a for a, b in zip(stamps, stamps[1:])]
+                transactions, total_bytes = sum(txs), sum(sizes)
+                avg_block_time = sum(intervals) / len(intervals) if intervals else None
+            avg_txs = transactions / len(window)
+            # Block pertama di jendela tidak punya interval jika sebelumnya genesis
+            offset = len(window) - len(intervals)
+            per_block = [
+                {"height": int(self.b_height[i]), "transactions": int(txs[i - start]), "bytes": int(sizes[i - start]),
+                 "interval": float(intervals[i - start - offset]) if i - start >= offset else None}
+                for i in window
+            ]
+            return {
+                "blocks": len(window),
+                "transactions": transactions,
+                "bytes": total_bytes,
+                "avg_txs_per_block": avg_txs,
+                "avg_block_time": avg_block_time,
+                "tps": avg_txs / avg_block_time if avg_block_time else None,
+                "per_block": per_block,
+            }
+
+    def tx_sizes(self, bins: int = 10) -> Dict[str, Any]:
+        """Distribusi ukuran transaksi non-coinbase: persentil (nearest-rank bawah) & histogram."""
+        with self._lock:
+            if np is not None:
+                ordered = np.sort(self.tx_size.values()[self.tx_sender.values() != self.coinbase])
+            else:
+                ordered = sorted(s for s, c in zip(self.tx_size.values(), self.tx_sender.values())
+                                 if c != self.coinbase)
+            count = len(ordered)
+            if not count:
+                return {"count": 0, "histogram": {"edges": [], "counts": []}}
+            lo, hi = int(ordered[0]), int(ordered[-1])
+            span = hi - lo or 1
+            if np is not None:
+                index = np.minimum((ordered - lo) * bins // span, bins - 1)
+                counts = np.bincount(index, minlength=bins).tolist()
+                mean = float(ordered.mean())
+            else:
+                counts = [0] * bins
+                for size in ordered:
+                    counts[min((size - lo) * bins // span, bins - 1)] += 1
+                mean = sum(ordered) / count
+            percentile = lambda q: int(ordered[int(q * (count - 1))])
+            return {
+                "count": count,
+                "mean": mean,
+                "min": lo,
+                "max": hi,
+                "p50": percentile(0.5),
+                "p90": percentile(0.9),
+                "p99": percentile(0.99),
+                "histogram": {"edges": [lo + span * i / bins for i in range(bins + 1)], "counts": counts},
+            }
+
+    def miners(self, blocks: int = 100) -> Dict[str, Any]:
+        """Bagian block & reward per miner pada `blocks` block terakhir."""
+        with self._lock:
+            window = self._window(blocks)
+            miners = self.b_miner.values(window.start, window.stop)
+            rewards = self.b_reward.values(window.start, window.stop)
+            if np is not None:
+                mined = miners >= 0
+                size = len(self._addresses)
+                counts = np.bincount(miners[mined], minlength=size)
+                earned = np.bincount(miners[mined], weights=rewards[mined], minlength=size)
+                tally = {int(c): (int(counts[c]), float(earned[c])) for c in np.flatnonzero(counts)}
+            else:
+                tally = {}
+                for code, reward in zip(miners, rewards):
+                    if code >= 0:
+                        found, total = tally.get(code, (0, 0.0))
+                        tally[code] = (found + 1, total + reward)
+            ranked = sorted(tally.items(), key=lambda item: (-item[1][0], self._addresses[item[0]]))
+            return {
+                "blocks": len(window),
+                "miners": [
+                    {"address": self._addresses[code], "blocks": found,
+                     "share": found / len(window), "rewards": total}
+                    for code, (found, total) in ranked
+                ],
+            }
@@ -1,29 +1,67 @@
 # src/app.py
 
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse
+import time
+# Awal pengukuran startup (sebelum import berat)
+_STARTED = time.perf_counter()
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse, Response
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 import os
-import requests
-from .wallet import generate_key_pair
+import asyncio
+import secrets
+import httpx
+from starlette.concurrency import run_in_threadpool
 from .node import Node
 from .tx import Transaction
-from .blockchain import Blockchain
-
-import uvicorn
-from dataclasses import asdict 
+from .blockchain import Blockchain, Block, search_nonce, parse_checkpoints, StaleWork
+from .admission import AdmissionController, AdmissionError
+from .config import (
+    PEER_DISCOVERY_INTERVAL, SYNC_CHUNK_SIZE, SYNC_MAX_RANGE, WRITER_TIMEOUT, PROFILE_SAMPLE_INTERVAL, STARTUP_BUDGET,
+    COMPRESS_MIN_SIZE, BALANCES_MAX_ADDRESSES, STATS_MAX_BLOCKS, STATS_MAX_TOP, STATS_MAX_BINS,
+    MINING_CHUNK_NONCES, STALE_WINDOW, IMPORT_ALLOWED_HOSTS, MAX_BLOCK_PAYLOAD_BYTES,
+)
+from .sync import SyncEngine
+from .template import BlockTemplateBuilder
+from .chain_io import iter_ndjson, iter_lines, StreamImporter, NDJSON_MEDIA_TYPE
+from .executors import VERIFY_EXECUTOR, MINING_EXECUTOR
+from .store import ChainStore, StorePublisher, StoreView
+from .bloom import BloomFilter
+from .light import FilterRegistry, light_sync
+from .profiling import PROFILER, SLOW_OPS, trace, span, recent_traces, profiled_call
+from .httpcache import ResponseCache
+from .analytics import ChainAnalytics
+
+from dataclasses import asdict
 
 # Fungsi utilitas untuk konversi Block (Dataclass) ke Dict yang siap JSON
 def block_to_dict(block):
-    d = asdict(block)
-    # Pastikan transaksi dikonversi dari Pydantic BaseModel ke Dict
-    # Ini benar karena Transaction adalah Pydantic BaseModel
-    d['transactions'] = [t.model_dump() for t in block.transactions] 
-    return d
+    # Transaksi (Pydantic BaseModel) dikonversi lewat model_dump di Block.to_dict
+    return block.to_dict()
 # -------------------------------
 # Konfigurasi environment
 # -------------------------------
 PORT = int(os.environ.get("PORT", "8000"))
 BOOTSTRAP = os.environ.get("BOOTSTRAP_PEERS", "")
+# Path journal mempool (kosong = mempool hanya di memori)
+MEMPOOL_JOURNAL = os.environ.get("MEMPOOL_JOURNAL", "")
+# File daftar peer yang dikenal (kosong = tidak disimpan)
+PEERS_FILE = os.environ.get("PEERS_FILE", "")
+# Peran proses: "single" (default), "writer", atau "reader" (lihat src/serve.py)
+NODE_ROLE = os.environ.get("NODE_ROLE", "single").lower()
+# File SQLite state bersama (wajib untuk reader, opsional untuk writer/single)
+CHAIN_STORE = os.environ.get("CHAIN_STORE", "")
+# URL writer tujuan request tulis dari reader
+WRITER_URL = os.environ.get("WRITER_URL", "").rstrip("/")
+# Endpoint /debug/* (profil, trace, ambang log lambat) hanya aktif jika PROFILING=true
+PROFILING = os.environ.get("PROFILING", "false").lower() == "true"
+# Checkpoint assume-valid "height:hash,..." (menggantikan CHECKPOINTS di config jika diisi)
+CHECKPOINTS_ENV = os.environ.get("CHECKPOINTS", "")
+# FULL_VERIFY=true memaksa verifikasi semua signature walaupun ada checkpoint
+FULL_VERIFY_ENV = os.environ.get("FULL_VERIFY", "")
+# Klien (dipisah koma) yang boleh mengimpor chain lewat POST /blocks/import; default hanya loopback
+IMPORT_HOSTS = {h.strip() for h in os.environ.get("IMPORT_HOSTS", IMPORT_ALLOWED_HOSTS).split(",") if h.strip()}
 bootstrap_peers = []
 
 if BOOTSTRAP:
@@ -36,15 +74,28 @@ if BOOTSTRAP:
             peer = f"http://{peer}"
         bootstrap_peers.append(peer)
 
-# Inisialisasi node
-NODE = Node(port=PORT, bootstrap_peers=bootstrap_peers)
-app = FastAPI(title=f"Blockchain Node {PORT}")
-from fastapi.middleware.cors import CORSMiddleware
-
-# Setelah inisialisasi FastAPI
+if NODE_ROLE == "reader" and not (CHAIN_STORE and WRITER_URL):
+    raise RuntimeError("NODE_ROLE=reader membutuhkan CHAIN_STORE dan WRITER_URL")
+
+# Inisialisasi node (reader tidak punya peer/journal sendiri; state dibaca dari store)
+if NODE_ROLE == "reader":
+    NODE = Node(port=PORT)
+else:
+    NODE = Node(port=PORT, bootstrap_peers=bootstrap_peers, mempool_journal=MEMPOOL_JOURNAL or None,
+                peers_file=PEERS_FILE or None)
+
+STORE = ChainStore(CHAIN_STORE) if CHAIN_STORE else None
+PUBLISHER = StorePublisher(STORE, NODE) if STORE and NODE_ROLE != "reader" else None
+VIEW = StoreView(STORE, NODE) if NODE_ROLE == "reader" else None
+if STORE:
+    # Saldo, pencarian transaksi & riwayat alamat lewat query berindex
+    NODE.blockchain.index = STORE
+if CHECKPOINTS_ENV:
+    NODE.blockchain.checkpoints = parse_checkpoints(CHECKPOINTS_ENV)
+if FULL_VERIFY_ENV:
+    NODE.blockchain.full_verify = FULL_VERIFY_ENV.lower() == "true"
 app = FastAPI(title=f"Blockchain Node {PORT}")
 
-# Tambahkan ini ↓↓↓
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # untuk demo, izinkan semua origin
@@ -52,106 +103,484 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Respons besar lain (/blocks/range, /light/*) dikompresi; respons dari ResponseCache sudah terkompresi
+app.add_middleware(GZipMiddleware, minimum_size=COMPRESS_MIN_SIZE)
+# Template block untuk mining (inkremental, berbasis fee rate)
+TEMPLATE = BlockTemplateBuilder(NODE.blockchain, NODE.mempool)
+
+# -------------------------------
+# Cache respons baca (ETag + 304 + body terkompresi per versi state)
+# -------------------------------
+RESPONSE_CACHE = ResponseCache()
+# Versi mempool proses ini hanya bermakna selama proses hidup
+BOOT_ID = secrets.token_hex(4)
+# Kolom analitik chain untuk /stats/* (diperbarui inkremental saat di-query)
+ANALYTICS = ChainAnalytics()
+
+def chain_version():
+    # Hash tip bersifat content-addressed: sama di semua proses/worker
+    return (NODE.blockchain.height, NODE.blockchain.last_block.hash)
+
+def mempool_version():
+    if VIEW:
+        return ("store", VIEW.mempool_version)
+    return (BOOT_ID, NODE.mempool.version)
+
+# Waktu startup (ms sejak import modul): import, siap menerima request, /blocks pertama
+STARTUP = {"import_ms": round((time.perf_counter() - _STARTED) * 1000, 1), "ready_ms": None, "first_blocks_ms": None}
+
+def startup_elapsed_ms() -> float:
+    return round((time.perf_counter() - _STARTED) * 1000, 1)
+
+# -------------------------------
+# Admission Control
+# -------------------------------
+ADMISSION = AdmissionController()
+CLIENT_PATHS = {"/transactions/new"}
+PEER_PATHS = {"/nodes/receive_tx": "tx", "/nodes/receive_block": "block"}
+# Impor chain menulis banyak block sekaligus: hanya untuk operator (IMPORT_HOSTS), tetap di-rate limit
+IMPORT_PATH = "/blocks/import"
+
+def client_key(request: Request) -> str:
+    # Writer di belakang reader: alamat asli klien dikirim lewat X-Forwarded-For
+    if NODE_ROLE == "writer" and request.headers.get("x-forwarded-for"):
+        return request.headers["x-forwarded-for"].split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+def admission_response(e: AdmissionError) -> JSONResponse:
+    headers = {"Retry-After": str(max(1, int(e.retry_after + 0.999)))} if e.retry_after is not None else None
+    return JSONResponse({"message": e.detail}, status_code=e.status_code, headers=headers)
+
+@app.exception_handler(AdmissionError)
+async def admission_error_handler(request: Request, e: AdmissionError):
+    return admission_response(e)
+
+@app.middleware("http")
+async def admission_middleware(request: Request, call_next):
+    """Rate limit & batas ukuran dicek dari header, sebelum body diparsing."""
+    path = request.url.path
+    if request.method == "POST" and (path in CLIENT_PATHS or path in PEER_PATHS):
+        key = client_key(request)
+        length = request.headers.get("content-length")
+        try:
+            if path in PEER_PATHS:
+                ADMISSION.check_peer(key)
+            else:
+                ADMISSION.check_client(key)
+            if length is None or not length.isdigit():
+                raise AdmissionError(411, "Content-Length required")
+            ADMISSION.check_size(int(length), PEER_PATHS.get(path, "tx"))
+        except AdmissionError as e:
+            return admission_response(e)
+    elif request.method == "POST" and path == IMPORT_PATH:
+        key = client_key(request)
+        try:
+            if key not in IMPORT_HOSTS:
+                raise AdmissionError(403, "Chain import is only allowed from IMPORT_HOSTS")
+            ADMISSION.check_client(key)
+        except AdmissionError as e:
+            return admission_response(e)
+    return await call_next(request)
+
+# -------------------------------
+# Multi-worker: reader melayani baca dari store, tulis diteruskan ke writer
+# -------------------------------
+_writer_client = None
+
+def is_shared_read(request: Request) -> bool:
+    path = request.url.path
+    if request.method == "POST" and path == "/balances":
+        # Query saldo batch hanya membaca state
+        return True
+    if request.method not in ("GET", "HEAD"):
+        return False
+    return path in ("/blocks", "/mempool") or path.startswith(
+        ("/blocks/", "/balance/", "/transactions/", "/address/", "/light/headers", "/stats/")
+    )
+
+async def forward_to_writer(request: Request) -> Response:
+    global _writer_client
+    if _writer_client is None:
+        _writer_client = httpx.AsyncClient(base_url=WRITER_URL, timeout=WRITER_TIMEOUT)
+    headers = {k: v for k, v in request.headers.items() if k.lower() not in ("host", "content-length")}
+    headers["x-forwarded-for"] = client_key(request)
+    try:
+        r = await _writer_client.request(
+            request.method, request.url.path, params=request.query_params,
+            content=await request.body(), headers=headers,
+        )
+    except httpx.HTTPError as e:
+        return JSONResponse({"message": "Writer unavailable", "error": str(e)}, status_code=503)
+    passthrough = {k: v for k, v in r.headers.items() if k.lower() in ("content-type", "retry-after")}
+    return Response(r.content, status_code=r.status_code, headers=passthrough)
+
+@app.middleware("http")
+async def role_middleware(request: Request, call_next):
+    if NODE_ROLE == "reader":
+        if not is_shared_read(request):
+            return await forward_to_writer(request)
+        await run_in_threadpool(VIEW.refresh)
+        return await call_next(request)
+    response = await call_next(request)
+    if PUBLISHER and request.method == "POST" and not is_shared_read(request):
+        # Perubahan chain/mempool dari request tulis dipublikasikan ke reader
+        await run_in_threadpool(PUBLISHER.publish)
+    return response
+
+# -------------------------------
+# Tracing jalur utama (span per tahap, log operasi lambat)
+# -------------------------------
+TRACED_PATHS = {
+    "/mine": "mine",
+    "/nodes/receive_block": "receive_block",
+    "/nodes/resolve": "resolve",
+    "/transactions/new": "transactions.new",
+}
+
+@app.middleware("http")
+async def trace_middleware(request: Request, call_next):
+    name = TRACED_PATHS.get(request.url.path)
+    if name is None or request.method != "POST":
+        return await call_next(request)
+    with trace(name, client=client_key(request)) as current:
+        response = await call_next(request)
+        current.attrs["status"] = response.status_code
+    response.headers["X-Trace-Id"] = current.id
+    return response
+
 # -------------------------------
 # Startup Event
 # -------------------------------
+# Task latar belakang milik writer; disimpan agar tidak di-GC dan bisa dibatalkan saat shutdown
+BACKGROUND_TASKS = []
+
+async def peer_maintenance_loop():
+    """Discovery & penyimpanan daftar peer secara berkala (di thread pool, bukan event loop)."""
+    while True:
+        await asyncio.sleep(PEER_DISCOVERY_INTERVAL)
+        try:
+            added = await run_in_threadpool(NODE.peer_manager.maintain)
+            if added:
+                print(f"[Node {PORT}] Discovery: {added} peer baru")
+        except Exception as e:
+            print(f"[Node {PORT}] Peer maintenance gagal: {e}")
+
+def mark_ready():
+    STARTUP["ready_ms"] = startup_elapsed_ms()
+    print(f"⏱️ [Node {PORT}] Siap dalam {STARTUP['ready_ms']:.0f} ms (import {STARTUP['import_ms']:.0f} ms)")
+    if STARTUP["ready_ms"] > STARTUP_BUDGET * 1000:
+        print(f"⚠️ [Node {PORT}] Startup melewati budget {STARTUP_BUDGET:.1f} s")
+
 @app.on_event("startup")
-def startup_event():
+async def startup_event():
+    if NODE_ROLE == "reader":
+        await run_in_threadpool(VIEW.refresh)
+        print(f"[Node {PORT}] Reader worker (pid {os.getpid()}), writer: {WRITER_URL}")
+        mark_ready()
+        return
+    if PUBLISHER:
+        height = await run_in_threadpool(PUBLISHER.load_or_init)
+        print(f"[Node {PORT}] Chain store {CHAIN_STORE}: {height} block")
+    # Chain sudah dimuat: baru sekarang transaksi hasil restore journal bisa dicek saldonya
+    if await run_in_threadpool(NODE.revalidate_mempool) and PUBLISHER:
+        await run_in_threadpool(PUBLISHER.publish)
     if bootstrap_peers:
         NODE.register_peers(bootstrap_peers)
     print(f"[Node {PORT}] Peers terdaftar: {NODE.peers}")
+    BACKGROUND_TASKS.append(asyncio.create_task(peer_maintenance_loop()))
+    mark_ready()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    if _writer_client is not None:
+        await _writer_client.aclose()
+    if NODE_ROLE == "reader":
+        return
+    for task in BACKGROUND_TASKS:
+        task.cancel()
+    await asyncio.gather(*BACKGROUND_TASKS, return_exceptions=True)
+    BACKGROUND_TASKS.clear()
+    NODE.peer_manager.save()
+    VERIFY_EXECUTOR.shutdown()
+    MINING_EXECUTOR.shutdown()
+    await NODE.peer_manager.aclose()
 
 # -------------------------------
 # Blockchain Endpoint
 # -------------------------------
 @app.get("/blocks")
-def get_chain():
+def get_chain(request: Request):
+    if STARTUP["first_blocks_ms"] is None:
+        STARTUP["first_blocks_ms"] = startup_elapsed_ms()
+    chain = NODE.blockchain.chain
     # KOREKSI KRITIS: Menggunakan fungsi block_to_dict untuk menserialisasi Block
-    return {
-        "chain": [block_to_dict(b) for b in NODE.blockchain.chain], 
-        "length": len(NODE.blockchain.chain)
-    }
+    return RESPONSE_CACHE.respond(request, ("blocks",), chain_version(), lambda: {
+        "chain": [block_to_dict(b) for b in chain],
+        "length": len(chain)
+    })
+
+@app.get("/blocks/stream")
+def stream_chain(start: int = 1):
+    """Chain dalam format NDJSON dengan chunked transfer (satu block per baris)."""
+    # Snapshot daftar referensi block; serialisasi dilakukan per block saat dikirim
+    blocks = NODE.blockchain.chain[max(start, 1) - 1:]
+    return StreamingResponse(iter_ndjson(blocks), media_type=NDJSON_MEDIA_TYPE)
+
+@app.post("/blocks/import")
+async def import_chain(request: Request):
+    """Impor NDJSON secara streaming: setiap block divalidasi dan ditambahkan saat tiba."""
+    importer = StreamImporter(NODE.blockchain)
+
+    def feed(lines):
+        # Validasi block berat: dijalankan di thread pool, chain dikunci per batch
+        with NODE.lock:
+            for line in lines:
+                if line.strip():
+                    block = importer.feed(line)
+                    NODE.mempool.remove_transactions([t.id for t in block.transactions if t.sender != 'coinbase'])
+
+    def finish():
+        # Block di bawah checkpoint yang belum terkonfirmasi diverifikasi penuh
+        with NODE.lock:
+            importer.finish()
+
+    buffer = b""
+    try:
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            if max(map(len, lines), default=0) > MAX_BLOCK_PAYLOAD_BYTES or len(buffer) > MAX_BLOCK_PAYLOAD_BYTES:
+                # Body streaming tidak dibatasi Content-Length, tetapi satu block (satu baris) tetap dibatasi
+                raise ValueError(f"Block line exceeds {MAX_BLOCK_PAYLOAD_BYTES} bytes")
+            if lines:
+                await run_in_threadpool(feed, lines)
+        if buffer.strip():
+            await run_in_threadpool(feed, [buffer])
+        await run_in_threadpool(finish)
+    except Exception as e:
+        return JSONResponse({"message": "Import stopped", "error": str(e),
+                             "added": importer.added, "skipped": importer.skipped}, status_code=400)
+    return {"message": "Import finished", "added": importer.added, "skipped": importer.skipped,
+            "length": NODE.blockchain.height}
+
+@app.get("/blocks/tip")
+def get_tip():
+    last = NODE.blockchain.last_block
+    return {"height": NODE.blockchain.height, "hash": last.hash}
+
+@app.get("/blocks/range")
+def get_block_range(start: int = 1, count: int = SYNC_CHUNK_SIZE):
+    """Potongan chain untuk sync paralel (index block dimulai dari 1)."""
+    count = max(0, min(count, SYNC_MAX_RANGE))
+    blocks = NODE.blockchain.get_blocks(start, count)
+    return {"blocks": [block_to_dict(b) for b in blocks], "height": NODE.blockchain.height}
 
 # -------------------------------
 # Transaksi
 # -------------------------------
+def add_to_mempool(tx: Transaction) -> bool:
+    """
+    Masukkan transaksi yang signature-nya sudah diverifikasi ke mempool & template.
+    Saldo (termasuk kredit pending dari parent) selalu dicek terhadap chain node.
+    """
+    with NODE.lock:
+        added = NODE.mempool.add_transaction(tx, blockchain=NODE.blockchain, verified=True)
+        if added:
+            TEMPLATE.on_new_transaction(tx)
+        return added
+
 @app.post("/transactions/new")
-def new_transaction(tx_data: dict):
+async def new_transaction(tx_data: dict, request: Request):
     """
     Tambahkan transaksi baru ke mempool.
     Jika mode DUMMY diaktifkan, maka skip validasi signature (untuk UI testing).
+    Rate limit, ukuran dan duplikat tetap dicek di kedua mode.
     """
-    import os
-    from fastapi import HTTPException
-
     # Cek apakah kita mengizinkan dummy mode
     ALLOW_DUMMY = os.environ.get("ALLOW_DUMMY_TX", "true").lower() == "true"
 
     try:
-        tx = Transaction(**tx_data)
+        with span("parse"):
+            tx = Transaction(**tx_data)
+        if not tx.has_valid_id():
+            raise ValueError("transaction id does not match its content")
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Invalid transaction format: {str(e)}")
 
-    # Jika bukan dummy mode → wajib validasi
-    if not ALLOW_DUMMY:
-        if not tx.validate_tx():
-            raise HTTPException(status_code=400, detail="Transaction rejected (Invalid signature, duplicate, or insufficient funds)")
-    else:
-        print("⚠️ [DUMMY MODE] Validasi signature dilewati (testing UI).")
-
-    NODE.mempool.add_transaction(tx)
-    return {"message": "Transaction added to mempool", "tx_id": tx.id}
+    # Pre-check murah sebelum verifikasi ECDSA
+    ADMISSION.check_duplicate(tx.id, NODE.mempool)
 
+    # Verifikasi ECDSA di thread pool verifikasi, bukan di event loop
+    with ADMISSION.verify_queue.slot(client_key(request)), span("verify"):
+        valid = await VERIFY_EXECUTOR.run(tx.validate_tx)
+    with span("mempool_add"):
+        added = valid and await run_in_threadpool(profiled_call, add_to_mempool, tx)
 
-@app.get("/mempool")
-def mempool_view():
+    # Jika bukan dummy mode → transaksi yang ditolak dilaporkan sebagai error
+    if not ALLOW_DUMMY:
+        if not added:
+            raise HTTPException(status_code=400, detail="Transaction rejected (Invalid signature, duplicate, or insufficient funds)")
+    elif not added:
+        # Dummy mode tetap 200 agar UI tidak error, tapi penolakan harus terlihat
+        print("⚠️ [DUMMY MODE] Transaksi ditolak mempool (testing UI).")
+        return {"message": "Transaction rejected", "added": False, "tx_id": tx.id}
+
+    return {"message": "Transaction added to mempool", "added": True, "tx_id": tx.id}
+
+
+@app.get("/transactions/{tx_id}")
+def get_transaction(tx_id: str):
+    found = NODE.blockchain.find_transaction(tx_id)
+    if found:
+        tx, height = found
+        return {"transaction": tx, "block": height, "confirmations": NODE.blockchain.height - height + 1}
+    for tx in NODE.mempool.all_transactions():
+        if tx.id == tx_id:
+            return {"transaction": tx.model_dump(), "block": None, "confirmations": 0}
+    raise HTTPException(status_code=404, detail="Transaction not found")
+
+@app.get("/address/{address}/history")
+def address_history(address: str, limit: int = 50, offset: int = 0):
+    limit = max(1, min(limit, 500))
+    history = NODE.blockchain.address_history(address, limit, max(offset, 0))
     return {
-        "mempool": [t.model_dump() for t in NODE.mempool.txs], # Menggunakan .txs
-        "count": len(NODE.mempool.txs)
+        "address": address,
+        "transactions": [{"transaction": tx, "block": height} for tx, height in history],
     }
 
+@app.get("/mempool")
+def mempool_view(request: Request):
+    txs = NODE.mempool.txs
+    return RESPONSE_CACHE.respond(request, ("mempool",), mempool_version(), lambda: {
+        "mempool": [t.model_dump() for t in txs], # Menggunakan .txs
+        "count": len(txs)
+    })
+
 # -------------------------------
 # Mining
 # -------------------------------
+def prepare_mining():
+    """Buang transaksi kedaluwarsa, ambil template, dan susun block kandidat (di bawah lock)."""
+    with NODE.lock:
+        NODE.mempool.evict_expired()
+        txs = TEMPLATE.get_template()
+        if not txs:
+            return txs, None
+        return txs, NODE.blockchain.build_candidate(txs, NODE.node_address)
+
+def commit_mined_block(block: Block, txs, elapsed: float) -> bool:
+    """Tambahkan block hasil PoW; False (dicatat sebagai stale) jika tip sudah berubah selama mining."""
+    with NODE.lock:
+        if block.previous_hash != NODE.blockchain.last_block.hash:
+            NODE.blockchain.record_mining("stale", elapsed)
+            return False
+        # Block ini disusun sendiri dari template: signature yang sudah diverifikasi saat
+        # masuk mempool tidak diverifikasi ulang (block dari peer tidak memakai cache ini)
+        if not NODE.blockchain.add_block(block, TEMPLATE.verified):
+            raise ValueError("Block hasil mining tidak valid")
+        NODE.blockchain.record_mining("mined", elapsed, block.hash)
+        NODE.mempool.remove_transactions([tx.id for tx in txs])
+        return True
+
+async def search_block_nonce(block: Block) -> float:
+    """
+    PoW per potongan MINING_CHUNK_NONCES di process pool. Di antara potongan tip
+    chain dicek: jika block peer sudah masuk, pencarian dihentikan (StaleWork).
+    Mengembalikan lama pencarian (detik).
+    """
+    header, target, nonce = block.header_data(), block.target_value, 0
+    started = time.monotonic()
+    with MINING_EXECUTOR.reserve():
+        while True:
+            found = await MINING_EXECUTOR.submit(search_nonce, header, target, nonce, MINING_CHUNK_NONCES)
+            if found:
+                block.nonce, block.hash = found
+                return time.monotonic() - started
+            nonce += MINING_CHUNK_NONCES
+            if NODE.blockchain.last_block.hash != block.previous_hash:
+                NODE.blockchain.record_mining("abandoned", time.monotonic() - started)
+                raise StaleWork(f"Tip berubah selama mining block #{block.index}")
+
 @app.post("/mine")
-def mine(dummy: bool = False):
+async def mine(dummy: bool = False):
     """
     Tambahkan block baru ke chain.
     Jika dummy=True, node akan tetap memproses transaksi meskipun tidak valid.
     """
     try:
-        # 🔹 Ambil semua transaksi dari mempool
-        txs = NODE.mempool.all_transactions()
+        # 🔹 Template (fee rate tertinggi, dalam batas ukuran) → block kandidat
+        with span("template"):
+            txs, new_block = await run_in_threadpool(profiled_call, prepare_mining)
 
         if not txs:
             raise HTTPException(status_code=400, detail="Mempool kosong, tidak ada transaksi untuk ditambang.")
 
-        # 🔹 Lakukan Proof of Work
-        nonce, block_hash = NODE.blockchain.proof_of_work(
-            txs, NODE.blockchain.last_block.hash
-        )
-
-        # 🔹 Buat block baru dan tambahkan ke chain
-        new_block = NODE.blockchain.create_block(
-            nonce=nonce,
-            previous_hash=NODE.blockchain.last_block.hash,
-            transactions=txs,
-            miner_address=NODE.node_address
-        )
+        # 🔹 Proof of Work di process pool mining (event loop tetap melayani request lain)
+        with span("pow", txs=len(txs)):
+            try:
+                elapsed = await search_block_nonce(new_block)
+            except StaleWork:
+                raise HTTPException(status_code=409, detail="Tip chain berubah selama mining, pencarian dihentikan.")
 
-        # 🔹 Hapus transaksi yang sudah ditambang (berdasarkan ID)
-        NODE.mempool.remove_transactions([tx.id for tx in txs])
+        # 🔹 Tambahkan ke chain & hapus transaksi yang sudah ditambang
+        with span("commit"):
+            committed = await run_in_threadpool(profiled_call, commit_mined_block, new_block, txs, elapsed)
+        if not committed:
+            raise HTTPException(status_code=409, detail="Tip chain berubah selama mining, block dibuang.")
 
-        # 🔹 Broadcast block ke node lain
-        NODE.broadcast_block(new_block)
+        # 🔹 Broadcast block ke node lain (paralel, async)
+        with span("broadcast", peers=len(NODE.peers)):
+            await NODE.abroadcast_block(new_block)
 
-        return {"message": "New block forged", "block": new_block.__dict__}
+        return {"message": "New block forged", "block": block_to_dict(new_block)}
 
+    except (HTTPException, AdmissionError):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Mining failed: {e}")
 
 
 
+@app.get("/mining/template")
+def mining_template():
+    return TEMPLATE.summary()
+
+@app.get("/mining/stats")
+def mining_stats(window: int = STALE_WINDOW):
+    """Pekerjaan mining yang terbuang (abandoned/stale/orphaned) & stale rate jaringan dari side block."""
+    return NODE.blockchain.stale_stats(max(1, min(window, STATS_MAX_BLOCKS)))
+
+# -------------------------------
+# Light client (Bloom filter + merkle proof)
+# -------------------------------
+LIGHT_FILTERS = FilterRegistry()
+
+@app.post("/light/filter")
+def register_filter(payload: dict):
+    try:
+        bloom = BloomFilter.from_dict(payload.get("filter") or {})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"filter_id": LIGHT_FILTERS.register(bloom)}
+
+@app.delete("/light/filter/{filter_id}")
+def remove_filter(filter_id: str):
+    LIGHT_FILTERS.remove(filter_id)
+    return {"message": "Filter removed"}
+
+@app.get("/light/headers")
+def light_headers(start: int = 1, count: int = SYNC_MAX_RANGE):
+    blocks = NODE.blockchain.get_blocks(start, max(0, min(count, SYNC_MAX_RANGE)))
+    return {"headers": [b.header() for b in blocks], "height": NODE.blockchain.height}
+
+@app.get("/light/sync")
+def light_sync_view(filter_id: str, start: int = 1, count: int = SYNC_MAX_RANGE):
+    """Header block [start, start+count) dan transaksi yang cocok dengan filter beserta merkle proof."""
+    bloom = LIGHT_FILTERS.get(filter_id)
+    if bloom is None:
+        raise HTTPException(status_code=404, detail="Unknown filter_id, register the filter again")
+    return light_sync(NODE.blockchain, bloom, start, count)
+
 # -------------------------------
 # Node Management
 # -------------------------------
@@ -167,51 +596,107 @@ def register_nodes(payload: dict):
 def get_nodes():
     return {"nodes": NODE.peers}
 
+@app.get("/nodes/peers")
+def peer_stats():
+    return {"peers": NODE.peer_manager.stats(), "healthy": NODE.peer_manager.healthy()}
+
+@app.post("/nodes/discover")
+def discover_peers():
+    added = NODE.peer_manager.maintain()
+    return {"message": "Discovery finished", "added": added, "total_nodes": len(NODE.peers)}
+
+@app.get("/nodes/verification")
+def verification_stats():
+    chain = NODE.blockchain
+    return dict(chain.verify_stats.to_dict(), full_verify=chain.full_verify,
+                checkpoints={str(h): v for h, v in sorted(chain.checkpoints.items())})
+
+@app.get("/nodes/cache")
+def cache_stats():
+    return RESPONSE_CACHE.stats()
+
+@app.get("/nodes/startup")
+def startup_stats():
+    return dict(STARTUP, budget_ms=STARTUP_BUDGET * 1000, pid=os.getpid(), role=NODE_ROLE)
+
+@app.get("/nodes/admission")
+def admission_stats():
+    return dict(ADMISSION.stats(), executors={
+        "verify": VERIFY_EXECUTOR.stats(), "mining": MINING_EXECUTOR.stats(),
+    })
+
 # -------------------------------
 # Receive Block
 # -------------------------------
+def append_received_block(block: Block) -> bool:
+    with NODE.lock:
+        if not NODE.blockchain.append_validated(block):
+            return False
+        # KOREKSI: Hapus transaksi non-coinbase dari mempool
+        NODE.mempool.remove_transactions([t.id for t in block.transactions if t.sender != 'coinbase'])
+        return True
+
+def keep_side_block(block: Block) -> bool:
+    with NODE.lock:
+        return NODE.blockchain.add_side_block(block)
+
 @app.post("/nodes/receive_block")
-async def receive_block(payload: dict):
+async def receive_block(payload: dict, request: Request):
+    peer = client_key(request)
     try:
-        from .blockchain import Block
-        txs = [Transaction.model_validate(t) for t in payload.get("transactions", [])]
-        block = Block(
-            index=payload["index"],
-            timestamp=payload.get("timestamp"),
-            transactions=txs,
-            nonce=payload["nonce"],
-            previous_hash=payload["previous_hash"],
-            difficulty=payload.get("difficulty", 3),
-            hash=payload.get("hash", "")
-        )
+        with span("parse"):
+            block = Block.from_dict(payload)
+            if not all(t.has_valid_id() for t in block.transactions):
+                raise ValueError("Transaction id does not match its content")
     except Exception as e:
+        ADMISSION.record_invalid(peer)
         return JSONResponse({"message": "Invalid block payload", "error": str(e)}, status_code=400)
 
     last = NODE.blockchain.last_block
+    if block.hash and block.hash == last.hash:
+        # Block yang sama diterima lagi lewat gossip: tidak perlu verifikasi ulang
+        return {"message": "Block already known"}
     if block.previous_hash == last.hash:
-        if block.validate_block():
-            NODE.blockchain.chain.append(block)
-            # KOREKSI: Hapus transaksi non-coinbase dari mempool
-            NODE.mempool.remove_transactions([t.id for t in block.transactions if t.sender != 'coinbase'])
+        # Validasi isi block (hash, PoW, signature) di thread pool verifikasi
+        with ADMISSION.verify_queue.slot(peer), span("validate", txs=len(block.transactions)):
+            # Tanpa cache verifikasi mempool: signature di block peer selalu diverifikasi sendiri
+            valid = await VERIFY_EXECUTOR.run(block.validate_block)
+        with span("append"):
+            added = valid and await run_in_threadpool(profiled_call, append_received_block, block)
+        if added:
             return {"message": "Block added"}
         else:
+            ADMISSION.record_invalid(peer)
             return JSONResponse({"message": "Invalid block"}, status_code=400)
-    else:
-        return JSONResponse({
-            "message": "Block does not link to current chain tip, consider resolving conflicts"
-        }, status_code=409)
+    if 1 < block.index <= NODE.blockchain.height:
+        # Block pesaing untuk height yang sudah kita punya: disimpan untuk statistik stale rate
+        kept = await run_in_threadpool(keep_side_block, block)
+        if kept:
+            return {"message": "Competing block kept as side block"}
+    return JSONResponse({
+        "message": "Block does not link to current chain tip, consider resolving conflicts"
+    }, status_code=409)
 # -------------------------------
 # Receive Transaction
 # -------------------------------
 @app.post("/nodes/receive_tx")
-async def receive_tx(payload: dict):
+async def receive_tx(payload: dict, request: Request):
+    peer = client_key(request)
     try:
         tx = Transaction.model_validate(payload)
+        if not tx.has_valid_id():
+            raise ValueError("Transaction id does not match its content")
     except Exception as e:
+        ADMISSION.record_invalid(peer)
         return JSONResponse({"message": "Invalid tx payload", "error": str(e)}, status_code=400)
 
-    # KOREKSI: Panggil mempool.add_transaction dengan objek blockchain untuk cek saldo
-    added = NODE.mempool.add_transaction(tx, blockchain=NODE.blockchain)
+    # Duplikat dari gossip bukan error, cukup diabaikan tanpa verifikasi signature
+    if NODE.mempool.contains(tx.id):
+        return {"message": "Tx already known"}
+
+    with ADMISSION.verify_queue.slot(peer):
+        valid = await VERIFY_EXECUTOR.run(tx.validate_tx)
+    added = valid and await run_in_threadpool(add_to_mempool, tx)
     if not added:
         return JSONResponse({"message": "Tx duplicate, invalid signature, or insufficient funds"}, status_code=400)
 
@@ -222,33 +707,179 @@ async def receive_tx(payload: dict):
 # -------------------------------
 @app.post("/nodes/resolve")
 def resolve():
-    chains = []
-    for peer in NODE.peers:
+    # Handler sync: FastAPI menjalankannya di thread pool, jadi request blocking tidak menahan event loop.
+    # Chain hanya dikunci saat block ditambahkan / chain diganti.
+    # Jalur cepat: download paralel block yang kurang dari beberapa peer
+    with span("sync"):
+        result = SyncEngine(NODE).sync()
+    if result.status == "synced":
+        return {"message": "Our chain was extended", "sync": asdict(result)}
+    if result.status in ("up_to_date", "no_peers"):
+        return {"message": "Our chain is authoritative", "sync": asdict(result)}
+
+    # Fork atau sync gagal: bandingkan chain penuh dari setiap peer (streaming)
+    old_chain = NODE.blockchain.chain
+    with span("resolve_stream"):
+        replaced = NODE.blockchain.resolve_conflicts_stream(peer_chain_streams(), lock=NODE.lock)
+    if replaced:
+        returned = reconcile_mempool(old_chain)
+        return {"message": "Our chain was replaced", "returned_to_mempool": returned}
+    else:
+        return {"message": "Our chain is authoritative"}
+
+def reconcile_mempool(old_chain) -> int:
+    """Setelah chain diganti: transaksi di block yang terlepas kembali ke mempool, yang terkonfirmasi keluar."""
+    with NODE.lock:
+        new_chain = NODE.blockchain.chain
+        fork = 0
+        while fork < min(len(old_chain), len(new_chain)) and old_chain[fork].hash == new_chain[fork].hash:
+            fork += 1
+        return NODE.mempool.reorg(old_chain[fork:], new_chain[fork:], NODE.blockchain)
+
+def peer_chain_streams():
+    """Chain setiap peer sebagai iterator baris NDJSON; peer lama tanpa /blocks/stream memakai /blocks."""
+    for peer in NODE.peer_manager.healthy():
         try:
-            r = requests.get(f"{peer}/blocks", timeout=3)
+            r = NODE.peer_manager.get(peer, "/blocks/stream", stream=True, timeout=3)
+            if r.status_code == 404:
+                r = NODE.peer_manager.get(peer, "/blocks", timeout=3)
+                if r.status_code == 200:
+                    yield r.json().get("chain", [])
+                continue
             if r.status_code == 200:
-                data = r.json()
-                chains.append(data.get("chain", []))
+                with r:
+                    yield iter_lines(r.iter_content(chunk_size=65536))
         except Exception:
             continue
 
-    replaced = NODE.blockchain.resolve_conflicts(chains)
-    if replaced:
-        return {"message": "Our chain was replaced"}
-    else:
-        return {"message": "Our chain is authoritative"}
-        
+# -------------------------------
+# Debug: profil, trace & log operasi lambat (PROFILING=true)
+# -------------------------------
+def require_profiling():
+    if not PROFILING:
+        raise HTTPException(status_code=404, detail="Profiling disabled (set PROFILING=true)")
+
+@app.post("/debug/profile/start")
+def profile_start(mode: str = "sampling", interval: float = PROFILE_SAMPLE_INTERVAL):
+    require_profiling()
+    try:
+        PROFILER.start(mode, interval)
+    except (ValueError, RuntimeError) as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"message": "Profiling started", "mode": mode}
+
+@app.post("/debug/profile/stop")
+def profile_stop(format: str = "json"):
+    """Hentikan sesi profil. format=collapsed → teks collapsed stack untuk flamegraph.pl / speedscope."""
+    require_profiling()
+    try:
+        result = PROFILER.stop()
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if format == "collapsed":
+        return Response(result.get("collapsed", ""), media_type="text/plain")
+    return result
+
+@app.get("/debug/traces")
+def debug_traces(name: str = None, limit: int = 50):
+    require_profiling()
+    return {"traces": recent_traces(name, max(1, min(limit, 200)))}
+
+@app.get("/debug/slow-ops")
+def debug_slow_ops():
+    require_profiling()
+    return SLOW_OPS.to_dict()
+
+@app.post("/debug/slow-ops")
+def configure_slow_ops(payload: dict):
+    """Ubah ambang log operasi lambat saat runtime, mis. {"thresholds_ms": {"mine.pow": 2000}}."""
+    require_profiling()
+    try:
+        SLOW_OPS.configure(payload.get("thresholds_ms"), payload.get("default_ms"))
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return SLOW_OPS.to_dict()
+
 @app.get("/balance/{public_key}")
-def get_balance(public_key: str):
-    balance = NODE.blockchain.get_balance(public_key)
-    return {"address": public_key, "balance": balance}
-@app.get("/balance/{pubkey}")
-def get_balance(pubkey: str):
-    balance = NODE.blockchain.get_balance(pubkey)
-    return {"balance": balance}
+def get_balance(request: Request, public_key: str, include_pending: bool = False):
+    if not include_pending:
+        return RESPONSE_CACHE.respond(request, ("balance", public_key), chain_version(), lambda: {
+            "address": public_key, "balance": NODE.blockchain.get_balance(public_key),
+        })
+    with NODE.lock:
+        version = (chain_version(), mempool_version())
+        chain, height = NODE.blockchain.chain, NODE.blockchain.height
+        incoming, outgoing = NODE.mempool.pending.get(public_key)
+
+    def build():
+        (height_, tip), states = NODE.blockchain.account_states([public_key], chain, height)
+        balance = states[public_key]["balance"]
+        return {
+            "address": public_key, "balance": balance, "height": height_, "tip": tip,
+            "pending_in": incoming, "pending_out": outgoing,
+            "available": NODE.mempool.pending.available(public_key, balance, (incoming, outgoing)),
+        }
+    return RESPONSE_CACHE.respond(request, ("balance", public_key, "pending"), version, build)
+
+@app.post("/balances")
+def get_balances(payload: dict):
+    """Saldo, delta mempool & aktivitas terakhir banyak alamat dari satu snapshot chain + mempool."""
+    addresses = payload.get("addresses")
+    if not isinstance(addresses, list) or not all(isinstance(a, str) for a in addresses):
+        raise HTTPException(status_code=400, detail="addresses must be a list of strings")
+    if len(addresses) > BALANCES_MAX_ADDRESSES:
+        raise HTTPException(status_code=400, detail=f"At most {BALANCES_MAX_ADDRESSES} addresses per request")
+    with NODE.lock:
+        # Chain & mempool dibaca bersamaan agar tx yang baru ditambang tidak terhitung dua kali
+        chain, height = NODE.blockchain.chain, NODE.blockchain.height
+        pending = {address: NODE.mempool.pending.get(address) for address in addresses}
+    (height, tip), states = NODE.blockchain.account_states(addresses, chain, height)
+    balances = {}
+    for address, state in states.items():
+        incoming, outgoing = pending[address]
+        balances[address] = {
+            "balance": state["balance"],
+            "pending_in": incoming,
+            "pending_out": outgoing,
+            "pending": incoming - outgoing,
+            "available": NODE.mempool.pending.available(address, state["balance"], pending[address]),
+            "last_activity": state["last_activity"],
+        }
+    return {"height": height, "tip": tip, "balances": balances}
+
+# -------------------------------
+# Statistik chain (analitik kolom)
+# -------------------------------
+def chain_stats(request: Request, name: str, query, *args):
+    """Respons /stats/* di-cache per tip; kolom analitik disinkronkan hanya saat cache miss."""
+    def build():
+        ANALYTICS.sync(NODE.blockchain.chain)
+        return query(*args)
+    return RESPONSE_CACHE.respond(request, ("stats", name) + args, chain_version(), build)
+
+@app.get("/stats/supply")
+def stats_supply(request: Request):
+    return chain_stats(request, "supply", ANALYTICS.supply)
+
+@app.get("/stats/top-holders")
+def stats_top_holders(request: Request, limit: int = 10):
+    return chain_stats(request, "top-holders", ANALYTICS.top_holders, max(1, min(limit, STATS_MAX_TOP)))
+
+@app.get("/stats/throughput")
+def stats_throughput(request: Request, blocks: int = 100):
+    return chain_stats(request, "throughput", ANALYTICS.throughput, max(1, min(blocks, STATS_MAX_BLOCKS)))
+
+@app.get("/stats/tx-sizes")
+def stats_tx_sizes(request: Request, bins: int = 10):
+    return chain_stats(request, "tx-sizes", ANALYTICS.tx_sizes, max(1, min(bins, STATS_MAX_BINS)))
+
+@app.get("/stats/miners")
+def stats_miners(request: Request, blocks: int = 100):
+    return chain_stats(request, "miners", ANALYTICS.miners, max(1, min(blocks, STATS_MAX_BLOCKS)))
 
 # -------------------------------
 # Run Server
 # -------------------------------
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run("src.app:app", host="0.0.0.0", port=PORT, reload=True)
@@ -1,9 +1,51 @@
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Iterable, Callable
+import json
+import threading
 import time
-from dataclasses import dataclass
-from .utils import hash_data, is_valid_proof
+from collections import OrderedDict
+from contextlib import nullcontext
+from dataclasses import dataclass, asdict
+from functools import lru_cache
+from .utils import (
+    hash_data, is_valid_proof, hash_meets_target, difficulty_to_target,
+    target_to_difficulty, target_to_hex, target_work, retarget, MAX_TARGET, merkle_root,
+)
 from .tx import Transaction, Mempool
-from .config import DIFFICULTY, COINBASE_AMOUNT
+from .config import (
+    DIFFICULTY, COINBASE_AMOUNT, MAX_BLOCK_SIZE, MAX_BLOCK_TXS, TARGET_BLOCK_TIME, RETARGET_INTERVAL,
+    MAX_RETARGET_FACTOR, MAX_FUTURE_BLOCK_TIME, MEDIAN_TIME_SPAN, GENESIS_BLOCKS,
+    CHECKPOINTS, FULL_VERIFY, ACCOUNT_STATE_CACHE, MINING_CHUNK_NONCES, SIDE_BLOCKS_MAX, STALE_WINDOW,
+)
+
+
+def search_nonce(header: Dict[str, Any], target: int, start_nonce: int = 0,
+                 max_nonces: Optional[int] = None) -> Optional[Tuple[int, str]]:
+    """
+    Cari nonce sampai hash header <= target. Fungsi level modul agar bisa
+    dijalankan di process pool (lihat src/executors.py). Dengan `max_nonces`
+    hanya satu potongan yang dicoba; None jika tidak ada nonce yang cocok,
+    sehingga pemanggil bisa mengecek tip chain sebelum melanjutkan.
+    """
+    data = dict(header)
+    nonce = start_nonce
+    end = None if max_nonces is None else start_nonce + max_nonces
+    while nonce != end:
+        data["nonce"] = nonce
+        current_hash = hash_data(data)
+        if hash_meets_target(current_hash, target):
+            return nonce, current_hash
+        nonce += 1
+    return None
+
+
+class StaleWork(Exception):
+    """Tip chain berubah selama pencarian nonce; block kandidat dibuang."""
+
+
+# Field header yang ikut di-hash; mengubahnya mengosongkan cache hash block
+_HEADER_FIELDS = frozenset({
+    "index", "transactions", "nonce", "previous_hash", "difficulty", "timestamp", "target", "merkle_root",
+})
 
 
 @dataclass
@@ -12,134 +54,635 @@ class Block:
     transactions: List[Transaction]
     nonce: int
     previous_hash: str
-    difficulty: int
+    difficulty: int               # perkiraan leading zeros (tampilan / block lama tanpa target)
     timestamp: float = None
     hash: str = ""
+    target: str = ""              # target PoW numerik (hex 64 karakter)
+    merkle_root: str = ""         # root merkle transaksi; jika ada, header tidak memuat transaksi
 
     def __post_init__(self):
         if self.timestamp is None:
             self.timestamp = time.time()
 
-    def calculate_hash(self) -> str:
+    def __setattr__(self, name: str, value: Any):
+        object.__setattr__(self, name, value)
+        if name in _HEADER_FIELDS:
+            self.__dict__.pop("_hash_cache", None)
+
+    def header_data(self, transactions: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """
+        Data yang di-hash. Block dengan merkle_root hanya meng-hash header (transaksi
+        terikat lewat merkle root, sehingga light client cukup mengunduh header).
+        Block lama meng-hash seluruh transaksi; `transactions` bisa diberikan
+        dalam bentuk dict yang sudah di-dump.
+        """
+        if self.merkle_root:
+            return {
+                "index": self.index,
+                "merkle_root": self.merkle_root,
+                "nonce": self.nonce,
+                "previous_hash": self.previous_hash,
+                "difficulty": self.difficulty,
+                "timestamp": self.timestamp,
+                "target": self.target,
+            }
         data = {
             "index": self.index,
-            "transactions": [t.model_dump() for t in self.transactions],
+            "transactions": transactions if transactions is not None else [t.model_dump() for t in self.transactions],
             "nonce": self.nonce,
             "previous_hash": self.previous_hash,
             "difficulty": self.difficulty,
             "timestamp": self.timestamp,
         }
-        return hash_data(data)
+        # Block lama tanpa target tetap menghasilkan hash yang sama seperti sebelumnya
+        if self.target:
+            data["target"] = self.target
+        return data
+
+    def calculate_hash(self) -> str:
+        """
+        Hash header, dihitung sekali lalu di-cache. Cache dikosongkan saat field
+        header diganti; untuk block lama (transaksi ikut di-hash) cache juga
+        dikunci dengan leaf transaksi sehingga perubahan isi list ikut terdeteksi.
+        """
+        key = None if self.merkle_root else tuple(self.tx_leaves())
+        cached = self.__dict__.get("_hash_cache")
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        value = hash_data(self.header_data())
+        self.__dict__["_hash_cache"] = (key, value)
+        return value
+
+    def tx_leaves(self) -> List[str]:
+        return [t.leaf_hash() for t in self.transactions]
+
+    def compute_merkle_root(self) -> str:
+        leaves = tuple(self.tx_leaves())
+        cached = self.__dict__.get("_merkle_cache")
+        if cached is not None and cached[0] == leaves:
+            return cached[1]
+        value = merkle_root(list(leaves))
+        self.__dict__["_merkle_cache"] = (leaves, value)
+        return value
+
+    def header(self) -> Dict[str, Any]:
+        """Header untuk light client: data yang di-hash beserta hash-nya."""
+        return dict(self.header_data(), hash=self.hash)
 
-    def validate_block(self) -> bool:
-        # Validasi hash block
+    @property
+    def target_value(self) -> int:
+        """Target numerik; block lama memakai aturan leading zeros dari `difficulty`."""
+        return int(self.target, 16) if self.target else difficulty_to_target(self.difficulty)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "index": self.index,
+            "timestamp": self.timestamp,
+            "transactions": [t.model_dump() for t in self.transactions],
+            "nonce": self.nonce,
+            "previous_hash": self.previous_hash,
+            "difficulty": self.difficulty,
+            "target": self.target,
+            "merkle_root": self.merkle_root,
+            "hash": self.hash,
+        }
+
+    @classmethod
+    def from_dict(cls, b: Dict[str, Any]) -> "Block":
+        txs = [Transaction(**t) for t in b.get("transactions", [])]
+        return cls(
+            index=b["index"],
+            transactions=txs,
+            nonce=b["nonce"],
+            previous_hash=b["previous_hash"],
+            difficulty=b.get("difficulty", DIFFICULTY),
+            timestamp=b.get("timestamp", time.time()),
+            hash=b.get("hash", ""),
+            target=b.get("target") or "",
+            merkle_root=b.get("merkle_root") or "",
+        )
+
+    def validate_block(self, verified: Optional[set] = None, check_signatures: bool = True) -> bool:
+        """
+        Validasi mandiri block. `verified` berisi Transaction.verification_key()
+        yang signature-nya sudah diverifikasi sebelumnya (mis. saat masuk mempool),
+        sehingga tidak perlu diverifikasi ulang. Dengan check_signatures=False
+        (block di bawah checkpoint) hanya hash, PoW, merkle root dan aturan
+        coinbase/ukuran yang dicek.
+        """
+        # Validasi hash block & merkle root transaksi
         if self.hash != self.calculate_hash():
             return False
+        if self.merkle_root and self.merkle_root != self.compute_merkle_root():
+            return False
         # Validasi PoW
-        if not is_valid_proof(self.hash, self.difficulty):
+        if self.target:
+            if not hash_meets_target(self.hash, int(self.target, 16)):
+                return False
+        elif not is_valid_proof(self.hash, self.difficulty):
+            return False
+        # Batas jumlah & ukuran transaksi
+        if len(self.transactions) > MAX_BLOCK_TXS + 1:
+            return False
+        if sum(t.size() for t in self.transactions) > MAX_BLOCK_SIZE:
+            return False
+        # Struktur transaksi multi-output (jumlah & batas outputs) tidak bergantung signature
+        if not all(t.is_well_formed() for t in self.transactions):
+            return False
+        # Merkle root menyalin leaf terakhir pada level ganjil: transaksi yang diulang di akhir
+        # menghasilkan root yang sama, jadi ID ganda ditolak di sini
+        ids = {t.id for t in self.transactions}
+        if len(ids) != len(self.transactions):
+            return False
+        # Coinbase hanya boleh di posisi pertama dan tidak melebihi reward + total fee
+        if any(t.sender == 'coinbase' for t in self.transactions[1:]):
+            return False
+        if self.transactions and self.transactions[0].sender == 'coinbase':
+            fees = sum(t.fee for t in self.transactions[1:])
+            if self.transactions[0].amount > COINBASE_AMOUNT + fees + 1e-9:
+                return False
+        if not check_signatures:
+            return True
+        return self.verify_signatures(verified)
+
+    def verify_signatures(self, verified: Optional[set] = None) -> bool:
+        # ID yang diklaim harus cocok dengan isinya sebelum cache verifikasi dipakai
+        if not all(tx.has_valid_id() for tx in self.transactions):
             return False
         # Validasi transaksi (skip coinbase)
         for tx in self.transactions[1:]:
+            if verified and tx.verification_key() in verified:
+                continue
             if not tx.validate_tx():
                 return False
         return True
 
 
+def parse_checkpoints(spec: str) -> Dict[int, str]:
+    """Format env CHECKPOINTS: "height:hash,height:hash"."""
+    checkpoints = {}
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        height, _, block_hash = item.partition(":")
+        if not height.strip().isdigit() or not block_hash.strip():
+            raise ValueError(f"Checkpoint tidak valid: {item!r} (format height:hash)")
+        checkpoints[int(height)] = block_hash.strip()
+    return checkpoints
+
+
+@dataclass
+class VerifyStats:
+    """Pekerjaan verifikasi signature saat validasi chain (sync, resolve, import)."""
+    blocks_full: int = 0               # block yang signature-nya diverifikasi penuh
+    blocks_assumed_valid: int = 0      # block di bawah checkpoint yang terkonfirmasi
+    signatures_checked: int = 0
+    signatures_skipped: int = 0
+    deferred_verified: int = 0         # block yang tetap diverifikasi karena chain berhenti sebelum checkpoint
+    checkpoint_rejects: int = 0        # block di height checkpoint dengan hash berbeda
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        total = self.signatures_checked + self.signatures_skipped
+        data["skipped_ratio"] = round(self.signatures_skipped / total, 4) if total else 0.0
+        return data
+
+
+@dataclass
+class MiningStats:
+    """Hasil pekerjaan mining node ini, termasuk yang terbuang karena tip berubah."""
+    attempts: int = 0
+    mined: int = 0                     # block yang masuk chain
+    abandoned: int = 0                 # pencarian dihentikan di tengah karena tip berubah
+    stale: int = 0                     # nonce ditemukan tetapi tip sudah berubah, block dibuang
+    orphaned: int = 0                  # block kita yang sempat masuk chain lalu terlepas saat reorg
+    time_mining: float = 0.0           # detik total pencarian nonce
+    time_lost: float = 0.0             # detik pencarian yang hasilnya terbuang (abandoned + stale + orphaned)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        wasted = self.abandoned + self.stale + self.orphaned
+        data["stale_rate"] = round(wasted / self.attempts, 4) if self.attempts else 0.0
+        return data
+
+
+def _signature_count(block: Block) -> int:
+    return sum(1 for t in block.transactions if t.sender != 'coinbase')
+
+
+# Melindungi Blockchain._chain_states saat dimajukan (level modul agar Blockchain tetap bisa di-deepcopy)
+_CHAIN_STATES_LOCK = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def genesis_proof(difficulty: int) -> Tuple[int, str]:
+    """
+    Nonce & hash genesis untuk difficulty awal. Difficulty yang ada di
+    GENESIS_BLOCKS memakai konstanta (cukup diverifikasi satu kali), sisanya
+    dicari dengan PoW. Hasilnya di-cache per proses.
+    """
+    genesis = Blockchain.genesis_template(difficulty)
+    if difficulty in GENESIS_BLOCKS:
+        genesis.nonce, genesis.hash = GENESIS_BLOCKS[difficulty]
+        if genesis.calculate_hash() != genesis.hash or not hash_meets_target(genesis.hash, genesis.target_value):
+            raise RuntimeError(f"Konstanta genesis untuk difficulty {difficulty} tidak valid")
+        return genesis.nonce, genesis.hash
+    return search_nonce(genesis.header_data(), genesis.target_value)
+
+
 class Blockchain:
-    def __init__(self):
+    def __init__(self, difficulty: int = DIFFICULTY):
         self.chain: List[Block] = []
         self.mempool = Mempool()  # Tambahkan mempool agar konsisten dengan node
+        # Target awal (genesis); block berikutnya di-retarget dari timestamp
+        self.initial_target = difficulty_to_target(difficulty)
+        self.target_block_time = TARGET_BLOCK_TIME
+        self.retarget_interval = RETARGET_INTERVAL
+        # Index SQLite opsional (src/store.py ChainStore) untuk saldo & pencarian transaksi
+        self.index = None
+        self.initial_difficulty = difficulty
+        # Assume-valid: block sampai checkpoint tertinggi tidak diverifikasi signature-nya
+        self.checkpoints: Dict[int, str] = dict(CHECKPOINTS)
+        self.full_verify = FULL_VERIFY
+        self.verify_stats = VerifyStats()
+        # Block di chain yang signature-nya dilewati tapi belum dikonfirmasi checkpoint
+        self._deferred: List[Block] = []
+        # (hash tip, {alamat: state}) hasil account_states untuk tip saat ini
+        self._state_cache: Tuple[Optional[str], Dict[str, Dict[str, Any]]] = (None, {})
+        # Tanpa index: (hash tip, height, state semua alamat) yang maju inkremental per block
+        self._chain_states: Tuple[Optional[str], int, Dict[str, Dict[str, Any]]] = (None, 0, {})
+        # Block pesaing dari peer & block yang terlepas saat reorg (hash -> block), untuk stale rate
+        self.side_blocks: "OrderedDict[str, Block]" = OrderedDict()
+        self.mining_stats = MiningStats()
+        # hash -> detik PoW block hasil mining node ini (untuk menghitung orphan)
+        self._mined: Dict[str, float] = {}
         self.create_genesis_block()
 
-    def create_genesis_block(self):
-        """Buat genesis block yang sah."""
-        nonce, genesis_hash = self.proof_of_work([], '1', index_override=1)
-        genesis = Block(
+    @staticmethod
+    def genesis_template(difficulty: int) -> Block:
+        """Genesis deterministik (timestamp 0, tanpa transaksi) sebelum PoW."""
+        target = difficulty_to_target(difficulty)
+        return Block(
             index=1,
             transactions=[],
-            nonce=nonce,
+            nonce=0,
             previous_hash='1',
-            difficulty=DIFFICULTY,
-            hash=genesis_hash,
+            difficulty=target_to_difficulty(target),
+            timestamp=0,
+            target=target_to_hex(target),
         )
+
+    def create_genesis_block(self):
+        """Buat genesis block yang sah; nonce diambil dari konstanta/cache, bukan PoW ulang."""
+        genesis = self.genesis_template(self.initial_difficulty)
+        genesis.nonce, genesis.hash = genesis_proof(self.initial_difficulty)
         self.chain.append(genesis)
 
     @property
     def last_block(self) -> Block:
         return self.chain[-1]
 
+    @property
+    def height(self) -> int:
+        return len(self.chain)
+
+    def add_block(self, block: Block, verified: Optional[set] = None) -> bool:
+        """Validasi block terhadap tip saat ini lalu tambahkan ke chain."""
+        if not self._check_block(self.chain, len(self.chain), block, self._deferred, verified):
+            if block.index in self.checkpoints and self._deferred:
+                # Cabang ini tidak melewati checkpoint: signature yang dilewati diperiksa sekarang
+                self.verify_deferred()
+            return False
+        self.chain.append(block)
+        return True
+
+    # ===============================
+    # ✅ Assume-valid checkpoint
+    # ===============================
+    def assume_valid(self, height: int) -> bool:
+        """Signature block di `height` boleh dilewati: ada checkpoint di height ini atau sesudahnya."""
+        return not self.full_verify and any(h >= height for h in self.checkpoints)
+
+    def _check_block(self, chain: List[Block], upto: int, block: Block, deferred: List[Block],
+                     verified: Optional[set] = None) -> bool:
+        """
+        Validasi block sebagai penerus `chain[:upto]`. Block di bawah checkpoint
+        hanya dicek header, PoW dan komitmen transaksinya, lalu dicatat di
+        `deferred`. Begitu chain mencapai checkpoint dengan hash yang cocok,
+        block tersebut dianggap valid (signature-nya terikat ke hash checkpoint).
+        """
+        if not self.is_valid_successor(chain, upto, block):
+            return False
+        assume = self.assume_valid(block.index)
+        if not block.validate_block(verified, check_signatures=not assume):
+            return False
+        if assume:
+            deferred.append(block)
+        else:
+            self.verify_stats.blocks_full += 1
+            self.verify_stats.signatures_checked += _signature_count(block)
+        if block.index in self.checkpoints and deferred:
+            self.verify_stats.blocks_assumed_valid += len(deferred)
+            self.verify_stats.signatures_skipped += sum(_signature_count(b) for b in deferred)
+            deferred.clear()
+        return True
+
+    def _verify_deferred(self, deferred: List[Block]) -> Optional[Block]:
+        """Verifikasi signature block yang belum dikonfirmasi checkpoint; kembalikan block invalid pertama."""
+        for block in deferred:
+            self.verify_stats.deferred_verified += 1
+            self.verify_stats.signatures_checked += _signature_count(block)
+            if not block.verify_signatures():
+                return block
+        return None
+
+    def verify_deferred(self) -> bool:
+        """
+        Dipanggil setelah sync/impor selesai: block yang signature-nya dilewati
+        tetapi chain-nya belum sampai checkpoint diverifikasi penuh. Chain dipotong
+        sebelum block pertama yang tidak valid.
+        """
+        deferred, self._deferred = self._deferred, []
+        bad = self._verify_deferred(deferred)
+        if bad is None:
+            return True
+        position = bad.index - 1
+        if position < len(self.chain) and self.chain[position] is bad:
+            del self.chain[position:]
+        return False
+
+    def append_validated(self, block: Block) -> bool:
+        """
+        Tambahkan block yang isinya sudah divalidasi (validate_block di executor).
+        Hanya konteks terhadap tip saat ini yang dicek; panggil di bawah lock node.
+        """
+        if not self.is_valid_successor(self.chain, len(self.chain), block):
+            return False
+        self.chain.append(block)
+        return True
+
+    # ===============================
+    # ⛏️ Pekerjaan basi & side block
+    # ===============================
+    def record_mining(self, outcome: str, elapsed: float, block_hash: Optional[str] = None):
+        """Catat hasil satu pencarian nonce: "mined", "abandoned" atau "stale"."""
+        stats = self.mining_stats
+        stats.attempts += 1
+        stats.time_mining += elapsed
+        if outcome == "mined":
+            stats.mined += 1
+            self._mined[block_hash] = elapsed
+            if len(self._mined) > SIDE_BLOCKS_MAX:
+                # Reorg sedalam ini tidak realistis; block lama tidak perlu dilacak
+                self._mined.pop(next(iter(self._mined)))
+        else:
+            setattr(stats, outcome, getattr(stats, outcome) + 1)
+            stats.time_lost += elapsed
+
+    def add_side_block(self, block: Block) -> bool:
+        """
+        Simpan block pesaing dari peer: block valid yang parent-nya ada di chain
+        kita tetapi bukan tip (height yang sama dengan block yang sudah kita punya).
+        """
+        upto = block.index - 1
+        if block.hash in self.side_blocks or not 1 <= upto < len(self.chain):
+            return False
+        if self.chain[upto].hash == block.hash:
+            return False
+        if not self.is_valid_successor(self.chain, upto, block) or not block.validate_block(check_signatures=False):
+            return False
+        self._keep_side_block(block)
+        return True
+
+    def _keep_side_block(self, block: Block):
+        self.side_blocks[block.hash] = block
+        self.side_blocks.move_to_end(block.hash)
+        while len(self.side_blocks) > SIDE_BLOCKS_MAX:
+            self.side_blocks.popitem(last=False)
+
+    def _replace_chain(self, new_chain: List[Block]):
+        """Ganti chain; block lama yang terlepas disimpan sebagai side block (orphan jika hasil mining kita)."""
+        old, fork = self.chain, 0
+        while fork < min(len(old), len(new_chain)) and old[fork].hash == new_chain[fork].hash:
+            fork += 1
+        for block in old[fork:]:
+            self._keep_side_block(block)
+            elapsed = self._mined.pop(block.hash, None)
+            if elapsed is not None:
+                self.mining_stats.orphaned += 1
+                self.mining_stats.time_lost += elapsed
+        for block in new_chain[fork:]:
+            self.side_blocks.pop(block.hash, None)
+        self.chain = new_chain
+        self._deferred = []
+
+    def stale_stats(self, window: int = STALE_WINDOW) -> Dict[str, Any]:
+        """Stale rate jaringan (side block / semua block) di `window` height terakhir + statistik mining lokal."""
+        low = max(2, self.height - window + 1)
+        main = max(0, self.height - low + 1)
+        recent = [b for b in self.side_blocks.values() if b.index >= low]
+        total = main + len(recent)
+        return {
+            "window": window,
+            "main_blocks": main,
+            "side_blocks": len(recent),
+            "stale_rate": round(len(recent) / total, 4) if total else 0.0,
+            "side_blocks_kept": len(self.side_blocks),
+            "recent_side_blocks": [
+                {"index": b.index, "hash": b.hash, "previous_hash": b.previous_hash,
+                 "miner": b.transactions[0].recipient if b.transactions else None}
+                for b in recent[-20:]
+            ],
+            "mining": self.mining_stats.to_dict(),
+        }
+
+    def get_blocks(self, start: int, count: int) -> List[Block]:
+        """Ambil `count` block mulai dari index `start` (index block dimulai dari 1)."""
+        start = max(start, 1)
+        return self.chain[start - 1:start - 1 + max(count, 0)]
+
+    # ===============================
+    # 🎯 Difficulty (target) dinamis
+    # ===============================
+    def next_target(self, chain: Optional[List[Block]] = None, upto: Optional[int] = None) -> int:
+        """
+        Target untuk block setelah `chain[:upto]`. Setiap `retarget_interval` block,
+        target diskalakan dengan rasio waktu aktual / waktu yang diharapkan
+        (dibatasi MAX_RETARGET_FACTOR); di antaranya target sama dengan block sebelumnya.
+        Jendela pertama (yang berisi genesis ber-timestamp 0) tidak dipakai untuk retarget.
+        """
+        chain = self.chain if chain is None else chain
+        length = len(chain) if upto is None else upto
+        if length == 0:
+            return self.initial_target
+        prev_target = chain[length - 1].target_value
+        interval = self.retarget_interval
+        if length % interval != 0 or length <= interval:
+            return prev_target
+
+        actual = chain[length - 1].timestamp - chain[length - interval - 1].timestamp
+        return retarget(prev_target, actual, interval * self.target_block_time, MAX_RETARGET_FACTOR)
+
+    def median_time_past(self, chain: List[Block], upto: int) -> float:
+        window = sorted(b.timestamp for b in chain[max(0, upto - MEDIAN_TIME_SPAN):upto])
+        return window[len(window) // 2] if window else 0
+
+    def is_valid_successor(self, chain: List[Block], upto: int, block: Block) -> bool:
+        """Cek konteks block terhadap `chain[:upto]`: sambungan, index, target, dan timestamp."""
+        prev = chain[upto - 1]
+        if block.previous_hash != prev.hash or block.index != prev.index + 1:
+            return False
+        expected = self.checkpoints.get(block.index)
+        if expected is not None and block.hash != expected:
+            self.verify_stats.checkpoint_rejects += 1
+            return False
+        if block.target != target_to_hex(self.next_target(chain, upto)):
+            return False
+        if block.timestamp <= self.median_time_past(chain, upto):
+            return False
+        if block.timestamp > time.time() + MAX_FUTURE_BLOCK_TIME:
+            return False
+        return True
+
     # ===============================
     # 💠 Proof of Work
     # ===============================
+    def _search_nonce(self, block: Block, start_nonce: int = 0,
+                      should_stop: Optional[Callable[[], bool]] = None) -> Tuple[int, str]:
+        """
+        Cari nonce sampai hash block <= target. Transaksi hanya di-dump sekali.
+        Jika `should_stop` diberikan, dicek setiap MINING_CHUNK_NONCES nonce dan
+        pencarian dihentikan dengan StaleWork saat bernilai True.
+        """
+        if should_stop is None:
+            return search_nonce(block.header_data(), block.target_value, start_nonce)
+        header, target, nonce = block.header_data(), block.target_value, start_nonce
+        while True:
+            found = search_nonce(header, target, nonce, MINING_CHUNK_NONCES)
+            if found:
+                return found
+            nonce += MINING_CHUNK_NONCES
+            if should_stop():
+                raise StaleWork(f"Tip berubah selama mining block #{block.index}")
+
+    def prepare_block(self, transactions: List[Transaction], timestamp: Optional[float] = None) -> Block:
+        """Kerangka block berikutnya (index, target, timestamp) di atas tip saat ini."""
+        target = self.next_target()
+        timestamp = time.time() if timestamp is None else timestamp
+        # Timestamp harus lebih besar dari median block terakhir
+        timestamp = max(timestamp, self.median_time_past(self.chain, len(self.chain)) + 0.001)
+        block = Block(
+            index=len(self.chain) + 1,
+            transactions=list(transactions),
+            nonce=0,
+            previous_hash=self.last_block.hash,
+            difficulty=target_to_difficulty(target),
+            timestamp=timestamp,
+            target=target_to_hex(target),
+        )
+        block.merkle_root = block.compute_merkle_root()
+        return block
+
     def proof_of_work(
         self,
         transactions: List[Transaction],
         previous_hash: str,
         index_override: Optional[int] = None,
+        should_stop: Optional[Callable[[], bool]] = None,
     ) -> Tuple[int, str]:
-        nonce = 0
-        index = index_override if index_override is not None else len(self.chain) + 1
-        base_data = {
-            "index": index,
-            "transactions": [t.model_dump() for t in transactions],
-            "previous_hash": previous_hash,
-            "difficulty": DIFFICULTY,
-        }
+        """
+        Cari nonce untuk block berikutnya dengan target yang berlaku saat ini.
+        Secara default pencarian berhenti (StaleWork) jika tip tidak lagi `previous_hash`.
+        """
+        block = self.prepare_block(transactions)
+        block.previous_hash = previous_hash
+        if index_override is not None:
+            block.index = index_override
+        if should_stop is None:
+            should_stop = lambda: self.last_block.hash != previous_hash
+        return self._search_nonce(block, should_stop=should_stop)
 
-        while True:
-            d = dict(base_data)
-            d["nonce"] = nonce
-            d["timestamp"] = 0
-            current_hash = hash_data(d)
-            if is_valid_proof(current_hash, DIFFICULTY):
-                return nonce, current_hash
-            nonce += 1
+    def create_coinbase(self, miner_address: str, fees: float = 0.0) -> Transaction:
+        return Transaction(
+            sender="coinbase",
+            recipient=miner_address,
+            amount=COINBASE_AMOUNT + fees,
+            timestamp=time.time(),
+            signature="coinbase",
+        )
+
+    def build_candidate(self, transactions: List[Transaction], miner_address: str) -> Block:
+        """Block kandidat (coinbase + reward + fee) di atas tip, belum ada PoW."""
+        fees = sum(t.fee for t in transactions)
+        return self.prepare_block([self.create_coinbase(miner_address, fees)] + list(transactions))
+
+    def create_block(
+        self,
+        nonce: int,
+        previous_hash: str,
+        transactions: List[Transaction],
+        miner_address: str,
+        verified: Optional[set] = None,
+    ) -> Block:
+        """
+        Bentuk block baru (coinbase + transaksi) di atas tip, selesaikan PoW mulai
+        dari `nonce`, lalu tambahkan ke chain. Nonce hasil proof_of_work dipakai
+        sebagai titik awal; jika isi block berbeda, pencarian dilanjutkan.
+        Miner menerima reward ditambah total fee transaksi.
+        """
+        if previous_hash != self.last_block.hash:
+            raise ValueError("previous_hash tidak sama dengan tip chain saat ini")
+        block = self.build_candidate(transactions, miner_address)
+        # Block dari peer bisa masuk (thread lain) selama PoW: pekerjaan basi dihentikan
+        stale = lambda: self.last_block.hash != previous_hash
+        started = time.monotonic()
+        try:
+            block.nonce, block.hash = self._search_nonce(block, start_nonce=nonce, should_stop=stale)
+        except StaleWork:
+            self.record_mining("abandoned", time.monotonic() - started)
+            raise
+        if stale():
+            self.record_mining("stale", time.monotonic() - started)
+            raise StaleWork(f"Block #{block.index} basi: tip berubah sebelum block ditambahkan")
+        if not self.add_block(block, verified):
+            raise ValueError("Block hasil mining tidak valid")
+        self.record_mining("mined", time.monotonic() - started, block.hash)
+        return block
 
     # ===============================
     # 💰 Mining Block
     # ===============================
-    def mine_block(self, miner_address: str, allow_dummy: bool = False) -> Block:
+    def mine_block(self, miner_address: str, allow_dummy: bool = False,
+                   transactions: Optional[List[Transaction]] = None) -> Block:
         """
         Proses mining block baru.
         Jika allow_dummy=True, transaksi tidak divalidasi agar bisa uji dari dashboard.
         """
-        if not self.mempool.transactions:
+        from_own_mempool = transactions is None
+        candidates = self.mempool.all_transactions() if from_own_mempool else transactions
+        if not candidates:
             raise ValueError("Mempool kosong — tidak ada transaksi untuk ditambang.")
 
         # Pilih transaksi valid atau dummy
         valid_txs = [
-            tx for tx in self.mempool.transactions
+            tx for tx in candidates
             if allow_dummy or tx.validate_tx()
         ]
 
         if not valid_txs:
             raise ValueError("Tidak ada transaksi valid untuk ditambang.")
 
-        # Tambahkan coinbase (reward)
-        coinbase_tx = Transaction(
-            sender="coinbase",
-            recipient=miner_address,
-            amount=COINBASE_AMOUNT,
-            timestamp=time.time(),
-            signature="coinbase",
-        )
-        coinbase_tx.id = coinbase_tx.calculate_id()
-        all_txs = [coinbase_tx] + valid_txs
-
-        nonce, _ = self.proof_of_work(all_txs, self.last_block.hash)
-        new_block = Block(
-            index=len(self.chain) + 1,
-            transactions=all_txs,
-            nonce=nonce,
+        new_block = self.create_block(
+            nonce=0,
             previous_hash=self.last_block.hash,
-            difficulty=DIFFICULTY,
+            transactions=valid_txs,
+            miner_address=miner_address,
         )
 
-        new_block.hash = new_block.calculate_hash()
-        self.chain.append(new_block)
-
         # Bersihkan mempool setelah mining sukses
-        self.mempool.transactions.clear()
+        if from_own_mempool:
+            self.mempool.remove_transactions([tx.id for tx in valid_txs])
 
         return new_block
 
@@ -147,57 +690,195 @@ class Blockchain:
     # 🔗 Validasi & Sinkronisasi Chain
     # ===============================
     def is_valid_chain(self, chain: List[Block]) -> bool:
-        if not chain:
+        if not chain or chain[0].hash != self.chain[0].hash:
             return False
+        deferred: List[Block] = []
         for i in range(1, len(chain)):
-            block = chain[i]
-            prev = chain[i - 1]
-            if block.previous_hash != prev.hash:
+            if not self._check_block(chain, i, chain[i], deferred):
                 return False
-            if not block.validate_block():
-                return False
-        return True
+        return self._verify_deferred(deferred) is None
+
+    def chain_work(self, chain: Optional[List[Block]] = None) -> int:
+        """Total kerja (jumlah 2**256 // target per block); dasar pemilihan chain, bukan panjang."""
+        return sum(target_work(b.target_value) for b in (self.chain if chain is None else chain))
 
     def resolve_conflicts(self, peers_chains: List[List[Dict[str, Any]]]) -> bool:
         new_chain = None
-        max_length = len(self.chain)
+        max_work = self.chain_work()
 
         for chain_data in peers_chains:
             try:
-                candidate = []
-                for b in chain_data:
-                    txs = [Transaction(**t) for t in b.get("transactions", [])]
-                    blk = Block(
-                        index=b["index"],
-                        transactions=txs,
-                        nonce=b["nonce"],
-                        previous_hash=b["previous_hash"],
-                        difficulty=b.get("difficulty", DIFFICULTY),
-                        timestamp=b.get("timestamp", time.time()),
-                        hash=b.get("hash", ""),
-                    )
-                    candidate.append(blk)
+                candidate = [Block.from_dict(b) for b in chain_data]
             except Exception:
                 continue
 
-            if len(candidate) > max_length and self.is_valid_chain(candidate):
-                max_length = len(candidate)
+            work = self.chain_work(candidate)
+            if work > max_work and self.is_valid_chain(candidate):
+                max_work = work
                 new_chain = candidate
 
         if new_chain:
-            self.chain = new_chain
+            self._replace_chain(new_chain)
             return True
         return False
 
+    def resolve_conflicts_stream(self, peer_streams: Iterable[Iterable[Any]], lock=None) -> bool:
+        """
+        Seperti resolve_conflicts, tetapi chain peer dibaca block demi block
+        (baris NDJSON atau dict) dan divalidasi saat tiba. Stream berhenti di
+        block pertama yang tidak valid, dan prefix yang sama dengan chain kita
+        tidak divalidasi ulang. Jika `lock` diberikan, hanya penggantian chain
+        yang dilakukan di bawah lock (download & validasi tidak).
+        """
+        new_chain = None
+        max_work = self.chain_work()
+
+        for stream in peer_streams:
+            candidate: List[Block] = []
+            deferred: List[Block] = []
+            shared_prefix = True
+            try:
+                for item in stream:
+                    data = json.loads(item) if isinstance(item, (str, bytes)) else item
+                    blk = Block.from_dict(data)
+                    i = len(candidate)
+                    if shared_prefix and i < len(self.chain) and self.chain[i].hash == blk.hash:
+                        candidate.append(self.chain[i])
+                        continue
+                    shared_prefix = False
+                    if not candidate:
+                        # Genesis harus sama dengan milik kita
+                        raise ValueError("Genesis block berbeda")
+                    if not self._check_block(candidate, i, blk, deferred):
+                        raise ValueError(f"Invalid block #{blk.index}")
+                    candidate.append(blk)
+                # Stream berhenti sebelum checkpoint: signature yang dilewati diverifikasi sekarang
+                if self._verify_deferred(deferred) is not None:
+                    raise ValueError("Signature tidak valid di bawah checkpoint")
+            except Exception:
+                continue
+
+            work = self.chain_work(candidate)
+            if work > max_work:
+                max_work = work
+                new_chain = candidate
+
+        if not new_chain:
+            return False
+        with lock or nullcontext():
+            # Chain lokal bisa bertambah selama stream dibaca
+            if max_work <= self.chain_work():
+                return False
+            self._replace_chain(new_chain)
+        return True
+
     # ===============================
     # 💵 Cek Saldo
     # ===============================
+    def _indexed(self):
+        """Index hanya dipakai jika isinya sama persis dengan chain di memori."""
+        if self.index is not None and self.index.tip()[1] == self.last_block.hash:
+            return self.index
+        return None
+
     def get_balance(self, public_key: str) -> float:
-        balance = 0.0
+        return self.get_balances([public_key])[public_key]
+
+    def get_balances(self, public_keys) -> Dict[str, float]:
+        """Saldo beberapa alamat sekaligus (index atau satu kali scan chain, di-cache per tip)."""
+        _, states = self.account_states(public_keys)
+        return {pk: state["balance"] for pk, state in states.items()}
+
+    def account_states(self, addresses, chain: Optional[List[Block]] = None,
+                       height: Optional[int] = None) -> Tuple[Tuple[int, str], Dict[str, Dict[str, Any]]]:
+        """
+        Saldo terkonfirmasi & height aktivitas terakhir beberapa alamat, dihitung
+        dari satu snapshot chain (index SQLite jika sinkron, atau satu kali scan).
+        Snapshot bisa diberikan sebagai (chain, height) yang diambil di bawah lock.
+        Hasil di-cache per tip; mengembalikan ((height, hash tip), states).
+        """
+        addresses = list(dict.fromkeys(addresses))
+        chain = self.chain if chain is None else chain
+        height = len(chain) if height is None else height
+        tip = chain[height - 1].hash
+        cached_tip, states = self._state_cache
+        if cached_tip != tip or len(states) > ACCOUNT_STATE_CACHE:
+            states = {}
+            self._state_cache = (tip, states)
+        missing = [a for a in addresses if a not in states]
+        if missing:
+            computed = None
+            if self.index is not None:
+                computed = self.index.account_states(missing, expected_tip=tip)
+            if computed is None:
+                computed = self._states_from_chain(chain, height, missing)
+            states.update(computed)
+        return (height, tip), {a: states[a] for a in addresses}
+
+    def _states_from_chain(self, chain: List[Block], height: int, addresses: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        State alamat dari chain di memori. State semua alamat disimpan dan hanya
+        block baru sejak tip terakhir yang diterapkan, jadi biaya per query tidak
+        tumbuh dengan panjang chain; scan penuh hanya setelah reorg.
+        """
+        # Query saldo datang dari banyak thread: hanya satu yang boleh memajukan state,
+        # dan state yang sudah dipublikasikan tidak pernah diubah (dibaca tanpa lock)
+        with _CHAIN_STATES_LOCK:
+            synced_tip, synced, states = self._chain_states
+            if not (0 < synced <= len(chain) and chain[synced - 1].hash == synced_tip):
+                synced, states = 0, {}
+            if synced > height:
+                # Snapshot lebih lama dari state tersimpan (chain sudah maju): scan tanpa menimpa cache
+                states = self._scan_account_states(chain[:height], {})
+            elif synced < height:
+                states = self._scan_account_states(chain[synced:height], dict(states))
+                self._chain_states = (chain[height - 1].hash, height, states)
+        return {a: dict(states.get(a) or {"balance": 0.0, "last_activity": None}) for a in addresses}
+
+    @staticmethod
+    def _scan_account_states(blocks: List[Block], states: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Terapkan efek `blocks` ke `states` (semua alamat yang tersentuh). Entri
+        alamat diganti, bukan diubah, agar salinan dangkal `states` tetap utuh.
+        """
+        for block in blocks:
+            for tx in block.transactions:
+                for addr, delta in [(tx.sender, -tx.total_debit)] + tx.credits():
+                    state = states.get(addr)
+                    balance = state["balance"] if state else 0.0
+                    states[addr] = {"balance": balance + delta, "last_activity": block.index}
+        return states
+
+    def find_confirmed(self, tx_ids) -> set:
+        """Kembalikan subset `tx_ids` yang sudah tercatat di chain."""
+        wanted = set(tx_ids)
+        found = set()
         for block in self.chain:
             for tx in block.transactions:
-                if tx.sender == public_key:
-                    balance -= tx.amount
-                if tx.recipient == public_key:
-                    balance += tx.amount
-        return balance
+                if tx.id in wanted:
+                    found.add(tx.id)
+        return found
+
+    def find_transaction(self, tx_id: str) -> Optional[Tuple[Dict[str, Any], int]]:
+        """Transaksi (dict) yang sudah tercatat beserta height block-nya."""
+        index = self._indexed()
+        if index:
+            return index.find_transaction(tx_id)
+        for block in self.chain:
+            for tx in block.transactions:
+                if tx.id == tx_id:
+                    return tx.model_dump(), block.index
+        return None
+
+    def address_history(self, address: str, limit: int = 50, offset: int = 0) -> List[Tuple[Dict[str, Any], int]]:
+        """Transaksi yang melibatkan `address`, terbaru lebih dulu."""
+        index = self._indexed()
+        if index:
+            return index.address_history(address, limit, offset)
+        history = [
+            (tx.model_dump(), block.index)
+            for block in reversed(self.chain)
+            for tx in reversed(block.transactions)
+            if tx.sender == address or address in tx.recipients()
+        ]
+        return history[offset:offset + limit]
@@ -0,0 +1,61 @@
+# src/bloom.py
+import hashlib
+import math
+from typing import Any, Dict, Iterable, Optional
+from .config import BLOOM_MAX_BYTES, BLOOM_MAX_HASHES
+
+
+class BloomFilter:
+    """
+    Bloom filter sederhana untuk light client. Posisi bit diturunkan dari satu
+    SHA-256 per item (double hashing), sehingga node dan wallet menghasilkan
+    posisi yang sama tanpa dependensi tambahan.
+    """
+
+    def __init__(self, size_bits: int, num_hashes: int, bits: Optional[bytes] = None):
+        if size_bits <= 0 or num_hashes <= 0:
+            raise ValueError("Ukuran dan jumlah hash filter harus positif")
+        if size_bits > BLOOM_MAX_BYTES * 8 or num_hashes > BLOOM_MAX_HASHES:
+            raise ValueError("Filter terlalu besar")
+        self.size_bits = size_bits
+        self.num_hashes = num_hashes
+        nbytes = (size_bits + 7) // 8
+        if bits is not None and len(bits) != nbytes:
+            raise ValueError("Panjang bit array tidak sesuai ukuran filter")
+        self.bits = bytearray(bits) if bits is not None else bytearray(nbytes)
+
+    @classmethod
+    def for_capacity(cls, items: int, fp_rate: float) -> "BloomFilter":
+        """Ukuran optimal untuk `items` elemen dengan peluang false positive `fp_rate`."""
+        items = max(items, 1)
+        size = int(math.ceil(-items * math.log(fp_rate) / (math.log(2) ** 2)))
+        size = min(max(size, 8), BLOOM_MAX_BYTES * 8)
+        hashes = int(round(size / items * math.log(2)))
+        return cls(size, min(max(hashes, 1), BLOOM_MAX_HASHES))
+
+    def _positions(self, item: str):
+        digest = hashlib.sha256(item.encode("utf-8")).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:16], "big") | 1
+        return ((h1 + i * h2) % self.size_bits for i in range(self.num_hashes))
+
+    def add(self, item: str):
+        for pos in self._positions(item):
+            self.bits[pos // 8] |= 1 << (pos % 8)
+
+    def update(self, items: Iterable[str]):
+        for item in items:
+            self.add(item)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[pos // 8] & (1 << (pos % 8)) for pos in self._positions(item))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"size": self.size_bits, "hashes": self.num_hashes, "bits": self.bits.hex()}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BloomFilter":
+        try:
+            return cls(int(data["size"]), int(data["hashes"]), bytes.fromhex(data["bits"]))
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Format filter tidak valid: {e}")
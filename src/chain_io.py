@@ -0,0 +1,135 @@
+# src/chain_io.py
+"""
+Ekspor/impor chain dalam format NDJSON (satu block JSON per baris).
+Dipakai oleh endpoint streaming /blocks/stream dan /blocks/import, serta CLI:
+
+    python -m src.chain_io dump --node http://localhost:8001 -o chain.ndjson
+    python -m src.chain_io load chain.ndjson --node http://localhost:8002
+    python -m src.chain_io load chain.ndjson            # hanya verifikasi lokal
+"""
+import argparse
+import json
+import sys
+from typing import Iterable, Iterator, List, Union
+from .blockchain import Blockchain, Block
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def iter_ndjson(blocks: Iterable[Block]) -> Iterator[bytes]:
+    """Serialisasi block satu per satu; memori konstan berapapun panjang chain."""
+    for block in blocks:
+        yield (json.dumps(block.to_dict()) + "\n").encode("utf-8")
+
+
+def iter_lines(chunks: Iterable[Union[bytes, str]]) -> Iterator[str]:
+    """Gabungkan potongan byte (chunked transfer) menjadi baris utuh."""
+    buffer = ""
+    for chunk in chunks:
+        if isinstance(chunk, bytes):
+            chunk = chunk.decode("utf-8")
+        buffer += chunk
+        while "\n" in buffer:
+            line, buffer = buffer.split("\n", 1)
+            if line.strip():
+                yield line
+    if buffer.strip():
+        yield buffer
+
+
+class StreamImporter:
+    """
+    Validasi dan tambahkan block ke `blockchain` segera setelah setiap baris tiba.
+    Block yang sudah kita miliki (hash sama) dilewati; block pertama yang tidak
+    valid menghentikan impor dengan ValueError.
+    """
+
+    def __init__(self, blockchain: Blockchain):
+        self.blockchain = blockchain
+        self.added = 0
+        self.skipped = 0
+
+    def feed(self, line: Union[str, bytes]) -> Block:
+        block = Block.from_dict(json.loads(line))
+        chain = self.blockchain.chain
+        if block.index <= len(chain):
+            if chain[block.index - 1].hash != block.hash:
+                raise ValueError(f"Block #{block.index} tidak cocok dengan chain lokal (fork)")
+            self.skipped += 1
+            return block
+        if not self.blockchain.add_block(block):
+            raise ValueError(f"Block #{block.index} tidak valid atau tidak tersambung ke tip")
+        self.added += 1
+        return block
+
+    def finish(self):
+        """Verifikasi signature block yang dilewati jika impor berhenti sebelum checkpoint."""
+        if not self.blockchain.verify_deferred():
+            raise ValueError("Signature tidak valid di block di bawah checkpoint; chain dipotong")
+
+    def feed_all(self, lines: Iterable[Union[str, bytes]]) -> int:
+        for line in lines:
+            if line and line.strip():
+                self.feed(line)
+        self.finish()
+        return self.added
+
+
+# -----------------------------------
+# CLI
+# -----------------------------------
+def dump(node_url: str, output: str) -> int:
+    import requests
+    count = 0
+    with requests.get(f"{node_url.rstrip('/')}/blocks/stream", stream=True, timeout=30) as r:
+        r.raise_for_status()
+        with open(output, "w", encoding="utf-8") as f:
+            for line in iter_lines(r.iter_content(chunk_size=65536)):
+                f.write(line + "\n")
+                count += 1
+    return count
+
+
+def load(path: str, node_url: str = None) -> int:
+    if node_url:
+        import requests
+        with open(path, "rb") as f:
+            r = requests.post(
+                f"{node_url.rstrip('/')}/blocks/import", data=f,
+                headers={"Content-Type": NDJSON_MEDIA_TYPE}, timeout=300,
+            )
+        r.raise_for_status()
+        return r.json().get("added", 0)
+
+    # Verifikasi lokal: impor ke chain baru (genesis harus sama)
+    importer = StreamImporter(Blockchain())
+    with open(path, "r", encoding="utf-8") as f:
+        importer.feed_all(f)
+    return importer.added
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Dump/load chain dalam format NDJSON")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_dump = sub.add_parser("dump", help="Simpan chain dari node ke file")
+    p_dump.add_argument("--node", required=True, help="URL node, mis. http://localhost:8001")
+    p_dump.add_argument("-o", "--output", required=True)
+    p_load = sub.add_parser("load", help="Verifikasi file chain, atau kirim ke node dengan --node")
+    p_load.add_argument("path")
+    p_load.add_argument("--node", default=None)
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "dump":
+            count = dump(args.node, args.output)
+            print(f"✅ {count} block disimpan ke {args.output}")
+        else:
+            added = load(args.path, args.node)
+            print(f"✅ {added} block baru divalidasi dan ditambahkan")
+    except Exception as e:
+        print(f"❌ Gagal: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,4 +5,99 @@ COINBASE_AMOUNT = 50.0  # Reward miner
 NETWORK_TIMEOUT = 5      # detik untuk request ke peers
 # Kriptografi
 # Kurva ECDSA yang umum digunakan di blockchain
-ECDSA_CURVE = 'secp256k1'
\ No newline at end of file
+ECDSA_CURVE = 'secp256k1'
+# Mempool
+MEMPOOL_TX_MAX_AGE = 3600      # detik; transaksi pending lebih tua dari ini dibuang
+MEMPOOL_EVICT_INTERVAL = 60    # detik antar pemeriksaan kedaluwarsa
+MEMPOOL_COMPACT_EVERY = 500    # jumlah entri journal sebelum dipadatkan (compaction)
+# Admission control (rate limit & load shedding)
+CLIENT_RATE = 5.0              # token per detik per klien untuk /transactions/new
+CLIENT_BURST = 20
+PEER_RATE = 50.0               # token per detik per peer untuk /nodes/receive_*
+PEER_BURST = 200
+MAX_TX_BYTES = 65536           # ukuran maksimum payload transaksi (cukup untuk MAX_TX_OUTPUTS)
+MAX_TX_OUTPUTS = 256           # penerima maksimum per transaksi multi-output
+MAX_BLOCK_PAYLOAD_BYTES = 2_000_000
+VERIFY_QUEUE_SIZE = 64         # verifikasi yang boleh berjalan bersamaan
+VERIFY_PER_CLIENT = 4          # slot verifikasi maksimum per klien/peer
+PEER_BAN_THRESHOLD = 5         # jumlah payload invalid sebelum peer diblokir
+PEER_BAN_SECONDS = 600
+IMPORT_ALLOWED_HOSTS = "127.0.0.1,::1,localhost"  # klien yang boleh memakai POST /blocks/import
+# Peer manager
+PEER_MAX_FAILURES = 5          # gagal berturut-turut sebelum peer dihapus
+PEER_BACKOFF_BASE = 2.0        # detik, backoff eksponensial setelah gagal
+PEER_BACKOFF_MAX = 300.0
+PEER_POOL_SIZE = 4             # koneksi keep-alive per peer
+PEER_MAX_KNOWN = 64            # batas jumlah peer yang disimpan
+PEER_DISCOVERY_INTERVAL = 60   # detik antar pertukaran daftar peer
+PEER_LATENCY_ALPHA = 0.3       # bobot EWMA latency
+# Sinkronisasi (parallel block download)
+SYNC_CHUNK_SIZE = 50           # jumlah block per chunk yang diminta dari satu peer
+SYNC_PER_PEER_INFLIGHT = 2     # chunk yang boleh diminta bersamaan dari satu peer
+SYNC_CHUNK_TIMEOUT = 5.0       # detik sebelum chunk dialihkan ke peer lain
+SYNC_MAX_RANGE = 500           # batas block per response /blocks/range
+# Penyesuaian difficulty (retarget)
+TARGET_BLOCK_TIME = 10         # detik yang diinginkan antar block
+RETARGET_INTERVAL = 10         # target dihitung ulang setiap N block
+MAX_RETARGET_FACTOR = 4        # perubahan target maksimum per retarget
+MAX_FUTURE_BLOCK_TIME = 7200   # detik; timestamp block tidak boleh terlalu jauh di masa depan
+MEDIAN_TIME_SPAN = 11          # timestamp harus > median N block terakhir
+# Block template
+MAX_BLOCK_SIZE = 1_000_000     # byte total transaksi per block (di luar header)
+MAX_BLOCK_TXS = 2000           # jumlah transaksi per block (di luar coinbase)
+# Executor (pekerjaan CPU di luar event loop)
+VERIFY_THREADS = 4             # thread untuk verifikasi signature / block
+MINING_PROCESSES = 1           # proses untuk pencarian nonce (PoW)
+MINING_QUEUE_SIZE = 1          # mining yang boleh antre/berjalan bersamaan
+# Deployment multi-worker (satu writer, banyak reader)
+WRITER_TIMEOUT = 60.0          # detik; batas tunggu request yang diteruskan reader ke writer
+# Light client (Bloom filter)
+BLOOM_MAX_BYTES = 36_000       # ukuran maksimum bit array filter yang diterima node
+BLOOM_MAX_HASHES = 50
+LIGHT_FP_RATE = 0.001          # target false positive filter milik wallet
+LIGHT_MAX_FILTERS = 1000       # filter terdaftar yang disimpan node (LRU)
+# Profiling & tracing
+SLOW_OP_DEFAULT_MS = 500       # ambang log operasi lambat jika tidak ada ambang khusus
+SLOW_OP_THRESHOLDS_MS = {      # per trace ("mine") atau per span ("mine.pow")
+    "mine": 10_000,
+    "mine.pow": 10_000,
+    "resolve": 10_000,
+    "receive_block": 1_000,
+    "transactions.new": 200,
+}
+SLOW_OP_LOG_SIZE = 200         # entri operasi lambat yang disimpan di memori
+TRACE_BUFFER_SIZE = 200        # trace request terakhir yang disimpan
+PROFILE_SAMPLE_INTERVAL = 0.005  # detik antar sampel stack (mode sampling)
+PROFILE_TOP_N = 40             # jumlah fungsi teratas di hasil profil
+# Keystore & batch signing
+KEYSTORE_DIR = "data/keys"     # file kunci terenkripsi (satu JSON per wallet)
+KEYSTORE_SCRYPT_N = 2 ** 14    # biaya KDF scrypt untuk passphrase
+SIGN_PROCESSES = 0             # proses untuk batch signing (0 = jumlah CPU)
+SIGN_BATCH_MIN = 256           # batch lebih kecil dari ini ditandatangani di proses sendiri
+SIGN_CHUNK_SIZE = 500          # transaksi per tugas yang dikirim ke process pool
+# Genesis tetap (sama untuk seluruh jaringan, timestamp 0, tanpa transaksi)
+GENESIS_BLOCKS = {             # difficulty awal -> (nonce, hash); diverifikasi sekali per proses
+    1: (7, "095087f02a075bcbfe622bd309483427b57bb6b5596380c6ca76565fe837e4ec"),
+    2: (1160, "0010247f5a4ebed2461c5909ff0d3335e8c1c6702bda6fa6987ecb6fce556eac"),
+    3: (1254, "000fa46fb6e5a2741300b1fec275cdf8ad88dac34ca49e8d6012cc8d622c36c0"),
+    4: (137562, "000074c31e446b53b41c98efa2a1e0ccc25a4d1296c1eadf918df58c32aa3687"),
+    5: (248948, "0000098e78f150bcd139b32b024f0e24458ec28c3b7eed239060bd56e591a483"),
+}
+STARTUP_BUDGET = 3.0           # detik; target waktu sampai /blocks pertama kali merespons
+# Checkpoint assume-valid (sync)
+CHECKPOINTS = {}               # height -> hash block; di bawahnya signature historis tidak diverifikasi ulang
+FULL_VERIFY = False            # True = selalu verifikasi semua signature (abaikan assume-valid)
+# HTTP caching & kompresi
+HTTP_CACHE_ENTRIES = 1024      # body respons (per endpoint + parameter) yang disimpan
+COMPRESS_MIN_SIZE = 1024       # byte; respons lebih kecil tidak dikompresi
+# Query saldo batch
+BALANCES_MAX_ADDRESSES = 1000  # alamat per request POST /balances
+ACCOUNT_STATE_CACHE = 100_000  # state alamat (saldo + aktivitas terakhir) yang di-cache per tip
+# Analitik chain (/stats)
+STATS_MAX_BLOCKS = 1000        # jendela block maksimum untuk /stats/throughput & /stats/miners
+STATS_MAX_TOP = 100            # alamat maksimum di /stats/top-holders
+STATS_MAX_BINS = 100           # bin histogram maksimum di /stats/tx-sizes
+# Mining: deteksi pekerjaan basi & block pesaing
+MINING_CHUNK_NONCES = 50_000   # nonce per potongan PoW; tip chain dicek di antara potongan
+SIDE_BLOCKS_MAX = 500          # block pesaing/terlepas (side block) yang disimpan untuk statistik
+STALE_WINDOW = 100             # jumlah block terakhir untuk menghitung stale rate jaringan
@@ -0,0 +1,81 @@
+# src/executors.py
+import asyncio
+import threading
+from contextlib import contextmanager
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Callable, Optional
+from .admission import AdmissionError
+from .profiling import profiled_call
+from .config import VERIFY_THREADS, VERIFY_QUEUE_SIZE, MINING_PROCESSES, MINING_QUEUE_SIZE
+
+
+class BoundedExecutor:
+    """
+    Executor dengan antrian terbatas untuk pekerjaan CPU dari handler async.
+    Jika jumlah pekerjaan yang antre + berjalan sudah mencapai `max_pending`,
+    pekerjaan baru langsung ditolak (429) alih-alih menumpuk tanpa batas.
+    Executor dibuat saat pertama kali dipakai.
+    """
+
+    def __init__(self, factory: Callable[[], Executor], max_pending: int, name: str, profile: bool = False):
+        self._factory = factory
+        # Hanya untuk thread pool: pekerjaan ikut diprofil saat sesi cProfile aktif
+        self.profile = profile
+        self._executor: Optional[Executor] = None
+        self._sem = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self.max_pending = max_pending
+        self.name = name
+        self.pending = 0
+
+    @property
+    def executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._factory()
+            return self._executor
+
+    @contextmanager
+    def reserve(self):
+        """Tahan satu slot untuk beberapa `submit` berurutan (mis. PoW per potongan nonce)."""
+        if not self._sem.acquire(blocking=False):
+            raise AdmissionError(429, f"{self.name} queue is full, retry later", retry_after=1.0)
+        self.pending += 1
+        try:
+            yield self
+        finally:
+            self.pending -= 1
+            self._sem.release()
+
+    async def submit(self, fn: Callable, *args):
+        """Jalankan di executor tanpa mengambil slot; panggil di dalam `reserve()`."""
+        loop = asyncio.get_running_loop()
+        if self.profile:
+            return await loop.run_in_executor(self.executor, profiled_call, fn, *args)
+        return await loop.run_in_executor(self.executor, fn, *args)
+
+    async def run(self, fn: Callable, *args):
+        with self.reserve():
+            return await self.submit(fn, *args)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def stats(self) -> dict:
+        return {"pending": self.pending, "max_pending": self.max_pending}
+
+
+# Verifikasi signature / block: thread pool (ecdsa melepas event loop, bukan GIL)
+VERIFY_EXECUTOR = BoundedExecutor(
+    lambda: ThreadPoolExecutor(max_workers=VERIFY_THREADS, thread_name_prefix="verify"),
+    VERIFY_QUEUE_SIZE, "verification", profile=True,
+)
+
+# Pencarian nonce: process pool agar PoW tidak berebut GIL dengan request lain
+MINING_EXECUTOR = BoundedExecutor(
+    lambda: ProcessPoolExecutor(max_workers=MINING_PROCESSES),
+    MINING_QUEUE_SIZE, "mining",
+)
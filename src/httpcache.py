@@ -0,0 +1,116 @@
+# src/httpcache.py
+"""
+Cache respons JSON untuk endpoint baca yang sering di-poll (/blocks, /mempool,
+/balance). Setiap respons diberi versi state (hash tip chain atau versi mempool):
+
+- ETag kuat diturunkan dari versi tersebut; klien yang mengirim If-None-Match
+  yang sama mendapat 304 tanpa body.
+- Body JSON diserialisasi sekali per versi dan disimpan beserta hasil kompresinya
+  (gzip, atau brotli jika paket `brotli` terpasang), jadi poll berulang tidak
+  menyentuh chain sama sekali.
+- Entri untuk versi lama otomatis diganti saat tip/mempool berubah.
+"""
+import gzip
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+from starlette.requests import Request
+from starlette.responses import Response
+from .config import HTTP_CACHE_ENTRIES, COMPRESS_MIN_SIZE
+
+try:
+    import brotli
+except ImportError:  # opsional; tanpa brotli hanya gzip yang dipakai
+    brotli = None
+
+
+class CachedBody:
+    def __init__(self, etag: str, body: bytes):
+        self.etag = etag
+        self.body = body
+        self._encoded: Dict[str, bytes] = {}
+
+    def encoded(self, encoding: str) -> bytes:
+        data = self._encoded.get(encoding)
+        if data is None:
+            if encoding == "br":
+                data = brotli.compress(self.body, quality=5)
+            else:
+                data = gzip.compress(self.body, compresslevel=6, mtime=0)
+            self._encoded[encoding] = data
+        return data
+
+
+def make_etag(key: Tuple, version: Any) -> str:
+    digest = hashlib.sha256(repr((key, version)).encode()).hexdigest()[:32]
+    return f'"{digest}"'
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    accepted = {part.split(";")[0].strip().lower() for part in accept_encoding.split(",")}
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def if_none_match(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match", "")
+    return header.strip() == "*" or etag in (tag.strip() for tag in header.split(","))
+
+
+class ResponseCache:
+    """LRU per endpoint/parameter; setiap kunci hanya menyimpan body untuk versi terbaru."""
+
+    def __init__(self, max_entries: int = HTTP_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, Tuple[Any, CachedBody]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def get(self, key: Tuple, version: Any, build: Callable[[], Any]) -> CachedBody:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        # Serialisasi di luar lock; dua request bersamaan paling buruk membangun dua kali
+        body = json.dumps(build(), separators=(",", ":")).encode()
+        cached = CachedBody(make_etag(key, version), body)
+        with self._lock:
+            self._entries[key] = (version, cached)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return cached
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def respond(self, request: Request, key: Tuple, version: Any, build: Callable[[], Any]) -> Response:
+        """Respons JSON dengan ETag, 304 untuk If-None-Match yang cocok, dan kompresi."""
+        etag = make_etag(key, version)
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        if if_none_match(request, etag):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        cached = self.get(key, version, build)
+        body = cached.body
+        encoding = choose_encoding(request.headers.get("accept-encoding", ""))
+        if encoding and len(body) >= COMPRESS_MIN_SIZE:
+            body = cached.encoded(encoding)
+            headers["Content-Encoding"] = encoding
+        return Response(body, media_type="application/json", headers=headers)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses,
+                    "not_modified": self.not_modified, "brotli": brotli is not None}
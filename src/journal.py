@@ -0,0 +1,99 @@
+# src/journal.py
+import json
+import os
+from typing import Any, Dict, List, Iterable, Optional, Tuple
+from .config import MEMPOOL_COMPACT_EVERY
+
+
+class MempoolJournal:
+    """
+    Log append-only (satu JSON per baris) untuk transaksi mempool.
+    Setiap transaksi yang diterima ditulis sebagai entri "add", dan setiap
+    transaksi yang keluar (ditambang / kedaluwarsa) sebagai entri "remove".
+    Journal dipadatkan secara berkala agar ukurannya tetap terbatas.
+    """
+
+    def __init__(self, path: str, compact_every: int = MEMPOOL_COMPACT_EVERY, fsync: bool = False):
+        self.path = path
+        self.compact_every = compact_every
+        self.fsync = fsync
+        self._entries_since_compact = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+    # -----------------------------------
+    # Tulis entri
+    # -----------------------------------
+    def _write(self, entries: Iterable[Dict[str, Any]]):
+        with open(self.path, "a", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry, sort_keys=True) + "\n")
+                self._entries_since_compact += 1
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+
+    @staticmethod
+    def _add_entry(tx: Any, admitted: Optional[float]) -> Dict[str, Any]:
+        entry = {"op": "add", "tx": tx.model_dump()}
+        if admitted is not None:
+            entry["admitted"] = admitted
+        return entry
+
+    def append_add(self, tx: Any, admitted: Optional[float] = None):
+        """admitted: waktu lokal saat transaksi diterima (dasar kedaluwarsa setelah restart)."""
+        self._write([self._add_entry(tx, admitted)])
+
+    def append_remove(self, tx_ids: List[str]):
+        if tx_ids:
+            self._write([{"op": "remove", "ids": list(tx_ids)}])
+
+    # -----------------------------------
+    # Baca ulang (restart recovery)
+    # -----------------------------------
+    def replay(self) -> List[Tuple[Dict[str, Any], Optional[float]]]:
+        """
+        Kembalikan pasangan (dict transaksi, waktu diterima) yang masih pending, urut
+        sesuai waktu masuk. Waktu diterima None untuk entri lama tanpa field "admitted".
+        """
+        pending: Dict[str, Tuple[Dict[str, Any], Optional[float]]] = {}
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Baris terakhir bisa terpotong jika node crash saat menulis
+                    continue
+                op = entry.get("op")
+                if op == "add" and isinstance(entry.get("tx"), dict):
+                    tx = entry["tx"]
+                    if tx.get("id"):
+                        admitted = entry.get("admitted")
+                        pending[tx["id"]] = (tx, admitted if isinstance(admitted, (int, float)) else None)
+                elif op == "remove":
+                    for tx_id in entry.get("ids", []):
+                        pending.pop(tx_id, None)
+        return list(pending.values())
+
+    # -----------------------------------
+    # Compaction
+    # -----------------------------------
+    def needs_compaction(self) -> bool:
+        return self._entries_since_compact >= self.compact_every
+
+    def compact(self, txs: List[Any], admitted: Optional[Dict[str, float]] = None):
+        """Tulis ulang journal hanya berisi transaksi yang masih pending (atomic replace)."""
+        admitted = admitted or {}
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for tx in txs:
+                f.write(json.dumps(self._add_entry(tx, admitted.get(tx.id)), sort_keys=True) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._entries_since_compact = 0
@@ -0,0 +1,392 @@
+# src/keystore.py
+"""
+Keystore wallet untuk pengirim bervolume tinggi (faucet, exchange, load test).
+
+- File kunci dienkripsi dengan passphrase (scrypt + AES-GCM, butuh `cryptography`)
+  dan hanya didekripsi sekali saat `unlock`; signer per alamat disimpan di
+  instance KeyStore dan dibuang lagi oleh `lock`/`close`.
+- `sign_batch` menandatangani banyak transaksi sekaligus. Batch besar dibagi
+  per chunk ke process pool; worker mem-parse kunci sekali per chunk.
+- Backend signing: "ecdsa" (default library node) atau "cryptography"
+  (OpenSSL, jauh lebih cepat). "auto" memilih cryptography jika terpasang.
+  `deterministic=True` memakai nonce RFC 6979 (backend ecdsa) sehingga
+  signing tidak bergantung pada RNG sistem.
+
+    python -m src.keystore create faucet --dir data/keys
+    python -m src.keystore list --dir data/keys
+    python -m src.keystore bench --count 5000 --backend auto
+"""
+import argparse
+import binascii
+import getpass
+import hashlib
+import json
+import os
+import secrets
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional
+from .wallet import Wallet, load_signing_key
+from .config import (
+    KEYSTORE_DIR, KEYSTORE_SCRYPT_N, SIGN_PROCESSES, SIGN_BATCH_MIN, SIGN_CHUNK_SIZE,
+)
+
+KEYFILE_VERSION = 1
+BACKENDS = ("auto", "ecdsa", "cryptography")
+
+
+def has_cryptography() -> bool:
+    try:
+        import cryptography  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def resolve_backend(backend: str = "auto", deterministic: bool = False) -> str:
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend signing tidak dikenal: {backend}")
+    if backend == "auto":
+        # Nonce deterministik (RFC 6979) hanya didukung backend ecdsa
+        return "cryptography" if has_cryptography() and not deterministic else "ecdsa"
+    if backend == "cryptography":
+        if not has_cryptography():
+            raise RuntimeError("Backend 'cryptography' butuh paket cryptography (pip install cryptography)")
+        if deterministic:
+            raise ValueError("Nonce deterministik hanya tersedia untuk backend 'ecdsa'")
+    return backend
+
+
+# -----------------------------------
+# Signer (dipakai juga di worker process)
+# -----------------------------------
+class _EcdsaSigner:
+    def __init__(self, private_key_hex: str, deterministic: bool = False):
+        self._sk = load_signing_key(private_key_hex)
+        self.deterministic = deterministic
+
+    def sign(self, message_hash: str) -> str:
+        message = binascii.unhexlify(message_hash)
+        if self.deterministic:
+            sig = self._sk.sign_deterministic(message, hashfunc=hashlib.sha256)
+        else:
+            sig = self._sk.sign(message, hashfunc=hashlib.sha256)
+        return binascii.hexlify(sig).decode()
+
+
+class _CryptographySigner:
+    """Signature r||s (64 byte) yang sama formatnya dengan Wallet.sign."""
+
+    def __init__(self, private_key_hex: str):
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.asymmetric import ec
+        from cryptography.hazmat.primitives.asymmetric.utils import decode_dss_signature
+        self._key = ec.derive_private_key(int(private_key_hex, 16), ec.SECP256K1())
+        self._algorithm = ec.ECDSA(hashes.SHA256())
+        self._decode = decode_dss_signature
+
+    def sign(self, message_hash: str) -> str:
+        r, s = self._decode(self._key.sign(binascii.unhexlify(message_hash), self._algorithm))
+        return (r.to_bytes(32, "big") + s.to_bytes(32, "big")).hex()
+
+
+def make_signer(private_key_hex: str, backend: str = "ecdsa", deterministic: bool = False):
+    """Signer untuk satu kunci; backend sudah di-resolve (lihat resolve_backend)."""
+    if backend == "cryptography":
+        return _CryptographySigner(private_key_hex)
+    return _EcdsaSigner(private_key_hex, deterministic)
+
+
+def sign_hashes(private_key_hex: str, hashes: List[str], backend: str = "ecdsa",
+                deterministic: bool = False) -> List[str]:
+    """Tanda tangani daftar hash dengan satu kunci. Level modul agar bisa dijalankan di process pool."""
+    signer = make_signer(private_key_hex, backend, deterministic)
+    return [signer.sign(h) for h in hashes]
+
+
+# -----------------------------------
+# File kunci terenkripsi
+# -----------------------------------
+def _derive_key(passphrase: str, salt: bytes, n: int) -> bytes:
+    from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
+    return Scrypt(salt=salt, length=32, n=n, r=8, p=1).derive(passphrase.encode("utf-8"))
+
+
+def encrypt_key(private_key_hex: str, passphrase: str, n: int = KEYSTORE_SCRYPT_N) -> Dict[str, Any]:
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+    address = Wallet(private_key_hex=private_key_hex).public_key_hex
+    salt, nonce = secrets.token_bytes(16), secrets.token_bytes(12)
+    ciphertext = AESGCM(_derive_key(passphrase, salt, n)).encrypt(
+        nonce, binascii.unhexlify(private_key_hex), address.encode()
+    )
+    return {
+        "version": KEYFILE_VERSION,
+        "address": address,
+        "kdf": {"name": "scrypt", "n": n, "r": 8, "p": 1, "salt": salt.hex()},
+        "cipher": {"name": "aes-256-gcm", "nonce": nonce.hex()},
+        "ciphertext": ciphertext.hex(),
+    }
+
+
+def decrypt_key(keyfile: Dict[str, Any], passphrase: str) -> str:
+    from cryptography.exceptions import InvalidTag
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+    if keyfile.get("version") != KEYFILE_VERSION:
+        raise ValueError(f"Versi file kunci tidak didukung: {keyfile.get('version')}")
+    kdf = keyfile["kdf"]
+    key = _derive_key(passphrase, bytes.fromhex(kdf["salt"]), kdf["n"])
+    try:
+        # Alamat ikut diautentikasi (AAD): file yang diubah tidak bisa didekripsi
+        raw = AESGCM(key).decrypt(
+            bytes.fromhex(keyfile["cipher"]["nonce"]), bytes.fromhex(keyfile["ciphertext"]),
+            keyfile["address"].encode(),
+        )
+    except InvalidTag:
+        raise ValueError("Passphrase salah atau file kunci rusak")
+    return raw.hex()
+
+
+# -----------------------------------
+# Keystore
+# -----------------------------------
+class KeyStore:
+    def __init__(self, directory: str = KEYSTORE_DIR, backend: str = "auto",
+                 deterministic: bool = False, processes: int = SIGN_PROCESSES):
+        self.directory = directory
+        self.backend = resolve_backend(backend, deterministic)
+        self.deterministic = deterministic
+        self.processes = processes or os.cpu_count() or 1
+        self._keys: Dict[str, str] = {}        # alamat -> kunci privat HEX (sudah di-unlock)
+        self._signers: Dict[str, Any] = {}     # alamat -> signer (kunci sudah di-parse)
+        self._names: Dict[str, str] = {}       # nama -> alamat
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _path(self, name: str) -> str:
+        if not name or os.sep in name or name.startswith("."):
+            raise ValueError(f"Nama wallet tidak valid: {name!r}")
+        return os.path.join(self.directory, f"{name}.json")
+
+    def names(self) -> List[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(f[:-5] for f in os.listdir(self.directory) if f.endswith(".json"))
+
+    def read_keyfile(self, name: str) -> Dict[str, Any]:
+        with open(self._path(name), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def save(self, name: str, private_key_hex: str, passphrase: str) -> str:
+        """Simpan kunci terenkripsi (tidak menimpa file yang sudah ada). Mengembalikan alamat."""
+        path = self._path(name)
+        os.makedirs(self.directory, exist_ok=True)
+        keyfile = encrypt_key(private_key_hex, passphrase)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(keyfile, f, indent=2)
+        self._remember(name, private_key_hex, keyfile["address"])
+        return keyfile["address"]
+
+    def create(self, name: str, passphrase: str) -> str:
+        return self.save(name, Wallet().private_key_hex, passphrase)
+
+    def unlock(self, name: str, passphrase: str) -> str:
+        """Dekripsi kunci sekali dan simpan di memori. Mengembalikan alamat."""
+        if name in self._names:
+            return self._names[name]
+        keyfile = self.read_keyfile(name)
+        self._remember(name, decrypt_key(keyfile, passphrase), keyfile["address"])
+        return keyfile["address"]
+
+    def add_key(self, private_key_hex: str, name: Optional[str] = None) -> str:
+        """Daftarkan kunci yang sudah ada di memori (mis. wallet load test) tanpa file."""
+        address = Wallet(private_key_hex=private_key_hex).public_key_hex
+        self._remember(name or address, private_key_hex, address)
+        return address
+
+    def _remember(self, name: str, private_key_hex: str, address: str):
+        self._keys[address] = private_key_hex
+        self._names[name] = address
+
+    def lock(self, name: str):
+        """Lupakan kunci (dan signer-nya) jika tidak ada nama lain yang memakainya."""
+        address = self._names.pop(name, None)
+        if address and address not in self._names.values():
+            self._keys.pop(address, None)
+            self._signers.pop(address, None)
+
+    def address(self, name: str) -> str:
+        if name not in self._names:
+            raise KeyError(f"Wallet '{name}' belum di-unlock")
+        return self._names[name]
+
+    def wallet(self, name_or_address: str) -> Wallet:
+        address = self._names.get(name_or_address, name_or_address)
+        if address not in self._keys:
+            raise KeyError(f"Wallet '{name_or_address}' belum di-unlock")
+        return Wallet(private_key_hex=self._keys[address])
+
+    # -----------------------------------
+    # Signing
+    # -----------------------------------
+    def _private_key_for(self, tx) -> str:
+        try:
+            return self._keys[tx.sender]
+        except KeyError:
+            raise KeyError(f"Tidak ada kunci ter-unlock untuk pengirim {tx.sender[:16]}…")
+
+    def _signer_for(self, tx):
+        signer = self._signers.get(tx.sender)
+        if signer is None:
+            signer = make_signer(self._private_key_for(tx), self.backend, self.deterministic)
+            self._signers[tx.sender] = signer
+        return signer
+
+    def sign(self, tx):
+        self._apply(tx, self._signer_for(tx).sign(tx.get_signing_hash()))
+        return tx
+
+    def sign_batch(self, txs: Iterable[Any]) -> List[Any]:
+        """
+        Tanda tangani transaksi (boleh dari banyak pengirim; kunci dicari dari tx.sender).
+        Batch kecil ditandatangani langsung, batch besar dibagi ke process pool.
+        """
+        txs = list(txs)
+        if len(txs) < SIGN_BATCH_MIN or self.processes <= 1:
+            for tx in txs:
+                self.sign(tx)
+            return txs
+
+        by_key: Dict[str, List[Any]] = {}
+        for tx in txs:
+            by_key.setdefault(self._private_key_for(tx), []).append(tx)
+        pool = self._executor()
+        jobs = []
+        for private_key_hex, group in by_key.items():
+            for i in range(0, len(group), SIGN_CHUNK_SIZE):
+                chunk = group[i:i + SIGN_CHUNK_SIZE]
+                future = pool.submit(
+                    sign_hashes, private_key_hex, [tx.get_signing_hash() for tx in chunk],
+                    self.backend, self.deterministic,
+                )
+                jobs.append((chunk, future))
+        for chunk, future in jobs:
+            for tx, signature in zip(chunk, future.result()):
+                self._apply(tx, signature)
+        return txs
+
+    @staticmethod
+    def _apply(tx, signature: str):
+        tx.signature = signature
+        tx.id = tx.get_signing_hash()
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.processes)
+        return self._pool
+
+    def close(self):
+        """Hentikan process pool dan buang semua kunci yang di-unlock dari memori."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        self._keys.clear()
+        self._names.clear()
+        self._signers.clear()
+
+
+# -----------------------------------
+# CLI: kelola kunci & benchmark throughput
+# -----------------------------------
+def _passphrase(confirm: bool = False) -> str:
+    value = os.environ.get("KEYSTORE_PASSPHRASE")
+    if value:
+        return value
+    value = getpass.getpass("Passphrase: ")
+    if confirm and getpass.getpass("Ulangi passphrase: ") != value:
+        raise SystemExit("❌ Passphrase tidak sama")
+    return value
+
+
+def bench(count: int, wallets: int, backend: str, processes: int, deterministic: bool) -> Dict[str, float]:
+    """Bandingkan throughput (tx/detik) Wallet.sign biasa, keystore in-process dan batch pool."""
+    from .tx import Transaction
+    store = KeyStore(backend=backend, deterministic=deterministic, processes=processes)
+    keys = [Wallet().private_key_hex for _ in range(wallets)]
+    senders = [store.add_key(k) for k in keys]
+
+    def make_txs():
+        now = time.time()
+        return [Transaction(sender=senders[i % wallets], recipient="bench", amount=1.0, timestamp=now + i)
+                for i in range(count)]
+
+    results = {}
+    txs = make_txs()
+    start = time.perf_counter()
+    for i, tx in enumerate(txs):
+        # Cara lama: kunci di-parse ulang dari hex untuk setiap transaksi
+        tx.sign(Wallet(private_key_hex=keys[i % wallets]))
+    results["wallet_sign"] = count / (time.perf_counter() - start)
+
+    txs = make_txs()
+    start = time.perf_counter()
+    for tx in txs:
+        store.sign(tx)
+    results["keystore_sign"] = count / (time.perf_counter() - start)
+
+    txs = make_txs()
+    store._executor().submit(int).result()  # start worker di luar pengukuran
+    start = time.perf_counter()
+    store.sign_batch(txs)
+    results["sign_batch"] = count / (time.perf_counter() - start)
+    store.close()
+
+    if not all(tx.validate_tx() for tx in txs[:50]):
+        raise SystemExit("❌ Signature hasil batch tidak valid")
+    return {k: round(v, 1) for k, v in results.items()}
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Keystore wallet terenkripsi & batch signing")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name in ("create", "import"):
+        p = sub.add_parser(name)
+        p.add_argument("name")
+        p.add_argument("--dir", default=KEYSTORE_DIR)
+        if name == "import":
+            p.add_argument("--key-file", required=True, help="file berisi kunci privat HEX")
+    p = sub.add_parser("list")
+    p.add_argument("--dir", default=KEYSTORE_DIR)
+    p = sub.add_parser("bench")
+    p.add_argument("--count", type=int, default=5000)
+    p.add_argument("--wallets", type=int, default=4)
+    p.add_argument("--backend", choices=BACKENDS, default="auto")
+    p.add_argument("--processes", type=int, default=SIGN_PROCESSES)
+    p.add_argument("--deterministic", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.command == "bench":
+        backend = resolve_backend(args.backend, args.deterministic)
+        results = bench(args.count, args.wallets, args.backend, args.processes, args.deterministic)
+        print(f"🔏 {args.count} transaksi, {args.wallets} wallet, backend {backend}")
+        for name, rate in results.items():
+            print(f"  {name:<14} {rate:>10.1f} tx/s")
+        return results
+
+    store = KeyStore(args.dir)
+    if args.command == "list":
+        for name in store.names():
+            print(f"{name}: {store.read_keyfile(name)['address']}")
+        return None
+    if args.command == "create":
+        address = store.create(args.name, _passphrase(confirm=True))
+    else:
+        with open(args.key_file, "r") as f:
+            address = store.save(args.name, f.read().strip(), _passphrase(confirm=True))
+    print(f"✅ Wallet '{args.name}' disimpan di {store._path(args.name)}")
+    print(f"- alamat: {address}")
+    return address
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
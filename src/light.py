@@ -0,0 +1,227 @@
+# src/light.py
+"""
+Mode light client: wallet mendaftarkan Bloom filter berisi alamatnya, lalu node
+hanya mengirim header block ditambah transaksi yang cocok dengan filter beserta
+merkle proof-nya. Bandwidth wallet sebanding dengan aktivitasnya sendiri
+(ditambah header), bukan dengan isi seluruh chain.
+"""
+import secrets
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+from .bloom import BloomFilter
+from .tx import Transaction
+from .utils import (
+    hash_data, hash_meets_target, difficulty_to_target, target_to_hex, retarget,
+    merkle_proof, verify_merkle_proof,
+)
+from .config import (
+    LIGHT_FP_RATE, LIGHT_MAX_FILTERS, SYNC_MAX_RANGE, TARGET_BLOCK_TIME, RETARGET_INTERVAL,
+    MAX_RETARGET_FACTOR,
+)
+
+
+# -----------------------------------
+# Sisi node
+# -----------------------------------
+def tx_matches(tx: Transaction, bloom: BloomFilter) -> bool:
+    return tx.id in bloom or tx.sender in bloom or any(addr in bloom for addr in tx.recipients())
+
+
+def filtered_block(block, bloom: BloomFilter) -> List[Dict[str, Any]]:
+    """Transaksi block yang cocok dengan filter, masing-masing dengan merkle proof."""
+    positions = [i for i, tx in enumerate(block.transactions) if tx_matches(tx, bloom)]
+    if not positions:
+        return []
+    # Block lama tanpa merkle root: transaksi sudah ada di header, proof tidak diperlukan
+    leaves = block.tx_leaves() if block.merkle_root else None
+    return [{
+        "block": block.index,
+        "position": i,
+        "transaction": block.transactions[i].model_dump(),
+        "proof": merkle_proof(leaves, i) if leaves else None,
+    } for i in positions]
+
+
+def light_sync(blockchain, bloom: BloomFilter, start: int, count: int) -> Dict[str, Any]:
+    blocks = blockchain.get_blocks(start, max(0, min(count, SYNC_MAX_RANGE)))
+    return {
+        "headers": [b.header() for b in blocks],
+        "matches": [m for b in blocks for m in filtered_block(b, bloom)],
+        "height": blockchain.height,
+    }
+
+
+class FilterRegistry:
+    """Filter yang didaftarkan wallet, disimpan di memori dengan batas LRU."""
+
+    def __init__(self, capacity: int = LIGHT_MAX_FILTERS):
+        self.capacity = capacity
+        self._filters: "OrderedDict[str, BloomFilter]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def register(self, bloom: BloomFilter) -> str:
+        filter_id = secrets.token_hex(16)
+        with self._lock:
+            self._filters[filter_id] = bloom
+            while len(self._filters) > self.capacity:
+                self._filters.popitem(last=False)
+        return filter_id
+
+    def get(self, filter_id: str) -> Optional[BloomFilter]:
+        with self._lock:
+            bloom = self._filters.get(filter_id)
+            if bloom is not None:
+                self._filters.move_to_end(filter_id)
+            return bloom
+
+    def remove(self, filter_id: str):
+        with self._lock:
+            self._filters.pop(filter_id, None)
+
+
+# -----------------------------------
+# Sisi wallet
+# -----------------------------------
+class LightClient:
+    """
+    Wallet ringan: memverifikasi rantai header (hash, PoW, sambungan, target sesuai
+    aturan retarget) dan merkle proof setiap transaksi yang diterima, lalu
+    menghitung saldo alamatnya sendiri.
+    False positive dari Bloom filter dibuang secara lokal.
+    `session` boleh berupa requests.Session atau klien lain dengan get/post serupa.
+    """
+
+    def __init__(self, node_url: str, addresses: Iterable[str], fp_rate: float = LIGHT_FP_RATE,
+                 session=None, genesis_hash: Optional[str] = None,
+                 retarget_interval: int = RETARGET_INTERVAL, target_block_time: float = TARGET_BLOCK_TIME):
+        import requests
+        self.node_url = node_url.rstrip("/")
+        self.addresses = set(addresses)
+        self.session = session or requests.Session()
+        self.genesis_hash = genesis_hash
+        # Aturan retarget harus sama dengan node (Blockchain.next_target)
+        self.retarget_interval = retarget_interval
+        self.target_block_time = target_block_time
+        self.bloom = BloomFilter.for_capacity(len(self.addresses), fp_rate)
+        self.bloom.update(self.addresses)
+        self.filter_id: Optional[str] = None
+        self.bytes_received = 0
+        self.reset()
+
+    def reset(self):
+        self.headers: List[Dict[str, Any]] = []
+        self.history: List[Dict[str, Any]] = []
+        self.balances: Dict[str, float] = {a: 0.0 for a in self.addresses}
+
+    @property
+    def height(self) -> int:
+        return len(self.headers)
+
+    def balance(self, address: str) -> float:
+        return self.balances.get(address, 0.0)
+
+    # -----------------------------------
+    # Jaringan
+    # -----------------------------------
+    def register(self) -> str:
+        r = self.session.post(f"{self.node_url}/light/filter", json={"filter": self.bloom.to_dict()}, timeout=10)
+        r.raise_for_status()
+        self.filter_id = r.json()["filter_id"]
+        return self.filter_id
+
+    def sync(self) -> int:
+        """Ambil header & transaksi baru sampai tip node. Mengembalikan jumlah header baru."""
+        if not self.filter_id:
+            self.register()
+        added = 0
+        while True:
+            r = self.session.get(
+                f"{self.node_url}/light/sync",
+                params={"filter_id": self.filter_id, "start": self.height + 1, "count": SYNC_MAX_RANGE},
+                timeout=30,
+            )
+            if r.status_code == 404:
+                # Node restart / filter terbuang dari LRU: daftar ulang
+                self.register()
+                continue
+            r.raise_for_status()
+            self.bytes_received += len(r.content)
+            payload = r.json()
+            headers = payload.get("headers", [])
+            if headers and self.headers and headers[0]["previous_hash"] != self.headers[-1]["hash"]:
+                # Reorg di node: ulangi dari awal
+                self.reset()
+                added = 0
+                continue
+            added += self.apply(payload)
+            if not headers or self.height >= payload.get("height", 0):
+                return added
+
+    # -----------------------------------
+    # Verifikasi
+    # -----------------------------------
+    def apply(self, payload: Dict[str, Any]) -> int:
+        headers = payload.get("headers", [])
+        for header in headers:
+            self._verify_header(header)
+            self.headers.append(header)
+        for match in payload.get("matches", []):
+            self._apply_match(match)
+        return len(headers)
+
+    @staticmethod
+    def _header_target(header: Dict[str, Any]) -> int:
+        return int(header["target"], 16) if header.get("target") else difficulty_to_target(header["difficulty"])
+
+    def expected_target(self) -> int:
+        """Target header berikutnya dihitung dari header yang sudah diverifikasi (lihat Blockchain.next_target)."""
+        length = len(self.headers)
+        prev_target = self._header_target(self.headers[-1])
+        interval = self.retarget_interval
+        if length % interval != 0 or length <= interval:
+            return prev_target
+        actual = self.headers[-1]["timestamp"] - self.headers[length - interval - 1]["timestamp"]
+        return retarget(prev_target, actual, interval * self.target_block_time, MAX_RETARGET_FACTOR)
+
+    def _verify_header(self, header: Dict[str, Any]):
+        data = dict(header)
+        claimed = data.pop("hash", "")
+        if hash_data(data) != claimed:
+            raise ValueError(f"Hash header #{header.get('index')} tidak valid")
+        # Target yang diklaim header tidak dipercaya: harus sama dengan hasil retarget lokal
+        if self.headers and header.get("target") != target_to_hex(self.expected_target()):
+            raise ValueError(f"Target header #{header['index']} tidak sesuai aturan retarget")
+        target = self._header_target(header)
+        if not hash_meets_target(claimed, target):
+            raise ValueError(f"PoW header #{header['index']} tidak valid")
+        if header["index"] != self.height + 1:
+            raise ValueError(f"Header #{header['index']} tidak berurutan")
+        if self.headers:
+            if header["previous_hash"] != self.headers[-1]["hash"]:
+                raise ValueError(f"Header #{header['index']} tidak tersambung")
+        elif self.genesis_hash and claimed != self.genesis_hash:
+            raise ValueError("Genesis berbeda")
+
+    def _apply_match(self, match: Dict[str, Any]):
+        index = match["block"]
+        if not 1 <= index <= self.height:
+            raise ValueError(f"Transaksi untuk block #{index} yang headernya belum diterima")
+        header = self.headers[index - 1]
+        tx_data = match["transaction"]
+        if header.get("merkle_root"):
+            if not verify_merkle_proof(hash_data(tx_data), match.get("proof") or [], header["merkle_root"]):
+                raise ValueError(f"Merkle proof transaksi di block #{index} tidak valid")
+        elif tx_data not in header.get("transactions", []):
+            raise ValueError(f"Transaksi tidak ada di block #{index}")
+
+        tx = Transaction(**tx_data)
+        credits = tx.credits()
+        if tx.sender not in self.addresses and not any(addr in self.addresses for addr, _ in credits):
+            return  # false positive filter
+        if tx.sender in self.balances:
+            self.balances[tx.sender] -= tx.total_debit
+        for addr, amount in credits:
+            if addr in self.balances:
+                self.balances[addr] += amount
+        self.history.append({"block": index, "transaction": tx_data})
@@ -1,11 +1,14 @@
 # src/node.py
 import os
-import requests
-from typing import List, Any
+import asyncio
+import threading
+from typing import List, Any, Optional
 from dataclasses import asdict
 from .tx import Mempool, Transaction
 from .blockchain import Blockchain
-from .config import NETWORK_TIMEOUT
+from .journal import MempoolJournal
+from .peers import PeerManager, normalize_peer_url
+from .config import NETWORK_TIMEOUT, DIFFICULTY
 
 # fallback jika config tidak menyediakan constant (safety)
 try:
@@ -14,43 +17,55 @@ except Exception:
     NETWORK_TIMEOUT = 3
 
 class Node:
-    def __init__(self, port: int, bootstrap_peers: List[str] = None):
+    def __init__(self, port: int, bootstrap_peers: List[str] = None, mempool_journal: str = None,
+                 peers_file: Optional[str] = None, difficulty: int = DIFFICULTY):
         self.port = port
-        # normalize peers to list of stripped urls (no trailing slash)
-        self.peers = []
+        # Melindungi chain & mempool dari request yang berjalan bersamaan
+        self.lock = threading.RLock()
+        # Peer manager: statistik kesehatan, backoff, discovery, persistensi & connection pool
+        self.peer_manager = PeerManager(self_url=self.self_url(), store_path=peers_file)
         if bootstrap_peers:
             for p in bootstrap_peers:
-                norm = self._normalize_peer_url(p)
-                if norm and norm not in self.peers and norm != self.self_url():
-                    self.peers.append(norm)
+                self.peer_manager.add(p, bootstrap=True)
 
-        self.mempool = Mempool()
-        self.blockchain = Blockchain()
+        journal = MempoolJournal(mempool_journal) if mempool_journal else None
+        self.mempool = Mempool(journal=journal)
+        self.blockchain = Blockchain(difficulty=difficulty)
         self.node_address = f"node-{self.port}"  # digunakan juga sebagai alamat miner
 
+        # Muat ulang transaksi pending yang tersimpan sebelum restart/crash. Chain di sini
+        # baru genesis, jadi cek saldo ditunda ke revalidate_mempool() setelah chain dimuat.
+        if journal:
+            restored = self.mempool.restore()
+            print(f"[Node] Mempool dipulihkan dari journal: {restored} transaksi")
+
+    def revalidate_mempool(self) -> int:
+        """Cocokkan mempool dengan chain yang sudah dimuat/disinkronkan; kembalikan jumlah yang dibuang."""
+        with self.lock:
+            dropped = self.mempool.revalidate(self.blockchain)
+        if dropped:
+            print(f"[Node] {len(dropped)} transaksi mempool tidak lagi valid terhadap chain")
+        return len(dropped)
+
     # -------------------------
     # Helper utilities
     # -------------------------
     def _normalize_peer_url(self, peer: str) -> str:
         """Normalize peer string to full http://... form without trailing slash."""
-        if not peer:
-            return ""
-        peer = peer.strip()
-        if not peer:
-            return ""
-        if not peer.startswith("http://") and not peer.startswith("https://"):
-            peer = f"http://{peer}"
-        return peer.rstrip("/")
+        return normalize_peer_url(peer)
 
     # -----------------------------------
     # Peer management
     # -----------------------------------
+    @property
+    def peers(self) -> List[str]:
+        return self.peer_manager.urls()
+
     def register_peers(self, peers: List[str]):
         """Add a list of peers (strings). Accepts 'host:port' or full URL."""
         for p in peers:
-            norm = self._normalize_peer_url(p)
-            if norm and norm not in self.peers and norm != self.self_url():
-                self.peers.append(norm)
+            self.peer_manager.add(p)
+        self.peer_manager.save()
         print(f"[Node] Peers after register: {self.peers}")
 
     def get_peers(self):
@@ -79,10 +94,9 @@ class Node:
                 "signature": getattr(tx, "signature", None),
             }
 
-        for peer in list(self.peers):
+        for peer in self.peer_manager.healthy():
             try:
-                url = f"{peer}/nodes/receive_tx"
-                requests.post(url, json=payload, timeout=NETWORK_TIMEOUT)
+                self.peer_manager.post(peer, "/nodes/receive_tx", json=payload, timeout=NETWORK_TIMEOUT)
             except Exception as e:
                 print(f"[Broadcast TX] Gagal kirim ke {peer}: {e}")
 
@@ -91,28 +105,54 @@ class Node:
         Kirim block baru ke semua node yang terdaftar agar mereka bisa memvalidasi dan menambahkannya.
         Endpoint di node target: POST /nodes/receive_block
         """
+        from requests.exceptions import RequestException
         # Build JSON-serializable payload
-        payload = {
-            "index": getattr(block, "index", None),
-            "timestamp": getattr(block, "timestamp", None),
-            "transactions": [
-                (t.model_dump() if hasattr(t, "model_dump") else
-                 (t.__dict__ if hasattr(t, "__dict__") else t))
-                for t in getattr(block, "transactions", [])
-            ],
-            "nonce": getattr(block, "nonce", None),
-            "previous_hash": getattr(block, "previous_hash", None),
-            "difficulty": getattr(block, "difficulty", None),
-            "hash": getattr(block, "hash", "")
-        }
-
-        for peer in list(self.peers):
+        if hasattr(block, "to_dict"):
+            payload = block.to_dict()
+        else:
+            payload = {
+                "index": getattr(block, "index", None),
+                "timestamp": getattr(block, "timestamp", None),
+                "transactions": [
+                    (t.model_dump() if hasattr(t, "model_dump") else
+                     (t.__dict__ if hasattr(t, "__dict__") else t))
+                    for t in getattr(block, "transactions", [])
+                ],
+                "nonce": getattr(block, "nonce", None),
+                "previous_hash": getattr(block, "previous_hash", None),
+                "difficulty": getattr(block, "difficulty", None),
+                "target": getattr(block, "target", ""),
+                "hash": getattr(block, "hash", "")
+            }
+
+        for peer in self.peer_manager.healthy():
             try:
-                url = f"{peer}/nodes/receive_block"
-                response = requests.post(url, json=payload, timeout=NETWORK_TIMEOUT)
+                response = self.peer_manager.post(peer, "/nodes/receive_block", json=payload, timeout=NETWORK_TIMEOUT)
                 if response.status_code == 200:
                     print(f"✅ Block dikirim ke peer: {peer}")
                 else:
                     print(f"⚠️ Peer {peer} menolak block (HTTP {response.status_code}) - {response.text}")
-            except requests.exceptions.RequestException as e:
+            except RequestException as e:
                 print(f"❌ Gagal kirim block ke {peer}: {e}")
+
+    # -----------------------------------
+    # Broadcast async (tanpa memblokir event loop, semua peer paralel)
+    # -----------------------------------
+    async def abroadcast_tx(self, tx: Transaction):
+        await self._abroadcast("/nodes/receive_tx", tx.model_dump())
+
+    async def abroadcast_block(self, block: Any):
+        await self._abroadcast("/nodes/receive_block", block.to_dict())
+
+    async def _abroadcast(self, path: str, payload: dict):
+        peers = self.peer_manager.healthy()
+
+        async def send(peer: str):
+            try:
+                response = await self.peer_manager.apost(peer, path, json=payload, timeout=NETWORK_TIMEOUT)
+                if response.status_code != 200:
+                    print(f"⚠️ Peer {peer} menolak {path} (HTTP {response.status_code})")
+            except Exception as e:
+                print(f"❌ Gagal kirim {path} ke {peer}: {e}")
+
+        await asyncio.gather(*(send(p) for p in peers))
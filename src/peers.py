@@ -0,0 +1,277 @@
+# src/peers.py
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, asdict
+from typing import TYPE_CHECKING, Dict, List, Optional
+import httpx
+from .config import (
+    NETWORK_TIMEOUT, PEER_MAX_FAILURES, PEER_BACKOFF_BASE, PEER_BACKOFF_MAX,
+    PEER_POOL_SIZE, PEER_MAX_KNOWN, PEER_LATENCY_ALPHA,
+)
+
+# requests baru di-import saat peer pertama dihubungi (startup lebih cepat)
+if TYPE_CHECKING:
+    import requests
+
+
+def normalize_peer_url(peer: str) -> str:
+    """Normalize peer string to full http://... form without trailing slash."""
+    if not peer:
+        return ""
+    peer = peer.strip()
+    if not peer:
+        return ""
+    if not peer.startswith("http://") and not peer.startswith("https://"):
+        peer = f"http://{peer}"
+    return peer.rstrip("/")
+
+
+@dataclass
+class PeerInfo:
+    url: str
+    latency: float = 0.0              # EWMA dalam detik
+    successes: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    last_seen: float = 0.0
+    backoff_until: float = 0.0
+    bootstrap: bool = False           # peer bootstrap tidak pernah dihapus, hanya di-backoff
+
+    @property
+    def score(self) -> float:
+        """Semakin tinggi semakin sehat: rasio sukses dikurangi penalti latency."""
+        total = self.successes + self.failures
+        success_rate = self.successes / total if total else 0.5
+        return success_rate - min(self.latency, 5.0) / 10.0
+
+    def available(self, now: Optional[float] = None) -> bool:
+        now = time.time() if now is None else now
+        return self.backoff_until <= now
+
+
+class PeerManager:
+    """
+    Menyimpan peer yang dikenal beserta statistik kesehatannya (latency, gagal/sukses),
+    memberi backoff pada peer yang mati, bertukar daftar peer untuk discovery, dan
+    menyimpan daftar peer ke disk. Setiap peer memakai satu `requests.Session`
+    dengan koneksi keep-alive sehingga gossip tidak membuka koneksi TCP baru tiap pesan.
+    """
+
+    def __init__(self, self_url: str = "", store_path: Optional[str] = None):
+        self.self_url = self_url
+        self.store_path = store_path
+        self._peers: Dict[str, PeerInfo] = {}
+        self._sessions: Dict[str, "requests.Session"] = {}
+        self._async_client: Optional[httpx.AsyncClient] = None
+        self._lock = threading.RLock()
+        if store_path:
+            self.load()
+
+    # -----------------------------------
+    # Daftar peer
+    # -----------------------------------
+    def add(self, peer: str, bootstrap: bool = False) -> bool:
+        url = normalize_peer_url(peer)
+        if not url or url == self.self_url:
+            return False
+        with self._lock:
+            if url in self._peers:
+                if bootstrap:
+                    self._peers[url].bootstrap = True
+                return False
+            if len(self._peers) >= PEER_MAX_KNOWN and not bootstrap:
+                return False
+            self._peers[url] = PeerInfo(url=url, bootstrap=bootstrap)
+            return True
+
+    def remove(self, url: str):
+        with self._lock:
+            self._peers.pop(url, None)
+            session = self._sessions.pop(url, None)
+        if session:
+            session.close()
+
+    def urls(self) -> List[str]:
+        with self._lock:
+            return list(self._peers)
+
+    def healthy(self) -> List[str]:
+        """Peer yang tidak sedang di-backoff, diurutkan dari skor tertinggi."""
+        now = time.time()
+        with self._lock:
+            peers = [p for p in self._peers.values() if p.available(now)]
+        return [p.url for p in sorted(peers, key=lambda p: p.score, reverse=True)]
+
+    def get_info(self, url: str) -> Optional[PeerInfo]:
+        return self._peers.get(url)
+
+    # -----------------------------------
+    # Statistik kesehatan
+    # -----------------------------------
+    def record_success(self, url: str, latency: float):
+        with self._lock:
+            info = self._peers.get(url)
+            if not info:
+                return
+            info.latency = latency if not info.successes else (
+                PEER_LATENCY_ALPHA * latency + (1 - PEER_LATENCY_ALPHA) * info.latency
+            )
+            info.successes += 1
+            info.consecutive_failures = 0
+            info.backoff_until = 0.0
+            info.last_seen = time.time()
+
+    def record_failure(self, url: str):
+        with self._lock:
+            info = self._peers.get(url)
+            if not info:
+                return
+            info.failures += 1
+            info.consecutive_failures += 1
+            if info.consecutive_failures >= PEER_MAX_FAILURES and not info.bootstrap:
+                print(f"[Peers] Peer {url} dihapus setelah {info.consecutive_failures} kegagalan")
+                self.remove(url)
+                return
+            delay = PEER_BACKOFF_BASE * (2 ** (info.consecutive_failures - 1))
+            info.backoff_until = time.time() + min(delay, PEER_BACKOFF_MAX)
+
+    # -----------------------------------
+    # HTTP dengan connection pooling
+    # -----------------------------------
+    def session(self, url: str) -> "requests.Session":
+        import requests
+        from requests.adapters import HTTPAdapter
+        with self._lock:
+            session = self._sessions.get(url)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=PEER_POOL_SIZE)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._sessions[url] = session
+            return session
+
+    def request(self, method: str, url: str, path: str, **kwargs) -> "requests.Response":
+        """Kirim request ke peer lewat session pool-nya dan catat latency / kegagalan."""
+        import requests
+        kwargs.setdefault("timeout", NETWORK_TIMEOUT)
+        start = time.time()
+        try:
+            response = self.session(url).request(method, f"{url}{path}", **kwargs)
+        except requests.exceptions.RequestException:
+            self.record_failure(url)
+            raise
+        if response.status_code >= 500:
+            self.record_failure(url)
+        else:
+            self.record_success(url, time.time() - start)
+        return response
+
+    # -----------------------------------
+    # HTTP async (dipakai handler FastAPI agar tidak memblokir event loop)
+    # -----------------------------------
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        if self._async_client is None:
+            limits = httpx.Limits(
+                max_keepalive_connections=PEER_POOL_SIZE * PEER_MAX_KNOWN,
+                max_connections=PEER_POOL_SIZE * PEER_MAX_KNOWN,
+            )
+            self._async_client = httpx.AsyncClient(limits=limits, timeout=NETWORK_TIMEOUT)
+        return self._async_client
+
+    async def arequest(self, method: str, url: str, path: str, **kwargs) -> httpx.Response:
+        start = time.time()
+        try:
+            response = await self.async_client.request(method, f"{url}{path}", **kwargs)
+        except httpx.HTTPError:
+            self.record_failure(url)
+            raise
+        if response.status_code >= 500:
+            self.record_failure(url)
+        else:
+            self.record_success(url, time.time() - start)
+        return response
+
+    async def aget(self, url: str, path: str, **kwargs) -> httpx.Response:
+        return await self.arequest("GET", url, path, **kwargs)
+
+    async def apost(self, url: str, path: str, **kwargs) -> httpx.Response:
+        return await self.arequest("POST", url, path, **kwargs)
+
+    async def aclose(self):
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+
+    def get(self, url: str, path: str, **kwargs) -> "requests.Response":
+        return self.request("GET", url, path, **kwargs)
+
+    def post(self, url: str, path: str, **kwargs) -> "requests.Response":
+        return self.request("POST", url, path, **kwargs)
+
+    # -----------------------------------
+    # Discovery
+    # -----------------------------------
+    def discover(self) -> int:
+        """Tanya setiap peer sehat daftar peer-nya (GET /nodes) dan tambahkan yang baru."""
+        import requests
+        added = 0
+        for url in self.healthy():
+            try:
+                response = self.get(url, "/nodes")
+                if response.status_code != 200:
+                    continue
+                for peer in response.json().get("nodes", []):
+                    if isinstance(peer, str) and self.add(peer):
+                        added += 1
+            except (requests.exceptions.RequestException, ValueError):
+                continue
+        return added
+
+    def maintain(self) -> int:
+        """Satu putaran pemeliharaan: discovery lalu simpan ke disk."""
+        added = self.discover()
+        self.save()
+        return added
+
+    # -----------------------------------
+    # Persistensi
+    # -----------------------------------
+    def save(self):
+        if not self.store_path:
+            return
+        with self._lock:
+            data = [asdict(p) for p in self._peers.values()]
+        tmp_path = f"{self.store_path}.tmp"
+        os.makedirs(os.path.dirname(os.path.abspath(self.store_path)), exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"peers": data}, f, indent=2)
+        os.replace(tmp_path, self.store_path)
+
+    def load(self):
+        if not self.store_path or not os.path.exists(self.store_path):
+            return
+        try:
+            with open(self.store_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[Peers] Gagal membaca {self.store_path}: {e}")
+            return
+        with self._lock:
+            for item in data.get("peers", []):
+                url = normalize_peer_url(item.get("url", ""))
+                if not url or url == self.self_url:
+                    continue
+                fields = {k: v for k, v in item.items() if k in PeerInfo.__dataclass_fields__}
+                fields["url"] = url
+                # Backoff lama tidak relevan setelah restart
+                fields["backoff_until"] = 0.0
+                self._peers[url] = PeerInfo(**fields)
+
+    def stats(self) -> List[dict]:
+        with self._lock:
+            peers = list(self._peers.values())
+        return [dict(asdict(p), score=round(p.score, 3)) for p in peers]
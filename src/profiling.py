@@ -0,0 +1,279 @@
+# src/profiling.py
+"""
+Profiling & tracing opt-in untuk node.
+
+- Profiler: sesi profil yang bisa dimulai/dihentikan saat node berjalan.
+  Mode "sampling" mengambil stack semua thread secara berkala dan menghasilkan
+  format collapsed stack (`a;b;c 12`) yang bisa langsung dipakai flamegraph.pl
+  atau speedscope. Mode "cprofile" memprofil isi setiap span (di thread mana pun
+  span berjalan) dan menggabungkannya dengan pstats.
+- trace()/span(): trace per request dengan span untuk setiap tahap utama.
+- SlowOpLog: setiap trace/span yang melewati ambangnya dicatat dan dicetak.
+  Ambang bisa diubah saat runtime tanpa redeploy.
+"""
+import asyncio
+import contextvars
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+from .config import (
+    SLOW_OP_DEFAULT_MS, SLOW_OP_THRESHOLDS_MS, SLOW_OP_LOG_SIZE, TRACE_BUFFER_SIZE,
+    PROFILE_SAMPLE_INTERVAL, PROFILE_TOP_N,
+)
+
+_current_trace: contextvars.ContextVar = contextvars.ContextVar("current_trace", default=None)
+
+
+def _on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+# -----------------------------------
+# Profiler
+# -----------------------------------
+class Profiler:
+    def __init__(self):
+        self.mode: Optional[str] = None
+        self.started = 0.0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._stacks: Counter = Counter()
+        self._samples = 0
+        self._profiles: List[cProfile.Profile] = []
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self.mode is not None
+
+    def start(self, mode: str = "sampling", interval: float = PROFILE_SAMPLE_INTERVAL):
+        if mode not in ("sampling", "cprofile"):
+            raise ValueError("mode harus 'sampling' atau 'cprofile'")
+        with self._lock:
+            if self.mode is not None:
+                raise RuntimeError(f"Sesi profil '{self.mode}' masih berjalan")
+            self.mode = mode
+            self.started = time.time()
+            self._stacks = Counter()
+            self._samples = 0
+            self._profiles = []
+            self._stop.clear()
+            if mode == "sampling":
+                self._sampler = threading.Thread(
+                    target=self._sample_loop, args=(interval,), name="profiler-sampler", daemon=True
+                )
+                self._sampler.start()
+
+    def stop(self) -> Dict[str, Any]:
+        with self._lock:
+            if self.mode is None:
+                raise RuntimeError("Tidak ada sesi profil yang berjalan")
+            mode, self.mode = self.mode, None
+            self._stop.set()
+        if self._sampler:
+            self._sampler.join()
+            self._sampler = None
+        result = {"mode": mode, "duration": round(time.time() - self.started, 3)}
+        if mode == "sampling":
+            result.update(self._sampling_result())
+        else:
+            result.update(self._cprofile_result())
+        return result
+
+    # Mode sampling
+    def _sample_loop(self, interval: float):
+        own = threading.get_ident()
+        while not self._stop.wait(interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                self._stacks[";".join(reversed(stack))] += 1
+            self._samples += 1
+
+    def _sampling_result(self) -> Dict[str, Any]:
+        own_time: Counter = Counter()
+        total_time: Counter = Counter()
+        for stack, count in self._stacks.items():
+            frames = stack.split(";")
+            own_time[frames[-1]] += count
+            for name in set(frames):
+                total_time[name] += count
+        top = [
+            {"function": name, "self": own_time[name], "total": count}
+            for name, count in total_time.most_common(PROFILE_TOP_N)
+        ]
+        return {"samples": self._samples, "top": top, "collapsed": self.collapsed()}
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self._stacks.most_common())
+
+    # Mode cProfile (per span)
+    @contextmanager
+    def profile_span(self):
+        # Thread event loop tidak diprofil: selama `await` isinya hanya idle & coroutine lain
+        if self.mode != "cprofile" or getattr(self._local, "active", False) or _on_event_loop():
+            yield
+            return
+        profile = cProfile.Profile()
+        self._local.active = True
+        try:
+            profile.enable()
+        except ValueError:
+            # Profiler lain sudah aktif di thread ini
+            self._local.active = False
+            yield
+            return
+        try:
+            yield
+        finally:
+            profile.disable()
+            self._local.active = False
+            with self._lock:
+                self._profiles.append(profile)
+
+    def _cprofile_result(self) -> Dict[str, Any]:
+        if not self._profiles:
+            return {"calls": 0, "top": []}
+        stats = pstats.Stats(self._profiles[0])
+        for profile in self._profiles[1:]:
+            stats.add(profile)
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:PROFILE_TOP_N]
+        top = [{
+            "function": f"{func} ({os.path.basename(filename)}:{line})",
+            "calls": nc,
+            "self": round(tt, 6),
+            "total": round(ct, 6),
+        } for (filename, line, func), (cc, nc, tt, ct, _callers) in rows]
+        return {"calls": stats.total_calls, "top": top}
+
+
+# -----------------------------------
+# Log operasi lambat
+# -----------------------------------
+class SlowOpLog:
+    def __init__(self, thresholds_ms: Optional[Dict[str, float]] = None,
+                 default_ms: float = SLOW_OP_DEFAULT_MS, size: int = SLOW_OP_LOG_SIZE):
+        self.thresholds_ms = dict(SLOW_OP_THRESHOLDS_MS if thresholds_ms is None else thresholds_ms)
+        self.default_ms = default_ms
+        self.entries = deque(maxlen=size)
+
+    def threshold_ms(self, name: str) -> float:
+        if name in self.thresholds_ms:
+            return self.thresholds_ms[name]
+        if "." in name and name.split(".", 1)[0] in self.thresholds_ms:
+            return self.thresholds_ms[name.split(".", 1)[0]]
+        return self.default_ms
+
+    def check(self, name: str, duration: float, attrs: Optional[Dict[str, Any]] = None) -> bool:
+        ms = duration * 1000
+        if ms < self.threshold_ms(name):
+            return False
+        entry = {"name": name, "ms": round(ms, 2), "at": time.time(), "attrs": attrs or {}}
+        self.entries.append(entry)
+        print(f"🐢 [slow] {name} {ms:.1f} ms {attrs or ''}")
+        return True
+
+    def configure(self, thresholds_ms: Optional[Dict[str, float]] = None, default_ms: Optional[float] = None):
+        if thresholds_ms:
+            self.thresholds_ms.update({k: float(v) for k, v in thresholds_ms.items()})
+        if default_ms is not None:
+            self.default_ms = float(default_ms)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"default_ms": self.default_ms, "thresholds_ms": self.thresholds_ms, "entries": list(self.entries)}
+
+
+PROFILER = Profiler()
+SLOW_OPS = SlowOpLog()
+TRACES = deque(maxlen=TRACE_BUFFER_SIZE)
+
+
+# -----------------------------------
+# Trace & span
+# -----------------------------------
+class Trace:
+    def __init__(self, name: str, attrs: Optional[Dict[str, Any]] = None):
+        self.id = uuid.uuid4().hex[:16]
+        self.name = name
+        self.attrs = attrs or {}
+        self.started = time.time()
+        self._t0 = time.perf_counter()
+        self.duration = 0.0
+        self.spans: List[Dict[str, Any]] = []
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "started": self.started,
+            "ms": round(self.duration * 1000, 3),
+            "attrs": self.attrs,
+            "spans": self.spans,
+        }
+
+
+@contextmanager
+def trace(name: str, **attrs):
+    """Trace satu request/operasi; span di dalamnya (termasuk di thread pool) tercatat di sini."""
+    current = Trace(name, attrs)
+    token = _current_trace.set(current)
+    try:
+        yield current
+    finally:
+        current.duration = time.perf_counter() - current._t0
+        _current_trace.reset(token)
+        TRACES.append(current)
+        SLOW_OPS.check(name, current.duration, attrs)
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """Ukur satu tahap. Nama lengkap span adalah '<trace>.<span>' jika berada di dalam trace."""
+    current = _current_trace.get()
+    full_name = f"{current.name}.{name}" if current else name
+    start = time.perf_counter()
+    with PROFILER.profile_span():
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            if current:
+                current.spans.append({
+                    "name": name,
+                    "offset_ms": round((start - current._t0) * 1000, 3),
+                    "ms": round(duration * 1000, 3),
+                    "thread": threading.current_thread().name,
+                    **({"attrs": attrs} if attrs else {}),
+                })
+            SLOW_OPS.check(full_name, duration, attrs)
+
+
+def profiled_call(fn, *args):
+    """Jalankan `fn` (di thread pool) di bawah cProfile jika sesi mode cprofile aktif."""
+    with PROFILER.profile_span():
+        return fn(*args)
+
+
+def recent_traces(name: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+    traces = [t for t in TRACES if name is None or t.name == name]
+    return [t.to_dict() for t in traces[-limit:]][::-1]
@@ -0,0 +1,100 @@
+# src/serve.py
+"""
+Menjalankan node dengan beberapa worker API:
+
+    python -m src.serve --port 8001 --workers 4 --store data/chain.db
+
+- Satu proses writer (NODE_ROLE=writer) di 127.0.0.1:<writer-port> memegang chain,
+  mempool, peer dan mining. Semua request tulis diproses di sini.
+- `--workers` proses reader (NODE_ROLE=reader) di port publik melayani /blocks,
+  /balance dan /mempool langsung dari store SQLite bersama, dan meneruskan
+  request lain ke writer.
+
+Dengan --workers 0 node berjalan sebagai satu proses biasa (tanpa reader).
+"""
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+from .config import STARTUP_BUDGET
+
+
+def uvicorn_cmd(host: str, port: int, workers: int = 1):
+    cmd = [sys.executable, "-m", "uvicorn", "src.app:app", "--host", host, "--port", str(port)]
+    if workers > 1:
+        cmd += ["--workers", str(workers)]
+    return cmd
+
+
+def wait_until_ready(url: str, timeout: float = 30.0) -> bool:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as r:
+                if r.status == 200:
+                    return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Jalankan node dengan satu writer dan banyak reader")
+    parser.add_argument("--host", default=os.environ.get("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("WEB_WORKERS", os.cpu_count() or 1)))
+    parser.add_argument("--writer-port", type=int, default=None, help="default: port + 1000")
+    parser.add_argument("--store", default=os.environ.get("CHAIN_STORE", "data/chain.db"))
+    args = parser.parse_args(argv)
+
+    if args.workers <= 0:
+        os.execvp(sys.executable, uvicorn_cmd(args.host, args.port))
+
+    writer_port = args.writer_port or args.port + 1000
+    base_env = dict(os.environ, PORT=str(args.port), CHAIN_STORE=args.store)
+
+    # Writer tetap memakai PORT publik sebagai identitasnya di jaringan peer
+    started = time.time()
+    writer = subprocess.Popen(
+        uvicorn_cmd("127.0.0.1", writer_port), env=dict(base_env, NODE_ROLE="writer")
+    )
+    # Reader baru dijalankan setelah writer siap (chain awal sudah ditulis ke store)
+    if wait_until_ready(f"http://127.0.0.1:{writer_port}/blocks/tip"):
+        print(f"⏱️ Writer siap dalam {time.time() - started:.2f} s")
+    else:
+        print("⚠️ Writer belum merespons, reader tetap dijalankan")
+    readers = subprocess.Popen(
+        uvicorn_cmd(args.host, args.port, args.workers),
+        env=dict(base_env, NODE_ROLE="reader", WRITER_URL=f"http://127.0.0.1:{writer_port}"),
+    )
+    print(f"🚀 Writer :{writer_port} (pid {writer.pid}), {args.workers} reader di :{args.port}")
+    # Budget startup: waktu sampai /blocks publik pertama kali merespons
+    if wait_until_ready(f"http://127.0.0.1:{args.port}/blocks"):
+        elapsed = time.time() - started
+        print(f"⏱️ /blocks pertama setelah {elapsed:.2f} s (budget {STARTUP_BUDGET:.1f} s)")
+        if elapsed > STARTUP_BUDGET:
+            print("⚠️ Startup melewati budget")
+
+    def stop(*_):
+        for proc in (readers, writer):
+            if proc.poll() is None:
+                proc.send_signal(signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    try:
+        # Jika salah satu berhenti, hentikan semuanya
+        while writer.poll() is None and readers.poll() is None:
+            time.sleep(0.5)
+    finally:
+        stop()
+        for proc in (readers, writer):
+            proc.wait()
+    sys.exit(writer.returncode or readers.returncode or 0)
+
+
+if __name__ == "__main__":
+    main()
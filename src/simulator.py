@@ -0,0 +1,419 @@
+# src/simulator.py
+"""
+Simulator jaringan in-process: N Node dengan jaringan virtual (latency, loss,
+partisi) dan load generator transaksi. Waktu berjalan secara diskrit (event
+queue), sedangkan tanda tangan, validasi dan PoW dijalankan sungguhan sehingga
+biaya CPU per node tetap terukur.
+
+    python -m src.simulator --nodes 5 --duration 300 --tx-rate 5 --latency 0.2
+    python -m src.simulator --nodes 4 --partition 60:120:0,1/2,3 --loss 0.02
+
+Catatan: retarget difficulty dimatikan secara default karena timestamp block
+memakai jam sungguhan, sementara waktu simulasi jauh lebih cepat.
+"""
+import argparse
+import heapq
+import json
+import random
+import statistics
+import time
+from dataclasses import dataclass, field, asdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from .blockchain import Block
+from .node import Node
+from .template import BlockTemplateBuilder
+from .tx import Transaction
+from .wallet import Wallet, generate_key_pair
+
+NO_RETARGET = 10 ** 9
+
+
+@dataclass
+class SimConfig:
+    nodes: int = 5
+    degree: int = 3                   # jumlah peer per node (ring + sambungan acak)
+    wallets: int = 20
+    tx_rate: float = 5.0              # transaksi per detik (waktu simulasi)
+    block_interval: float = 10.0      # rata-rata detik antar block di seluruh jaringan
+    duration: float = 300.0           # detik simulasi selama load & mining berjalan
+    latency: float = 0.1              # detik, latency dasar per pesan
+    jitter: float = 0.05              # detik, tambahan acak (eksponensial)
+    loss: float = 0.0                 # peluang pesan hilang
+    difficulty: int = 1
+    retarget: bool = False
+    seed: int = 0
+    # (mulai, selesai, grup node) — pesan antar grup dibuang selama partisi
+    partitions: List[Tuple[float, float, List[List[int]]]] = field(default_factory=list)
+
+
+@dataclass
+class SimReport:
+    nodes: int
+    duration: float
+    wall_time: float
+    events: int
+    messages_sent: int
+    messages_dropped: int
+    tx_submitted: int
+    tx_confirmed: int
+    confirmation_latency: Dict[str, float]
+    blocks_mined: int
+    blocks_in_chain: int
+    stale_blocks: int
+    fork_rate: float
+    reorgs: int
+    propagation_time: Dict[str, float]
+    converged: bool
+    final_height: int
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    values = sorted(values)
+    pick = lambda q: values[min(len(values) - 1, int(q * len(values)))]
+    return {
+        "mean": round(statistics.fmean(values), 4),
+        "p50": round(pick(0.5), 4),
+        "p90": round(pick(0.9), 4),
+        "max": round(values[-1], 4),
+    }
+
+
+# -----------------------------------
+# Jaringan virtual
+# -----------------------------------
+class SimNetwork:
+    def __init__(self, sim: "Simulator", config: SimConfig):
+        self.sim = sim
+        self.config = config
+        self.groups: Optional[Dict[int, int]] = None
+        self.sent = 0
+        self.dropped = 0
+
+    def partition(self, groups: List[List[int]]):
+        self.groups = {node: g for g, members in enumerate(groups) for node in members}
+
+    def heal(self):
+        self.groups = None
+
+    def reachable(self, src: int, dst: int) -> bool:
+        if self.groups is None:
+            return True
+        return self.groups.get(src, -1) == self.groups.get(dst, -1)
+
+    def send(self, src: int, dst: int, handler: Callable, *args):
+        self.sent += 1
+        if not self.reachable(src, dst) or self.sim.rng.random() < self.config.loss:
+            self.dropped += 1
+            return
+        delay = self.config.latency + self.sim.rng.expovariate(1 / self.config.jitter) if self.config.jitter else self.config.latency
+        # Partisi dicek lagi saat pesan tiba (partisi bisa dimulai selama pesan di jalan)
+        self.sim.schedule(delay, self._deliver, src, dst, handler, args)
+
+    def _deliver(self, src: int, dst: int, handler: Callable, args):
+        if not self.reachable(src, dst):
+            self.dropped += 1
+            return
+        handler(src, *args)
+
+
+# -----------------------------------
+# Node simulasi
+# -----------------------------------
+class SimNode:
+    """Node sungguhan (Blockchain, Mempool, template) dengan gossip lewat SimNetwork."""
+
+    def __init__(self, sim: "Simulator", node_id: int, config: SimConfig):
+        self.sim = sim
+        self.id = node_id
+        self.node = Node(port=20000 + node_id, difficulty=config.difficulty)
+        if not config.retarget:
+            self.node.blockchain.retarget_interval = NO_RETARGET
+        self.template = BlockTemplateBuilder(self.node.blockchain, self.node.mempool)
+        self.peers: List[int] = []
+        self.reorgs = 0
+
+    @property
+    def chain(self) -> List[Block]:
+        return self.node.blockchain.chain
+
+    def gossip(self, handler_name: str, payload: Any, exclude: Optional[int] = None):
+        for peer in self.peers:
+            if peer != exclude:
+                self.sim.network.send(self.id, peer, getattr(self.sim.nodes[peer], handler_name), payload)
+
+    # Transaksi
+    def submit_tx(self, tx_data: Dict[str, Any]):
+        self.on_tx(None, tx_data)
+
+    def on_tx(self, src: Optional[int], tx_data: Dict[str, Any]):
+        tx = Transaction(**tx_data)
+        mempool = self.node.mempool
+        if mempool.contains(tx.id) or not mempool.add_transaction(tx, self.node.blockchain):
+            return
+        self.template.on_new_transaction(tx)
+        self.gossip("on_tx", tx_data, exclude=src)
+
+    # Block
+    def mine(self):
+        bc = self.node.blockchain
+        txs = self.template.get_template()
+        try:
+            block = bc.create_block(0, bc.last_block.hash, txs, self.node.node_address, verified=self.template.verified)
+        except ValueError:
+            return
+        self.node.mempool.remove_transactions([t.id for t in txs])
+        self.sim.record_mined(self, block)
+        self.sim.record_arrival(self, [block])
+        self.gossip("on_block", block.to_dict())
+
+    def on_block(self, src: int, block_data: Dict[str, Any]):
+        bc = self.node.blockchain
+        block = Block.from_dict(block_data)
+        if any(b.hash == block.hash for b in bc.chain[-3:]):
+            return
+        if block.previous_hash == bc.last_block.hash:
+            # Block dari node lain divalidasi penuh, tanpa cache verifikasi mempool node ini
+            if bc.add_block(block):
+                self.node.mempool.remove_transactions([t.id for t in block.transactions if t.sender != 'coinbase'])
+                self.sim.record_arrival(self, [block])
+                self.gossip("on_block", block_data, exclude=src)
+        elif block.index > bc.height:
+            # Tertinggal atau fork: minta chain lengkap dari pengirim
+            self.sim.network.send(self.id, src, self.sim.nodes[src].on_get_chain)
+
+    def on_get_chain(self, src: int):
+        chain = [b.to_dict() for b in self.chain]
+        self.sim.network.send(self.id, src, self.sim.nodes[src].on_chain, chain)
+
+    def on_chain(self, src: int, chain_data: List[Dict[str, Any]]):
+        bc = self.node.blockchain
+        old = {b.hash for b in bc.chain}
+        old_tip = bc.last_block.hash
+        if not bc.resolve_conflicts_stream([chain_data]):
+            return
+        new_blocks = [b for b in bc.chain if b.hash not in old]
+        if new_blocks and new_blocks[0].previous_hash != old_tip:
+            self.reorgs += 1
+        confirmed = bc.find_confirmed([t.id for t in self.node.mempool.all_transactions()])
+        self.node.mempool.remove_transactions(confirmed)
+        self.sim.record_arrival(self, new_blocks)
+        self.gossip("on_block", bc.last_block.to_dict(), exclude=src)
+
+    def announce_tip(self):
+        self.gossip("on_block", self.node.blockchain.last_block.to_dict())
+
+
+# -----------------------------------
+# Simulator
+# -----------------------------------
+class Simulator:
+    def __init__(self, config: SimConfig):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.now = 0.0
+        self._events: List[Tuple[float, int, Callable, tuple]] = []
+        self._seq = 0
+        self.events_processed = 0
+        self.network = SimNetwork(self, config)
+        self.nodes = [SimNode(self, i, config) for i in range(config.nodes)]
+        self._connect()
+        self.wallets = [Wallet(private_key_hex=generate_key_pair()[0]) for _ in range(config.wallets)]
+        self.addresses = [w.public_key_hex for w in self.wallets]
+        self.premined = self._premine()
+        # Metrik
+        self.tx_created: Dict[str, float] = {}
+        self.tx_confirmed: Dict[str, float] = {}
+        self.block_mined: Dict[str, float] = {}
+        self.block_arrivals: Dict[str, Dict[int, float]] = {}
+
+    def _connect(self):
+        n = len(self.nodes)
+        edges = {(i, (i + 1) % n) for i in range(n)} if n > 1 else set()
+        for i in range(n):
+            candidates = [j for j in range(n) if j != i]
+            self.rng.shuffle(candidates)
+            for j in candidates[:max(0, self.config.degree - 2)]:
+                edges.add((i, j))
+        for a, b in edges:
+            if a != b:
+                if b not in self.nodes[a].peers:
+                    self.nodes[a].peers.append(b)
+                if a not in self.nodes[b].peers:
+                    self.nodes[b].peers.append(a)
+
+    def _premine(self) -> int:
+        """
+        Dana awal sebelum waktu 0: satu block per wallet dengan coinbase ke wallet itu,
+        sama di semua node. Mempool mengecek saldo, jadi wallet tanpa dana selalu ditolak.
+        """
+        bc = self.nodes[0].node.blockchain
+        for address in self.addresses:
+            bc.create_block(0, bc.last_block.hash, [], address)
+        for node in self.nodes[1:]:
+            node.node.blockchain.chain = list(bc.chain)
+        return len(self.addresses)
+
+    def schedule(self, delay: float, fn: Callable, *args):
+        self._seq += 1
+        heapq.heappush(self._events, (self.now + delay, self._seq, fn, args))
+
+    # -----------------------------------
+    # Sumber event
+    # -----------------------------------
+    def _generate_tx(self):
+        if self.now >= self.config.duration:
+            return
+        sender = self.rng.choice(self.wallets)
+        tx = Transaction(
+            sender=sender.public_key_hex,
+            recipient=self.rng.choice(self.addresses),
+            amount=round(self.rng.uniform(0.1, 5.0), 2),
+            fee=round(self.rng.uniform(0.0, 0.1), 3),
+        )
+        tx.sign(sender)
+        self.tx_created[tx.id] = self.now
+        self.rng.choice(self.nodes).submit_tx(tx.model_dump())
+        self.schedule(self.rng.expovariate(self.config.tx_rate), self._generate_tx)
+
+    def _mining_tick(self, node: SimNode):
+        if self.now >= self.config.duration:
+            return
+        node.mine()
+        self._schedule_mining(node)
+
+    def _schedule_mining(self, node: SimNode):
+        # Hashpower sama rata: setiap node menemukan block dengan laju 1 / (interval * N)
+        self.schedule(self.rng.expovariate(1 / (self.config.block_interval * len(self.nodes))), self._mining_tick, node)
+
+    def _settle(self):
+        """
+        Setelah load berhenti: partisi dipulihkan, node dengan chain terberat
+        (total kerja) menambang satu block pemecah seri, lalu setiap node
+        mengumumkan tipnya agar jaringan konvergen.
+        """
+        self.network.heal()
+        max(self.nodes, key=lambda n: n.node.blockchain.chain_work()).mine()
+        for node in self.nodes:
+            node.announce_tip()
+
+    # -----------------------------------
+    # Metrik
+    # -----------------------------------
+    def record_mined(self, node: SimNode, block: Block):
+        self.block_mined[block.hash] = self.now
+
+    def record_arrival(self, node: SimNode, blocks: List[Block]):
+        for block in blocks:
+            self.block_arrivals.setdefault(block.hash, {}).setdefault(node.id, self.now)
+        if node.id == 0:
+            # Node 0 adalah pengamat untuk latency konfirmasi
+            for block in blocks:
+                for tx in block.transactions:
+                    if tx.id in self.tx_created and tx.id not in self.tx_confirmed:
+                        self.tx_confirmed[tx.id] = self.now
+
+    # -----------------------------------
+    # Jalankan
+    # -----------------------------------
+    def run(self) -> SimReport:
+        started = time.time()
+        if self.config.tx_rate > 0:
+            self.schedule(self.rng.expovariate(self.config.tx_rate), self._generate_tx)
+        for node in self.nodes:
+            self._schedule_mining(node)
+        for start, end, groups in self.config.partitions:
+            self.schedule(start, self.network.partition, groups)
+            self.schedule(end, self.network.heal)
+        self.schedule(self.config.duration, self._settle)
+
+        while self._events:
+            self.now, _, fn, args = heapq.heappop(self._events)
+            fn(*args)
+            self.events_processed += 1
+        return self.report(time.time() - started)
+
+    def report(self, wall_time: float) -> SimReport:
+        final = max((n.chain for n in self.nodes), key=len)
+        in_chain = {b.hash for b in final}
+        mined = len(self.block_mined)
+        stale = sum(1 for h in self.block_mined if h not in in_chain)
+        propagation = [
+            max(arrivals.values()) - self.block_mined[h]
+            for h, arrivals in self.block_arrivals.items()
+            if h in self.block_mined and h in in_chain and len(arrivals) == len(self.nodes)
+        ]
+        confirmed_in_chain = {t.id for b in final for t in b.transactions} & set(self.tx_confirmed)
+        latencies = [self.tx_confirmed[t] - self.tx_created[t] for t in confirmed_in_chain]
+        return SimReport(
+            nodes=len(self.nodes),
+            duration=self.config.duration,
+            wall_time=round(wall_time, 3),
+            events=self.events_processed,
+            messages_sent=self.network.sent,
+            messages_dropped=self.network.dropped,
+            tx_submitted=len(self.tx_created),
+            tx_confirmed=len(confirmed_in_chain),
+            confirmation_latency=summarize(latencies),
+            blocks_mined=mined,
+            blocks_in_chain=len(final) - 1 - self.premined,
+            stale_blocks=stale,
+            fork_rate=round(stale / mined, 4) if mined else 0.0,
+            reorgs=sum(n.reorgs for n in self.nodes),
+            propagation_time=summarize(propagation),
+            converged=len({n.node.blockchain.last_block.hash for n in self.nodes}) == 1,
+            final_height=len(final),
+        )
+
+
+# -----------------------------------
+# CLI
+# -----------------------------------
+def parse_partition(spec: str) -> Tuple[float, float, List[List[int]]]:
+    """Format: mulai:selesai:0,1,2/3,4"""
+    start, end, groups = spec.split(":")
+    return float(start), float(end), [[int(x) for x in g.split(",") if x] for g in groups.split("/")]
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Simulasi jaringan multi-node dengan load generator")
+    parser.add_argument("--nodes", type=int, default=SimConfig.nodes)
+    parser.add_argument("--degree", type=int, default=SimConfig.degree)
+    parser.add_argument("--wallets", type=int, default=SimConfig.wallets)
+    parser.add_argument("--tx-rate", type=float, default=SimConfig.tx_rate)
+    parser.add_argument("--block-interval", type=float, default=SimConfig.block_interval)
+    parser.add_argument("--duration", type=float, default=SimConfig.duration)
+    parser.add_argument("--latency", type=float, default=SimConfig.latency)
+    parser.add_argument("--jitter", type=float, default=SimConfig.jitter)
+    parser.add_argument("--loss", type=float, default=SimConfig.loss)
+    parser.add_argument("--difficulty", type=int, default=SimConfig.difficulty)
+    parser.add_argument("--retarget", action="store_true")
+    parser.add_argument("--seed", type=int, default=SimConfig.seed)
+    parser.add_argument("--partition", action="append", default=[], help="mulai:selesai:0,1/2,3 (bisa berulang)")
+    parser.add_argument("--json", action="store_true", help="cetak laporan sebagai JSON")
+    args = parser.parse_args(argv)
+
+    config = SimConfig(
+        nodes=args.nodes, degree=args.degree, wallets=args.wallets, tx_rate=args.tx_rate,
+        block_interval=args.block_interval, duration=args.duration, latency=args.latency,
+        jitter=args.jitter, loss=args.loss, difficulty=args.difficulty, retarget=args.retarget,
+        seed=args.seed, partitions=[parse_partition(p) for p in args.partition],
+    )
+    report = Simulator(config).run()
+    if args.json:
+        print(json.dumps(asdict(report), indent=2))
+        return
+    print(f"🧪 {report.nodes} node, {report.duration:.0f} detik simulasi dalam {report.wall_time:.1f} detik nyata "
+          f"({report.events} event)")
+    print(f"   Pesan: {report.messages_sent} terkirim, {report.messages_dropped} hilang")
+    print(f"   Transaksi: {report.tx_confirmed}/{report.tx_submitted} terkonfirmasi, "
+          f"latency konfirmasi {report.confirmation_latency}")
+    print(f"   Block: {report.blocks_in_chain} di chain, {report.stale_blocks} basi dari {report.blocks_mined} "
+          f"(fork rate {report.fork_rate:.2%}), {report.reorgs} reorg")
+    print(f"   Propagasi block ke semua node: {report.propagation_time}")
+    print(f"   Konvergen: {'ya' if report.converged else 'tidak'} (tinggi {report.final_height})")
+
+
+if __name__ == "__main__":
+    main()
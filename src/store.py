@@ -0,0 +1,440 @@
+# src/store.py
+"""
+Store SQLite untuk chain, transaksi, saldo dan mempool.
+
+Migrasi chain yang sudah ada (divalidasi penuh sebelum ditulis):
+
+    python -m src.store import chain.ndjson --db data/chain.db
+    python -m src.store import --node http://localhost:8001 --db data/chain.db
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from .blockchain import Block
+from .tx import MULTI_RECIPIENT, Transaction
+
+
+class ChainStore:
+    """
+    State chain & mempool bersama di file SQLite (mode WAL) untuk deployment
+    multi-proses: satu proses writer menulis, banyak worker reader membaca
+    tanpa saling mengunci. Koneksi dibuka per thread.
+
+    Tabel `meta` menyimpan nomor versi chain dan mempool yang naik setiap kali
+    writer menulis, sehingga reader cukup membaca dua angka untuk tahu apakah
+    state lokalnya perlu dimuat ulang.
+
+    Selain block utuh, setiap transaksi disimpan per baris (index pada id,
+    sender, recipient) dan saldo setiap alamat dipelihara di tabel `balances`,
+    sehingga saldo, pencarian transaksi dan riwayat alamat tidak perlu scan chain.
+    Penerima transaksi multi-output diindex per baris di tabel `tx_outputs`.
+    """
+
+    # Naikkan jika tabel turunan (transactions, balances) berubah; store lama dibangun ulang
+    INDEX_VERSION = 2
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS blocks (
+            height INTEGER PRIMARY KEY,
+            hash TEXT NOT NULL,
+            data TEXT NOT NULL
+        );
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_blocks_hash ON blocks (hash);
+        CREATE TABLE IF NOT EXISTS transactions (
+            height INTEGER NOT NULL,
+            position INTEGER NOT NULL,
+            id TEXT NOT NULL,
+            sender TEXT NOT NULL,
+            recipient TEXT NOT NULL,
+            amount REAL NOT NULL,
+            fee REAL NOT NULL,
+            timestamp REAL NOT NULL,
+            data TEXT NOT NULL,
+            PRIMARY KEY (height, position)
+        );
+        CREATE INDEX IF NOT EXISTS idx_tx_id ON transactions (id);
+        CREATE INDEX IF NOT EXISTS idx_tx_sender ON transactions (sender, height);
+        CREATE INDEX IF NOT EXISTS idx_tx_recipient ON transactions (recipient, height);
+        CREATE TABLE IF NOT EXISTS tx_outputs (
+            height INTEGER NOT NULL,
+            position INTEGER NOT NULL,
+            output INTEGER NOT NULL,
+            recipient TEXT NOT NULL,
+            amount REAL NOT NULL,
+            PRIMARY KEY (height, position, output)
+        );
+        CREATE INDEX IF NOT EXISTS idx_outputs_recipient ON tx_outputs (recipient, height);
+        CREATE TABLE IF NOT EXISTS balances (
+            address TEXT PRIMARY KEY,
+            balance REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS mempool (
+            id TEXT PRIMARY KEY,
+            data TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        );
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self.conn:
+            self.conn.executescript(self.SCHEMA)
+        # Migrasi store lama (tanpa tabel transaksi/saldo): bangun ulang dari tabel blocks
+        if self._meta("index_version") < self.INDEX_VERSION:
+            self.rebuild_index()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # -----------------------------------
+    # Versi state
+    # -----------------------------------
+    def versions(self) -> Tuple[int, int]:
+        rows = dict(self.conn.execute("SELECT key, value FROM meta").fetchall())
+        return rows.get("chain_version", 0), rows.get("mempool_version", 0)
+
+    def _meta(self, key: str) -> int:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else 0
+
+    def _bump(self, key: str):
+        self.conn.execute(
+            "INSERT INTO meta (key, value) VALUES (?, 1) "
+            "ON CONFLICT(key) DO UPDATE SET value = value + 1", (key,)
+        )
+
+    # -----------------------------------
+    # Chain
+    # -----------------------------------
+    def tip(self) -> Tuple[int, Optional[str]]:
+        row = self.conn.execute("SELECT height, hash FROM blocks ORDER BY height DESC LIMIT 1").fetchone()
+        return (row[0], row[1]) if row else (0, None)
+
+    def hash_at(self, height: int) -> Optional[str]:
+        row = self.conn.execute("SELECT hash FROM blocks WHERE height = ?", (height,)).fetchone()
+        return row[0] if row else None
+
+    def load_blocks(self, start: int = 1) -> List[Block]:
+        rows = self.conn.execute("SELECT data FROM blocks WHERE height >= ? ORDER BY height", (start,))
+        return [Block.from_dict(json.loads(data)) for (data,) in rows]
+
+    def publish_chain(self, chain: List[Block]) -> int:
+        """
+        Samakan tabel blocks dengan `chain`. Jika chain hanya bertambah, hanya
+        block baru yang ditulis; jika terjadi reorg, block sejak titik percabangan
+        ditulis ulang. Semua dalam satu transaksi. Mengembalikan jumlah block yang ditulis.
+        """
+        height, tip_hash = self.tip()
+        start = min(height, len(chain))
+        # Mundur sampai block di store sama dengan block di chain
+        while start > 0 and self.hash_at(start) != chain[start - 1].hash:
+            start -= 1
+        if start == height == len(chain):
+            return 0
+        # Satu transaksi SQLite: reader tidak pernah melihat block setengah tertulis
+        with self.conn:
+            self._truncate(start)
+            for block in chain[start:]:
+                self._write_block(block)
+            self._bump("chain_version")
+        return len(chain) - start
+
+    def _write_block(self, block: Block):
+        data = block.to_dict()
+        self.conn.execute(
+            "INSERT INTO blocks (height, hash, data) VALUES (?, ?, ?)",
+            (block.index, block.hash, json.dumps(data)),
+        )
+        self.conn.executemany(
+            "INSERT INTO transactions (height, position, id, sender, recipient, amount, fee, timestamp, data) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(block.index, pos, t["id"], t["sender"], t["recipient"], t["amount"], t.get("fee", 0.0),
+              t["timestamp"], json.dumps(t)) for pos, t in enumerate(data["transactions"])],
+        )
+        self.conn.executemany(
+            "INSERT INTO tx_outputs (height, position, output, recipient, amount) VALUES (?, ?, ?, ?, ?)",
+            [(block.index, pos, i, o["recipient"], o["amount"])
+             for pos, t in enumerate(data["transactions"]) for i, o in enumerate(t.get("outputs") or [])],
+        )
+        self._apply_balances(block.transactions, 1)
+
+    def _truncate(self, height: int):
+        """Hapus block di atas `height` beserta efeknya pada saldo (reorg)."""
+        for block in self.load_blocks(height + 1):
+            self._apply_balances(block.transactions, -1)
+        self.conn.execute("DELETE FROM transactions WHERE height > ?", (height,))
+        self.conn.execute("DELETE FROM tx_outputs WHERE height > ?", (height,))
+        self.conn.execute("DELETE FROM blocks WHERE height > ?", (height,))
+
+    def _apply_balances(self, transactions: List[Transaction], sign: int):
+        # Aturan sama dengan Blockchain.get_balance: pengirim membayar amount + fee
+        deltas: Dict[str, float] = {}
+        for tx in transactions:
+            deltas[tx.sender] = deltas.get(tx.sender, 0.0) - tx.total_debit
+            for addr, amount in tx.credits():
+                deltas[addr] = deltas.get(addr, 0.0) + amount
+        self.conn.executemany(
+            "INSERT INTO balances (address, balance) VALUES (?, ?) "
+            "ON CONFLICT(address) DO UPDATE SET balance = balance + excluded.balance",
+            [(addr, sign * delta) for addr, delta in deltas.items()],
+        )
+
+    def rebuild_index(self):
+        """Bangun ulang tabel transactions & balances dari tabel blocks."""
+        with self.conn:
+            self.conn.execute("DELETE FROM transactions")
+            self.conn.execute("DELETE FROM tx_outputs")
+            self.conn.execute("DELETE FROM balances")
+            blocks = self.load_blocks(1)
+            self.conn.execute("DELETE FROM blocks")
+            for block in blocks:
+                self._write_block(block)
+            self.conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('index_version', ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value", (self.INDEX_VERSION,)
+            )
+
+    # -----------------------------------
+    # Query berindex
+    # -----------------------------------
+    def get_balance(self, address: str) -> float:
+        row = self.conn.execute("SELECT balance FROM balances WHERE address = ?", (address,)).fetchone()
+        return row[0] if row else 0.0
+
+    def get_balances(self, addresses: Iterable[str]) -> Dict[str, float]:
+        addresses = list(addresses)
+        result = {a: 0.0 for a in addresses}
+        for i in range(0, len(addresses), 500):
+            chunk = addresses[i:i + 500]
+            rows = self.conn.execute(
+                f"SELECT address, balance FROM balances WHERE address IN ({','.join('?' * len(chunk))})", chunk
+            )
+            result.update(rows)
+        return result
+
+    def account_states(self, addresses: Iterable[str],
+                       expected_tip: Optional[str] = None) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        Saldo & height aktivitas terakhir beberapa alamat dalam satu transaksi baca
+        (snapshot konsisten walau writer sedang publish). None jika tip store
+        bukan `expected_tip`.
+        """
+        addresses = list(dict.fromkeys(addresses))
+        conn = self.conn
+        own_txn = not conn.in_transaction
+        if own_txn:
+            conn.execute("BEGIN")
+        try:
+            if expected_tip is not None and self.tip()[1] != expected_tip:
+                return None
+            balances = self.get_balances(addresses)
+            last: Dict[str, int] = {}
+            for i in range(0, len(addresses), 500):
+                chunk = addresses[i:i + 500]
+                marks = ",".join("?" * len(chunk))
+                # Penerima transaksi multi-output dicari di tx_outputs, bukan kolom recipient (penanda)
+                for table, column in (("transactions", "sender"), ("transactions", "recipient"),
+                                      ("tx_outputs", "recipient")):
+                    rows = conn.execute(
+                        f"SELECT {column}, MAX(height) FROM {table} WHERE {column} IN ({marks}) "
+                        f"AND {column} != ? GROUP BY {column}",
+                        chunk + [MULTI_RECIPIENT],
+                    )
+                    for address, height in rows:
+                        last[address] = max(last.get(address, 0), height)
+        finally:
+            if own_txn:
+                conn.execute("COMMIT")
+        return {a: {"balance": balances[a], "last_activity": last.get(a)} for a in addresses}
+
+    def find_transaction(self, tx_id: str) -> Optional[Tuple[Dict[str, Any], int]]:
+        """Transaksi (dict) beserta height block-nya, atau None."""
+        row = self.conn.execute(
+            "SELECT data, height FROM transactions WHERE id = ? ORDER BY height LIMIT 1", (tx_id,)
+        ).fetchone()
+        return (json.loads(row[0]), row[1]) if row else None
+
+    def address_history(self, address: str, limit: int = 50, offset: int = 0) -> List[Tuple[Dict[str, Any], int]]:
+        """Transaksi yang melibatkan `address`, terbaru lebih dulu."""
+        rows = self.conn.execute(
+            "SELECT data, height FROM transactions WHERE sender = ? OR recipient = ? "
+            "OR (height, position) IN (SELECT height, position FROM tx_outputs WHERE recipient = ?) "
+            "ORDER BY height DESC, position DESC LIMIT ? OFFSET ?",
+            (address, address, address, limit, offset),
+        )
+        return [(json.loads(data), height) for data, height in rows]
+
+    # -----------------------------------
+    # Mempool
+    # -----------------------------------
+    def mempool_ids(self) -> set:
+        return {row[0] for row in self.conn.execute("SELECT id FROM mempool")}
+
+    def load_mempool(self) -> List[Transaction]:
+        rows = self.conn.execute("SELECT data FROM mempool ORDER BY rowid")
+        return [Transaction(**json.loads(data)) for (data,) in rows]
+
+    def publish_mempool(self, txs: List[Transaction]) -> bool:
+        """Tulis selisih mempool (tambah/hapus) dibanding isi store saat ini."""
+        stored = self.mempool_ids()
+        current = {tx.id for tx in txs}
+        added = [tx for tx in txs if tx.id not in stored]
+        removed = stored - current
+        if not added and not removed:
+            return False
+        with self.conn:
+            self.conn.executemany("DELETE FROM mempool WHERE id = ?", [(i,) for i in removed])
+            self.conn.executemany(
+                "INSERT INTO mempool (id, data) VALUES (?, ?)",
+                [(tx.id, json.dumps(tx.model_dump())) for tx in added],
+            )
+            self._bump("mempool_version")
+        return True
+
+
+class StorePublisher:
+    """Sisi writer: salin perubahan chain & mempool node ke ChainStore."""
+
+    def __init__(self, store: ChainStore, node):
+        self.store = store
+        self.node = node
+        self._mempool_version = -1
+        self._tip_hash = None
+        self._lock = threading.Lock()
+
+    def load_or_init(self) -> int:
+        """
+        Saat writer start: jika store berisi chain dengan genesis yang sama, chain
+        tersebut dipakai (sudah divalidasi saat ditulis). Jika tidak, chain node ditulis.
+        """
+        genesis = self.node.blockchain.chain[0]
+        if self.store.hash_at(1) == genesis.hash:
+            blocks = self.store.load_blocks(1)
+            with self.node.lock:
+                if len(blocks) > self.node.blockchain.height:
+                    self.node.blockchain.chain = blocks
+        self.publish()
+        return self.node.blockchain.height
+
+    def publish(self):
+        with self._lock:
+            with self.node.lock:
+                chain = list(self.node.blockchain.chain)
+                txs = list(self.node.mempool.all_transactions())
+                mempool_version = self.node.mempool.version
+            if chain[-1].hash != self._tip_hash:
+                self.store.publish_chain(chain)
+                self._tip_hash = chain[-1].hash
+            if mempool_version != self._mempool_version:
+                self.store.publish_mempool(txs)
+                self._mempool_version = mempool_version
+
+
+class StoreView:
+    """
+    Sisi reader: muat ulang chain & mempool lokal dari ChainStore hanya jika
+    versi di store berubah. Jika chain hanya bertambah, hanya block baru yang dibaca.
+    """
+
+    def __init__(self, store: ChainStore, node):
+        self.store = store
+        self.node = node
+        self._versions = (-1, -1)
+        self._lock = threading.Lock()
+
+    @property
+    def mempool_version(self) -> int:
+        """Versi mempool di store (sama untuk semua reader, dipakai sebagai ETag)."""
+        return self._versions[1]
+
+    def refresh(self) -> bool:
+        with self._lock:
+            chain_version, mempool_version = self.store.versions()
+            if (chain_version, mempool_version) == self._versions:
+                return False
+            blockchain = self.node.blockchain
+            if chain_version != self._versions[0]:
+                ours = blockchain.height
+                if ours and self.store.hash_at(ours) == blockchain.last_block.hash:
+                    blockchain.chain = blockchain.chain + self.store.load_blocks(ours + 1)
+                else:
+                    blocks = self.store.load_blocks(1)
+                    if blocks:
+                        blockchain.chain = blocks
+            if mempool_version != self._versions[1]:
+                self.node.mempool.replace(self.store.load_mempool())
+            self._versions = (chain_version, mempool_version)
+            return True
+
+
+# -----------------------------------
+# CLI migrasi
+# -----------------------------------
+def import_chain(db_path: str, path: Optional[str] = None, node_url: Optional[str] = None) -> int:
+    """Validasi chain dari file NDJSON atau node lalu tulis ke store. Mengembalikan tinggi chain."""
+    from .blockchain import Blockchain
+    from .chain_io import StreamImporter, iter_lines
+
+    importer = StreamImporter(Blockchain())
+    if node_url:
+        import requests
+        with requests.get(f"{node_url.rstrip('/')}/blocks/stream", stream=True, timeout=30) as r:
+            r.raise_for_status()
+            importer.feed_all(iter_lines(r.iter_content(chunk_size=65536)))
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            importer.feed_all(f)
+    store = ChainStore(db_path)
+    store.publish_chain(importer.blockchain.chain)
+    return importer.blockchain.height
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Kelola store SQLite chain")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_import = sub.add_parser("import", help="Impor chain dari file NDJSON atau node yang berjalan")
+    p_import.add_argument("path", nargs="?", default=None)
+    p_import.add_argument("--node", default=None)
+    p_import.add_argument("--db", required=True)
+    p_reindex = sub.add_parser("reindex", help="Bangun ulang tabel transaksi & saldo dari tabel blocks")
+    p_reindex.add_argument("--db", required=True)
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "import":
+            if not args.path and not args.node:
+                parser.error("butuh path file NDJSON atau --node")
+            height = import_chain(args.db, args.path, args.node)
+            print(f"✅ Chain dengan {height} block diimpor ke {args.db}")
+        else:
+            ChainStore(args.db).rebuild_index()
+            print(f"✅ Index {args.db} dibangun ulang")
+    except Exception as e:
+        print(f"❌ Gagal: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+# src/sync.py
+import time
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+from .blockchain import Block
+from .config import SYNC_CHUNK_SIZE, SYNC_PER_PEER_INFLIGHT, SYNC_CHUNK_TIMEOUT, NETWORK_TIMEOUT
+
+
+@dataclass
+class SyncResult:
+    status: str                       # "synced", "up_to_date", "fork", "invalid", "stalled", "no_peers"
+    added: int = 0
+    target_height: int = 0
+    peers_used: List[str] = field(default_factory=list)
+    reassigned: int = 0
+    elapsed: float = 0.0
+
+
+class SyncEngine:
+    """
+    Download block yang kurang secara paralel dari beberapa peer.
+    Rentang height yang hilang dipecah menjadi chunk; setiap peer boleh memegang
+    `per_peer_inflight` chunk sekaligus. Chunk yang lambat (melewati `chunk_timeout`)
+    atau gagal dialihkan ke peer lain. Block dimasukkan ke validasi secara berurutan
+    begitu chunk berikutnya tersedia, jadi validasi berjalan sambil download.
+    """
+
+    def __init__(self, node, chunk_size: int = SYNC_CHUNK_SIZE,
+                 per_peer_inflight: int = SYNC_PER_PEER_INFLIGHT,
+                 chunk_timeout: float = SYNC_CHUNK_TIMEOUT):
+        self.node = node
+        self.chunk_size = chunk_size
+        self.per_peer_inflight = per_peer_inflight
+        self.chunk_timeout = chunk_timeout
+
+    # -----------------------------------
+    # Akses jaringan (di-override di test / simulator)
+    # -----------------------------------
+    def get_tip(self, peer: str) -> Tuple[int, str]:
+        r = self.node.peer_manager.get(peer, "/blocks/tip", timeout=NETWORK_TIMEOUT)
+        r.raise_for_status()
+        data = r.json()
+        return int(data["height"]), data["hash"]
+
+    def get_range(self, peer: str, start: int, count: int) -> List[Block]:
+        r = self.node.peer_manager.get(
+            peer, "/blocks/range", params={"start": start, "count": count}, timeout=self.chunk_timeout
+        )
+        r.raise_for_status()
+        return [Block.from_dict(b) for b in r.json().get("blocks", [])]
+
+    def penalize(self, peer: str):
+        self.node.peer_manager.record_failure(peer)
+
+    def candidate_peers(self) -> List[str]:
+        return self.node.peer_manager.healthy()
+
+    # -----------------------------------
+    # Sync utama
+    # -----------------------------------
+    def sync(self) -> SyncResult:
+        started = time.time()
+        chain = self.node.blockchain
+        peers = self.candidate_peers()
+        if not peers:
+            return SyncResult(status="no_peers")
+
+        pool = ThreadPoolExecutor(max_workers=len(peers) * self.per_peer_inflight)
+        try:
+            tips: Dict[str, Tuple[int, str]] = {}
+            futures = {pool.submit(self.get_tip, p): p for p in peers}
+            for fut in futures:
+                try:
+                    tips[futures[fut]] = fut.result()
+                except Exception:
+                    self.penalize(futures[fut])
+
+            if not tips:
+                return SyncResult(status="no_peers")
+            target_height, target_hash = max(tips.values())
+            if target_height <= chain.height:
+                return SyncResult(status="up_to_date", target_height=chain.height)
+
+            # Hanya peer yang sepakat dengan tip terbaik yang dipakai untuk download
+            sources = [p for p in peers if tips.get(p) == (target_height, target_hash)]
+
+            # Pastikan chain kita adalah prefix dari chain peer (tidak ada fork)
+            try:
+                ours = self.get_range(sources[0], chain.height, 1)
+            except Exception:
+                ours = []
+            if not ours or ours[0].hash != chain.last_block.hash:
+                return SyncResult(status="fork", target_height=target_height, peers_used=sources)
+
+            result = self._download(pool, sources, chain.height + 1, target_height)
+            with getattr(self.node, "lock", None) or nullcontext():
+                # Block di bawah checkpoint yang belum terkonfirmasi diverifikasi penuh
+                if not chain.verify_deferred():
+                    result.status = "invalid"
+            result.elapsed = time.time() - started
+            return result
+        finally:
+            # Jangan tunggu request lambat yang hasilnya sudah tidak dipakai
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _download(self, pool, sources: List[str], first: int, last: int) -> SyncResult:
+        chain = self.node.blockchain
+        result = SyncResult(status="synced", target_height=last, peers_used=list(sources))
+        pending: List[int] = list(range(first, last + 1, self.chunk_size))
+        done: Dict[int, Tuple[str, List[Block]]] = {}
+        in_flight: Dict = {}               # future -> (peer, start, submitted_at)
+        load: Dict[str, int] = {p: 0 for p in sources}
+        strikes: Dict[str, int] = {p: 0 for p in sources}
+        next_start = first
+
+        while next_start <= last:
+            # 1. Bagikan chunk ke peer yang masih punya slot (peer paling sehat lebih dulu)
+            for peer in sources:
+                while pending and load[peer] < self.per_peer_inflight and strikes[peer] < 3:
+                    start = pending.pop(0)
+                    count = min(self.chunk_size, last - start + 1)
+                    fut = pool.submit(self.get_range, peer, start, count)
+                    in_flight[fut] = (peer, start, time.time())
+                    load[peer] += 1
+
+            if not in_flight:
+                result.status = "stalled"
+                break
+
+            finished, _ = wait(list(in_flight), timeout=self.chunk_timeout, return_when=FIRST_COMPLETED)
+
+            # 2. Chunk yang terlalu lama dialihkan ke peer lain (hasil yang datang belakangan diabaikan)
+            now = time.time()
+            for fut, (peer, start, submitted) in list(in_flight.items()):
+                if fut not in finished and now - submitted >= self.chunk_timeout:
+                    del in_flight[fut]
+                    load[peer] -= 1
+                    strikes[peer] += 1
+                    if start >= next_start and start not in done and start not in pending:
+                        pending.insert(0, start)
+                        result.reassigned += 1
+
+            for fut in finished:
+                if fut not in in_flight:
+                    continue
+                peer, start, _ = in_flight.pop(fut)
+                load[peer] -= 1
+                expected = min(self.chunk_size, last - start + 1)
+                try:
+                    blocks = fut.result()
+                except Exception:
+                    blocks = None
+                if not blocks or len(blocks) != expected or blocks[0].index != start:
+                    self.penalize(peer)
+                    strikes[peer] += 1
+                    if start >= next_start and start not in done and start not in pending:
+                        pending.insert(0, start)
+                        result.reassigned += 1
+                    continue
+                if start >= next_start:
+                    done.setdefault(start, (peer, blocks))
+
+            # 3. Masukkan chunk ke validasi sesuai urutan height
+            while next_start in done:
+                peer, blocks = done.pop(next_start)
+                with getattr(self.node, "lock", None) or nullcontext():
+                    for block in blocks:
+                        if not chain.add_block(block):
+                            self.penalize(peer)
+                            result.status = "invalid"
+                            return result
+                        result.added += 1
+                        self.node.mempool.remove_transactions(
+                            [t.id for t in block.transactions if t.sender != 'coinbase']
+                        )
+                next_start += self.chunk_size
+
+        return result
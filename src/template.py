@@ -0,0 +1,178 @@
+# src/template.py
+import heapq
+import threading
+from typing import Dict, List, Optional, Tuple
+from .tx import Transaction
+from .config import MAX_BLOCK_SIZE, MAX_BLOCK_TXS
+
+
+class BlockTemplateBuilder:
+    """
+    Menyusun daftar transaksi untuk block berikutnya.
+    - Dipilih berdasarkan fee rate (fee per byte) tertinggi.
+    - Transaksi dari pengirim yang sama tetap berurutan (timestamp), karena
+      transaksi berikutnya bergantung pada saldo setelah transaksi sebelumnya.
+    - Dibatasi MAX_BLOCK_SIZE byte dan MAX_BLOCK_TXS transaksi.
+    - Hasil verifikasi signature di-cache sehingga mining tidak memverifikasi ulang.
+    - Transaksi yang bergantung pada kredit pending (lihat PendingState) hanya
+      dimasukkan setelah parent-nya; jika terambil lebih dulu (mis. child dengan
+      fee rate lebih tinggi) ia menunggu dan kembali ke heap saat parent masuk.
+    - Jika `enforce_balance` aktif, transaksi yang saldonya tidak cukup dilewati.
+      Defaultnya nonaktif karena aturan chain saat ini mengizinkan saldo negatif
+      (lihat verify_balance.py).
+    - Template diperbarui secara inkremental saat transaksi baru masuk, dan
+      disusun ulang hanya ketika tip chain berubah atau ada transaksi yang keluar.
+    """
+
+    def __init__(self, blockchain, mempool, max_size: int = MAX_BLOCK_SIZE, max_txs: int = MAX_BLOCK_TXS,
+                 enforce_balance: bool = False):
+        self.blockchain = blockchain
+        self.mempool = mempool
+        self.max_size = max_size
+        self.max_txs = max_txs
+        self.enforce_balance = enforce_balance
+        self.verified = set()           # Transaction.verification_key() yang sudah lolos verifikasi
+        self.transactions: List[Transaction] = []
+        self.size = 0
+        self.fees = 0.0
+        self._included = set()
+        self._available: Dict[str, float] = {}
+        self._tip_hash: Optional[str] = None
+        self._mempool_version = -1
+        self._lock = threading.RLock()
+
+    # -----------------------------------
+    # Cache verifikasi
+    # -----------------------------------
+    def is_verified(self, tx: Transaction) -> bool:
+        key = tx.verification_key()
+        if key in self.verified:
+            return True
+        if tx.validate_tx():
+            self.verified.add(key)
+            return True
+        return False
+
+    def mark_verified(self, tx: Transaction):
+        self.verified.add(tx.verification_key())
+
+    # -----------------------------------
+    # Penyusunan template
+    # -----------------------------------
+    def rebuild(self) -> List[Transaction]:
+        with self._lock:
+            pending = list(self.mempool.all_transactions())
+            by_sender: Dict[str, List[Transaction]] = {}
+            for tx in pending:
+                by_sender.setdefault(tx.sender, []).append(tx)
+            for txs in by_sender.values():
+                txs.sort(key=lambda t: t.timestamp)
+            # Cache verifikasi hanya untuk transaksi yang masih ada di mempool
+            self.verified &= {t.verification_key() for t in pending}
+
+            # Satu kali scan chain untuk saldo semua pengirim
+            self._available = self.blockchain.get_balances(by_sender.keys()) if self.enforce_balance else {}
+            self.transactions, self.size, self.fees = [], 0, 0.0
+            self._included = set()
+
+            # Heap berisi transaksi terdepan dari setiap pengirim, diurutkan fee rate
+            heap = []
+
+            def push(sender: str, pos: int):
+                tx = by_sender[sender][pos]
+                heapq.heappush(heap, (-self._fee_rate(tx), tx.timestamp, sender, pos))
+
+            for sender in by_sender:
+                push(sender, 0)
+            # id parent -> (pengirim, posisi) transaksi yang menunggu parent itu masuk
+            waiting: Dict[str, List[Tuple[str, int]]] = {}
+            while heap and len(self.transactions) < self.max_txs:
+                _, _, sender, pos = heapq.heappop(heap)
+                tx = by_sender[sender][pos]
+                parent = self._missing_parent(tx)
+                if parent is not None:
+                    waiting.setdefault(parent, []).append((sender, pos))
+                    continue
+                if not self._try_include(tx):
+                    # Transaksi berikutnya dari pengirim ini bergantung pada yang gagal
+                    continue
+                for dependent in waiting.pop(tx.id, ()):
+                    push(*dependent)
+                if pos + 1 < len(by_sender[sender]):
+                    push(sender, pos + 1)
+
+            self._tip_hash = self.blockchain.last_block.hash
+            self._mempool_version = self.mempool.version
+            return list(self.transactions)
+
+    def on_new_transaction(self, tx: Transaction):
+        """Tambahkan transaksi baru ke template tanpa menyusun ulang jika memungkinkan."""
+        with self._lock:
+            self.mark_verified(tx)
+            if self._tip_hash != self.blockchain.last_block.hash:
+                return
+            if self._mempool_version + 1 != self.mempool.version:
+                # Ada perubahan lain di mempool sejak template terakhir; susun ulang nanti
+                return
+            same_sender = [t for t in self.mempool.all_transactions() if t.sender == tx.sender and t.id != tx.id]
+            if any(t.id in self._included and t.timestamp > tx.timestamp for t in same_sender):
+                # Transaksi datang tidak berurutan: urutan pengirim harus disusun ulang
+                self._mempool_version = -1
+                return
+            if self.enforce_balance and tx.sender not in self._available:
+                self._available.update(self.blockchain.get_balances([tx.sender]))
+            # Pengirim yang punya transaksi pending tertinggal tidak boleh dilompati
+            blocked = any(t.id not in self._included for t in same_sender)
+            if not blocked and len(self.transactions) < self.max_txs:
+                self._try_include(tx)
+            self._mempool_version = self.mempool.version
+
+    def get_template(self) -> List[Transaction]:
+        with self._lock:
+            if self._tip_hash != self.blockchain.last_block.hash or self._mempool_version != self.mempool.version:
+                return self.rebuild()
+            return list(self.transactions)
+
+    def summary(self) -> dict:
+        txs = self.get_template()
+        return {
+            "tip": self._tip_hash,
+            "tx_count": len(txs),
+            "size": self.size,
+            "max_size": self.max_size,
+            "fees": self.fees,
+            "transactions": [t.id for t in txs],
+        }
+
+    # -----------------------------------
+    # Helper
+    # -----------------------------------
+    @staticmethod
+    def _fee_rate(tx: Transaction) -> float:
+        return tx.fee / max(tx.size(), 1)
+
+    def _missing_parent(self, tx: Transaction) -> Optional[str]:
+        """Parent (lihat PendingState) yang belum ada di template, atau None."""
+        for parent in self.mempool.pending.parents.get(tx.id, ()):
+            if parent not in self._included:
+                return parent
+        return None
+
+    def _try_include(self, tx: Transaction) -> bool:
+        size = tx.size()
+        if self.size + size > self.max_size:
+            return False
+        if self.enforce_balance and self._available.get(tx.sender, 0.0) < tx.total_debit:
+            return False
+        # Transaksi yang dibiayai kredit pending hanya masuk setelah parent-nya
+        if self._missing_parent(tx) is not None:
+            return False
+        if not self.is_verified(tx):
+            return False
+        if self.enforce_balance:
+            self._available[tx.sender] -= tx.total_debit
+        self.transactions.append(tx)
+        self._included.add(tx.id)
+        self.size += size
+        self.fees += tx.fee
+        return True
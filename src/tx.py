@@ -1,36 +1,144 @@
 # src/tx.py
 
-from pydantic import BaseModel
-from typing import Optional, List, Any # Import Any untuk tipe Wallet
+from pydantic import BaseModel, ConfigDict, PrivateAttr
+from typing import Optional, List, Any, Dict, Tuple # Import Any untuk tipe Wallet
+import json
 import time
 from .utils import hash_data
+from .config import MEMPOOL_TX_MAX_AGE, MEMPOOL_EVICT_INTERVAL, MAX_TX_OUTPUTS
 # HAPUS: from .wallet import Wallet (Karena akan menyebabkan circular dependency)
 
+# Field yang ikut menentukan ID transaksi
+_ID_FIELDS = frozenset({"sender", "recipient", "amount", "fee", "timestamp", "outputs"})
+
+# Nilai `recipient` untuk transaksi multi-output; penerima sebenarnya ada di `outputs`
+MULTI_RECIPIENT = "multi"
+
+
+class TxOutput(BaseModel):
+    """Satu pembayaran di dalam transaksi multi-output."""
+    model_config = ConfigDict(frozen=True)
+
+    recipient: str
+    amount: float
+
+
 class Transaction(BaseModel):
     id: Optional[str] = None
     sender: str
     recipient: str
     amount: float
+    fee: float = 0.0
     timestamp: float = None
     signature: Optional[str] = None
+    # Batched payment: banyak penerima di bawah satu signature (amount = total outputs)
+    outputs: Optional[List[TxOutput]] = None
+
+    # Cache turunan (tidak ikut serialisasi), dikosongkan setiap kali field diubah.
+    # ID, hash leaf merkle & hasil verifikasi signature cukup dihitung sekali.
+    _id_cache: Optional[str] = PrivateAttr(default=None)
+    _leaf_cache: Optional[str] = PrivateAttr(default=None)
+    _valid_cache: Optional[bool] = PrivateAttr(default=None)
 
     def __init__(self, **data):
         if "timestamp" not in data or data.get("timestamp") is None:
             data["timestamp"] = time.time()
+        if data.get("outputs"):
+            outputs = [TxOutput.model_validate(o) for o in data["outputs"]]
+            data["outputs"] = outputs
+            data.setdefault("recipient", MULTI_RECIPIENT)
+            data.setdefault("amount", sum(o.amount for o in outputs))
         super().__init__(**data)
         if self.id is None:
             self.id = self.calculate_id()
 
+    def __setattr__(self, name: str, value: Any):
+        super().__setattr__(name, value)
+        if name.startswith("_"):
+            return
+        if name in _ID_FIELDS:
+            self._id_cache = None
+        self._leaf_cache = None
+        self._valid_cache = None
+
     def calculate_id(self) -> str:
-        # ID adalah hash dari konten transaksi (tanpa signature/id)
+        # ID adalah hash dari konten transaksi (tanpa signature/id); dihitung sekali lalu di-cache
+        if self._id_cache is None:
+            self._id_cache = self._compute_id()
+        return self._id_cache
+
+    def _compute_id(self) -> str:
         tx_dict = {
             "sender": self.sender,
             "recipient": self.recipient,
             "amount": self.amount,
             "timestamp": self.timestamp,
         }
+        # Fee hanya ikut di-hash jika ada, agar ID transaksi lama tidak berubah
+        if self.fee:
+            tx_dict["fee"] = self.fee
+        if self.outputs is not None:
+            tx_dict["outputs"] = [[o.recipient, o.amount] for o in self.outputs]
         return hash_data(tx_dict)
 
+    def model_dump(self, **kwargs) -> Dict[str, Any]:
+        # Transaksi biasa diserialisasi tanpa `outputs`, agar hash leaf & block lama tidak berubah
+        data = super().model_dump(**kwargs)
+        if self.outputs is None:
+            data.pop("outputs", None)
+        return data
+
+    @property
+    def total_debit(self) -> float:
+        """Jumlah yang dipotong dari saldo pengirim (amount + fee)."""
+        return self.amount + self.fee
+
+    def credits(self) -> List[Tuple[str, float]]:
+        """Pasangan (alamat, jumlah) yang diterima; satu untuk transaksi biasa."""
+        if self.outputs is None:
+            return [(self.recipient, self.amount)]
+        return [(o.recipient, o.amount) for o in self.outputs]
+
+    def recipients(self) -> List[str]:
+        return [addr for addr, _ in self.credits()]
+
+    def is_well_formed(self) -> bool:
+        """Aturan struktural (tanpa signature); dicek juga untuk block di bawah checkpoint."""
+        if self.outputs is None:
+            return True
+        if self.sender == 'coinbase' or self.recipient != MULTI_RECIPIENT:
+            return False
+        if not 0 < len(self.outputs) <= MAX_TX_OUTPUTS:
+            return False
+        if any(o.amount <= 0 for o in self.outputs):
+            return False
+        # Satu output per penerima (pembayaran ke alamat yang sama digabung oleh pengirim)
+        if len({o.recipient for o in self.outputs}) != len(self.outputs):
+            return False
+        return abs(self.amount - sum(o.amount for o in self.outputs)) <= 1e-9
+
+    def size(self) -> int:
+        """Ukuran serialisasi (byte) untuk batas ukuran block dan fee rate."""
+        return len(json.dumps(self.model_dump(), sort_keys=True))
+
+    def leaf_hash(self) -> str:
+        """Hash seluruh isi transaksi (termasuk signature) sebagai leaf merkle tree."""
+        if self._leaf_cache is None:
+            self._leaf_cache = hash_data(self.model_dump())
+        return self._leaf_cache
+
+    def has_valid_id(self) -> bool:
+        """ID yang diklaim (mis. hasil deserialisasi) cocok dengan isinya; diverifikasi sekali."""
+        return self.id == self.calculate_id()
+
+    def verification_key(self) -> str:
+        """
+        Kunci cache hasil verifikasi: hash seluruh isi (termasuk ID & signature).
+        (id, signature) saja tidak cukup karena ID yang diklaim bisa disalin
+        ke transaksi lain yang isinya berbeda.
+        """
+        return self.leaf_hash()
+
     # FUNGSI BARU UNTUK KONSISTENSI HASH
     def get_signing_hash(self) -> str: # <--- KOREKSI: Fungsi pembantu baru
         # Hash data yang digunakan untuk ditandatangani, sama dengan ID
@@ -40,14 +148,24 @@ class Transaction(BaseModel):
         # Payload yang akan ditandatangani adalah hash-nya (HEX string)
         payload_hash = self.get_signing_hash() # <--- KOREKSI: Tandatangani HASH
         self.signature = wallet.sign(payload_hash)
-        self.id = self.calculate_id() # Hitung ID final setelah tanda tangan
+        self.id = payload_hash # ID final = hash yang ditandatangani (signature tidak ikut di-hash)
 
     def validate_tx(self) -> bool:
+        # Hasil verifikasi di-cache sampai ada field yang berubah
+        if self._valid_cache is None:
+            self._valid_cache = self._verify()
+        return self._valid_cache
+
+    def _verify(self) -> bool:
         from .wallet import verify_signature # <--- KOREKSI: Import lokal untuk circular dependency
-        
+
+        if not self.is_well_formed() or not self.has_valid_id():
+            return False
         # Coinbase transactions have signature == 'coinbase'
         if self.sender == 'coinbase':
             return True
+        if self.fee < 0:
+            return False
         if not self.signature:
             return False
         
@@ -58,36 +176,352 @@ class Transaction(BaseModel):
         return verify_signature(self.sender, payload_hash, self.signature)
 
 
-class Mempool:
+class PendingState:
+    """
+    Overlay saldo pending di atas state terkonfirmasi, dipelihara inkremental
+    (O(output) per transaksi masuk/keluar, tanpa menjumlah ulang mempool):
+
+    - per alamat: total masuk, total keluar (amount + fee) & jumlah transaksi pending;
+    - rantai dependensi: transaksi yang hanya terdanai oleh kredit pending
+      mencatat transaksi pemberi kredit itu sebagai parent. Jika parent keluar
+      tanpa terkonfirmasi (kedaluwarsa/dibuang), turunannya ikut dibuang; jika
+      parent masuk block, dependensinya selesai.
+    """
+
     def __init__(self):
+        self._deltas: Dict[str, List[float]] = {}       # alamat -> [masuk, keluar, jumlah tx]
+        self._credited_by: Dict[str, set] = {}          # alamat -> id tx pending yang mengkredit
+        self._txs: Dict[str, Transaction] = {}
+        self.parents: Dict[str, set] = {}
+        self.children: Dict[str, set] = {}
+
+    def __len__(self) -> int:
+        return len(self._txs)
+
+    def get(self, address: str) -> Tuple[float, float]:
+        delta = self._deltas.get(address)
+        return (delta[0], delta[1]) if delta else (0.0, 0.0)
+
+    def available(self, address: str, confirmed: float, pending: Optional[Tuple[float, float]] = None) -> float:
+        """
+        Saldo yang bisa dibelanjakan: terkonfirmasi + masuk pending - keluar pending.
+        `pending` = hasil get(address) yang diambil sebelumnya (snapshot bersama chain).
+        """
+        incoming, outgoing = self.get(address) if pending is None else pending
+        return confirmed + incoming - outgoing
+
+    def add(self, tx: Transaction, confirmed: Optional[float] = None):
+        """Catat transaksi; `confirmed` (saldo pengirim di chain) dipakai untuk menentukan parent."""
+        if confirmed is not None and confirmed - self.get(tx.sender)[1] < tx.total_debit:
+            parents = set(self._credited_by.get(tx.sender, ()))
+            if parents:
+                self.parents[tx.id] = parents
+                for parent in parents:
+                    self.children.setdefault(parent, set()).add(tx.id)
+        self._txs[tx.id] = tx
+        self._apply(tx.sender, 0.0, tx.total_debit, 1)
+        for addr, amount in tx.credits():
+            self._apply(addr, amount, 0.0, 1)
+            self._credited_by.setdefault(addr, set()).add(tx.id)
+
+    def remove(self, tx_id: str):
+        tx = self._txs.pop(tx_id, None)
+        if tx is None:
+            return
+        self._apply(tx.sender, 0.0, -tx.total_debit, -1)
+        for addr, amount in tx.credits():
+            self._apply(addr, -amount, 0.0, -1)
+            self._unlink(self._credited_by, addr, tx_id)
+        for parent in self.parents.pop(tx_id, ()):
+            self._unlink(self.children, parent, tx_id)
+        for child in self.children.pop(tx_id, ()):
+            self._unlink(self.parents, child, tx_id)
+
+    def dependents(self, tx_ids) -> set:
+        """Semua turunan (transitif) dari `tx_ids` dalam rantai dependensi."""
+        found, stack = set(), list(tx_ids)
+        while stack:
+            for child in self.children.get(stack.pop(), ()):
+                if child not in found:
+                    found.add(child)
+                    stack.append(child)
+        return found
+
+    def snapshot(self) -> Dict[str, Tuple[float, float]]:
+        return {addr: (d[0], d[1]) for addr, d in self._deltas.items()}
+
+    def clear(self):
+        self.__init__()
+
+    def _apply(self, address: str, incoming: float, outgoing: float, count: int):
+        delta = self._deltas.setdefault(address, [0.0, 0.0, 0])
+        delta[0] += incoming
+        delta[1] += outgoing
+        delta[2] += count
+        if not delta[2]:
+            # Tanpa transaksi pending: buang sisa pembulatan float
+            del self._deltas[address]
+
+    @staticmethod
+    def _unlink(edges: Dict[str, set], key: str, tx_id: str):
+        linked = edges.get(key)
+        if linked is not None:
+            linked.discard(tx_id)
+            if not linked:
+                del edges[key]
+
+
+class Mempool:
+    def __init__(self, journal=None, max_age: float = MEMPOOL_TX_MAX_AGE):
         self.txs: List[Transaction] = []
+        self._ids = set()
+        # Naik setiap kali isi mempool berubah (dipakai template builder / cache)
+        self.version = 0
+        # Journal opsional (lihat src/journal.py) agar mempool selamat dari restart
+        self.journal = journal
+        self.max_age = max_age
+        # Waktu lokal saat transaksi diterima (id -> epoch); dasar kedaluwarsa, bukan timestamp dari klien
+        self._admitted: Dict[str, float] = {}
+        self._last_eviction = time.time()
+        # Saldo pending per alamat & dependensi antar transaksi, diperbarui per transaksi
+        self.pending = PendingState()
+        # (versi, {alamat: (masuk, keluar)}) snapshot overlay untuk query saldo pending
+        self._pending_cache: Tuple[int, Dict[str, Tuple[float, float]]] = (-1, {})
 
-    def add_transaction(self, tx: Transaction, blockchain=None) -> bool:
-        # Validate signature
-        if not tx.validate_tx():
+    def add_transaction(self, tx: Transaction, blockchain=None, verified: bool = False) -> bool:
+        # Validate signature (dilewati jika sudah diverifikasi di executor)
+        if not verified and not tx.validate_tx():
             return False
 
-        # Optional: check balance (simple account model)
+        # Prevent duplicates
+        if tx.id in self._ids:
+            return False
+
+        # Optional: check balance (simple account model). Kredit yang masih pending
+        # di mempool ikut bisa dibelanjakan; transaksi ini lalu bergantung padanya.
+        confirmed = None
         if blockchain:
-            sender_balance = blockchain.get_balance(tx.sender)
-            # Also account pending outgoing txs in mempool
-            pending_out = sum(t.amount for t in self.txs if t.sender == tx.sender)
-            if sender_balance - pending_out < tx.amount:
+            confirmed = blockchain.get_balance(tx.sender)
+            if self.pending.available(tx.sender, confirmed) < tx.total_debit:
                 return False
 
-        # Prevent duplicates
-        if any(existing.id == tx.id for existing in self.txs):
-            return False
+        self._insert(tx, confirmed)
+        self._maybe_evict()
+        return True
 
+    def _insert(self, tx: Transaction, confirmed: Optional[float] = None):
         self.txs.append(tx)
-        return True
+        self._ids.add(tx.id)
+        self._admitted[tx.id] = time.time()
+        self.pending.add(tx, confirmed)
+        self.version += 1
+        if self.journal:
+            self.journal.append_add(tx, self._admitted[tx.id])
 
     def get_transactions_for_block(self, limit: int = 100) -> List[Transaction]:
         # Return up to `limit` transactions (excluding coinbase)
         return [tx for tx in self.txs][:limit]
 
-    def remove_transactions(self, tx_ids: List[str]):
+    def remove_transactions(self, tx_ids: List[str], confirmed: bool = True) -> List[str]:
+        """
+        Keluarkan transaksi dari mempool. confirmed=True (masuk block) menyelesaikan
+        dependensi turunannya; confirmed=False (kedaluwarsa/dibuang) ikut membuang
+        transaksi yang bergantung padanya. Mengembalikan ID yang benar-benar dikeluarkan.
+        """
+        tx_ids = set(tx_ids)
+        if not confirmed:
+            tx_ids |= self.pending.dependents(tx_ids)
+        removed = [tx.id for tx in self.txs if tx.id in tx_ids]
         self.txs = [tx for tx in self.txs if tx.id not in tx_ids]
-    
+        self._ids.difference_update(removed)
+        for tx_id in removed:
+            self.pending.remove(tx_id)
+            self._admitted.pop(tx_id, None)
+        if removed:
+            self.version += 1
+        if self.journal and removed:
+            self.journal.append_remove(removed)
+            if self.journal.needs_compaction():
+                self.journal.compact(self.txs, self._admitted)
+        return removed
+
+    def reorg(self, disconnected, connected, blockchain=None) -> int:
+        """
+        Sesuaikan mempool setelah chain diganti: transaksi di block baru dikeluarkan,
+        transaksi dari block yang terlepas (dan tidak ada di chain baru) dikembalikan.
+        Dengan `blockchain` (chain baru) saldo transaksi yang kembali dicek ulang dan
+        overlay pending disusun ulang: transaksi yang kembali lebih dulu (urutan
+        block), lalu isi mempool lama, sehingga transaksi pending yang dibiayai
+        olehnya tercatat lagi sebagai turunannya.
+        Mengembalikan jumlah transaksi yang dikembalikan.
+        """
+        confirmed = {t.id for block in connected for t in block.transactions if t.sender != 'coinbase'}
+        self.remove_transactions(confirmed)
+        returned, seen = [], set(self._ids)
+        for block in disconnected:
+            for tx in block.transactions:
+                if tx.sender == 'coinbase' or tx.id in confirmed or tx.id in seen:
+                    continue
+                seen.add(tx.id)
+                returned.append(tx)
+        if blockchain is None:
+            for tx in returned:
+                self._insert(tx)
+            return len(returned)
+
+        existing = self.txs
+        balances = blockchain.get_balances({tx.sender for tx in returned + existing})
+        self.pending.clear()
+        accepted = []
+        for tx in returned:
+            # Tidak lagi terdanai di chain baru (mis. dananya ikut terlepas): tidak dikembalikan
+            if self.pending.available(tx.sender, balances[tx.sender]) < tx.total_debit:
+                continue
+            self.pending.add(tx, balances[tx.sender])
+            accepted.append(tx)
+        for tx in existing:
+            self.pending.add(tx, balances[tx.sender])
+        self.txs = accepted + existing
+        self._ids.update(tx.id for tx in accepted)
+        now = time.time()
+        self._admitted.update((tx.id, now) for tx in accepted)
+        self.version += 1
+        if self.journal:
+            for tx in accepted:
+                self.journal.append_add(tx, now)
+        return len(accepted)
+
+    def revalidate(self, blockchain) -> List[str]:
+        """
+        Cocokkan ulang isi mempool dengan chain yang baru dimuat (mis. dari store saat
+        startup): transaksi yang sudah masuk block dikeluarkan, yang tidak lagi terdanai
+        dibuang beserta turunannya, dan dependensi pending disusun ulang.
+        Mengembalikan ID yang dikeluarkan.
+        """
+        removed = self.remove_transactions(blockchain.find_confirmed([tx.id for tx in self.txs]))
+        balances = blockchain.get_balances({tx.sender for tx in self.txs})
+        self.pending.clear()
+        unfunded = []
+        for tx in self.txs:
+            if self.pending.available(tx.sender, balances[tx.sender]) < tx.total_debit:
+                unfunded.append(tx.id)
+                continue
+            self.pending.add(tx, balances[tx.sender])
+        self.version += 1
+        if unfunded:
+            # Turunan transaksi yang dibuang juga tidak terdanai (kreditnya tidak ikut di overlay)
+            removed += self.remove_transactions(unfunded, confirmed=False)
+        return removed
+
     def all_transactions(self) -> List[Transaction]:
-        return self.txs
\ No newline at end of file
+        return self.txs
+
+    def pending_deltas(self) -> Dict[str, Tuple[float, float]]:
+        """Total masuk & keluar (amount + fee) pending per alamat; snapshot overlay per versi mempool."""
+        version, deltas = self._pending_cache
+        if version == self.version:
+            return deltas
+        deltas = self.pending.snapshot()
+        self._pending_cache = (self.version, deltas)
+        return deltas
+
+    def replace(self, txs: List[Transaction]):
+        """Ganti seluruh isi mempool (dipakai worker reader yang membaca dari store)."""
+        self.txs = list(txs)
+        self._ids = {tx.id for tx in self.txs}
+        now = time.time()
+        self._admitted = {tx.id: self._admitted.get(tx.id, now) for tx in self.txs}
+        self.pending.clear()
+        for tx in self.txs:
+            self.pending.add(tx)
+        self.version += 1
+
+    def contains(self, tx_id: str) -> bool:
+        return tx_id in self._ids
+
+    # -----------------------------------
+    # Kedaluwarsa (expiry by age)
+    # -----------------------------------
+    def is_expired(self, tx: Transaction, now: Optional[float] = None) -> bool:
+        """Umur dihitung dari waktu lokal saat diterima; timestamp klien bisa dimundurkan/dimajukan."""
+        if not self.max_age:
+            return False
+        now = time.time() if now is None else now
+        return self._admitted.get(tx.id, now) < now - self.max_age
+
+    def evict_expired(self, now: Optional[float] = None) -> List[str]:
+        """Buang transaksi yang umurnya melewati `max_age`. Mengembalikan ID yang dibuang."""
+        now = time.time() if now is None else now
+        self._last_eviction = now
+        expired = [tx.id for tx in self.txs if self.is_expired(tx, now)]
+        if expired:
+            expired = self.remove_transactions(expired, confirmed=False)
+        return expired
+
+    def _maybe_evict(self):
+        if time.time() - self._last_eviction >= MEMPOOL_EVICT_INTERVAL:
+            self.evict_expired()
+
+    # -----------------------------------
+    # Restart recovery
+    # -----------------------------------
+    def restore(self, blockchain=None) -> int:
+        """
+        Muat ulang transaksi pending dari journal lalu validasi ulang secara massal
+        terhadap state chain saat ini: buang yang kedaluwarsa, duplikat, sudah
+        masuk block, signature tidak valid, atau saldo pengirim tidak cukup.
+        Journal kemudian dipadatkan agar hanya berisi transaksi yang lolos.
+
+        Tanpa blockchain, hanya pemeriksaan yang tidak butuh state chain yang dijalankan;
+        saat startup chain belum dimuat, jadi cek saldo ditunda ke revalidate().
+        """
+        if not self.journal:
+            return 0
+
+        now = time.time()
+        candidates: List[Transaction] = []
+        seen = set(self._ids)
+        admitted: Dict[str, float] = {}
+        for data, admitted_at in self.journal.replay():
+            try:
+                tx = Transaction.model_validate(data)
+            except Exception:
+                continue
+            # ID harus cocok dengan isi transaksi
+            if tx.id in seen or not tx.has_valid_id():
+                continue
+            # Entri lama tanpa waktu diterima: pakai timestamp klien, tapi tidak lebih dari sekarang
+            admitted_at = min(tx.timestamp, now) if admitted_at is None else admitted_at
+            if self.max_age and admitted_at < now - self.max_age:
+                continue
+            seen.add(tx.id)
+            admitted[tx.id] = admitted_at
+            candidates.append(tx)
+
+        if blockchain and candidates:
+            confirmed = blockchain.find_confirmed([tx.id for tx in candidates])
+            candidates = [tx for tx in candidates if tx.id not in confirmed]
+
+        candidates = [tx for tx in candidates if tx.validate_tx()]
+
+        if blockchain and candidates:
+            # Satu kali scan chain untuk semua pengirim, bukan get_balance per transaksi
+            available = blockchain.get_balances({tx.sender for tx in candidates})
+            for tx in self.txs:
+                if tx.sender in available:
+                    available[tx.sender] -= tx.total_debit
+            accepted = []
+            for tx in sorted(candidates, key=lambda t: t.timestamp):
+                if tx.sender == 'coinbase' or available[tx.sender] >= tx.total_debit:
+                    available[tx.sender] -= tx.total_debit
+                    accepted.append(tx)
+            candidates = accepted
+
+        self.txs.extend(candidates)
+        self._ids.update(tx.id for tx in candidates)
+        for tx in candidates:
+            self._admitted[tx.id] = admitted[tx.id]
+            self.pending.add(tx)
+        self.version += 1
+        self.journal.compact(self.txs, self._admitted)
+        return len(candidates)
@@ -1,7 +1,7 @@
 # utils.py
 import json
 import hashlib
-from typing import Any
+from typing import Any, List
 
 def _to_serializable(obj: Any):
     """Helper to convert pydantic/BaseModel or dataclass-like objects to dict for JSON."""
@@ -28,3 +28,60 @@ def hash_data(data: Any) -> str:
 def is_valid_proof(hash_hex: str, difficulty: int) -> bool:
     """Check whether hash_hex has `difficulty` leading zeros."""
     return hash_hex.startswith('0' * difficulty)
+
+# Target PoW numerik: hash (sebagai integer 256-bit) harus <= target.
+MAX_TARGET = 2 ** 256 - 1
+
+def difficulty_to_target(difficulty: int) -> int:
+    """Target yang setara dengan `difficulty` leading zeros hex (aturan lama)."""
+    return 16 ** (64 - difficulty) - 1
+
+def target_to_difficulty(target: int) -> int:
+    """Perkiraan jumlah leading zeros hex untuk target (hanya untuk tampilan)."""
+    return (256 - target.bit_length()) // 4
+
+def retarget(prev_target: int, actual: float, expected: float, max_factor: float) -> int:
+    """Skalakan target dengan rasio waktu aktual / waktu yang diharapkan (dibatasi `max_factor`)."""
+    actual = max(expected / max_factor, min(actual, expected * max_factor))
+    new_target = prev_target * int(actual * 1000) // int(expected * 1000)
+    return max(1, min(new_target, MAX_TARGET))
+
+def target_work(target: int) -> int:
+    """Perkiraan jumlah hash yang dibutuhkan untuk menemukan block dengan `target`."""
+    return 2 ** 256 // max(target, 1)
+
+def target_to_hex(target: int) -> str:
+    return format(target, "064x")
+
+def hash_meets_target(hash_hex: str, target: int) -> bool:
+    return int(hash_hex, 16) <= target
+
+# Merkle tree transaksi: daun = hash transaksi (dict hasil model_dump)
+def merkle_root(leaves: List[str]) -> str:
+    if not leaves:
+        return hash_data("")
+    level = list(leaves)
+    while len(level) > 1:
+        if len(level) % 2:
+            level.append(level[-1])   # jumlah ganjil: daun terakhir diduplikasi
+        level = [hash_data(level[i] + level[i + 1]) for i in range(0, len(level), 2)]
+    return level[0]
+
+def merkle_proof(leaves: List[str], index: int) -> List[List[str]]:
+    """Daftar [sisi, hash saudara] dari daun `index` sampai root ("L" = saudara di kiri)."""
+    proof = []
+    level = list(leaves)
+    while len(level) > 1:
+        if len(level) % 2:
+            level.append(level[-1])
+        sibling = index ^ 1
+        proof.append(["L" if sibling < index else "R", level[sibling]])
+        level = [hash_data(level[i] + level[i + 1]) for i in range(0, len(level), 2)]
+        index //= 2
+    return proof
+
+def verify_merkle_proof(leaf: str, proof: List[List[str]], root: str) -> bool:
+    current = leaf
+    for side, sibling in proof:
+        current = hash_data(sibling + current) if side == "L" else hash_data(current + sibling)
+    return current == root
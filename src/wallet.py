@@ -9,12 +9,21 @@ import json
 from .utils import hash_data # <--- KOREKSI: Gunakan relative import yang benar
 import hashlib
 
+
+def load_signing_key(private_key_hex: str) -> SigningKey:
+    """
+    Parse kunci privat HEX. Sengaja tidak di-cache di level modul: kunci hanya
+    hidup selama objek pemiliknya (Wallet / KeyStore) masih memegangnya.
+    """
+    return SigningKey.from_string(binascii.unhexlify(private_key_hex), curve=SECP256k1)
+
+
 class Wallet:
     """Mengelola kunci ECDSA dan penandatanganan menggunakan library ecdsa."""
     def __init__(self, private_key_hex: str = None):
         if private_key_hex:
             # Menggunakan string hex yang ada
-            self._sk = SigningKey.from_string(binascii.unhexlify(private_key_hex), curve=SECP256k1)
+            self._sk = load_signing_key(private_key_hex)
         else:
             # Membuat kunci baru
             self._sk = SigningKey.generate(curve=SECP256k1)
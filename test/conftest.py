@@ -0,0 +1,35 @@
+# conftest.py
+"""Helper bersama untuk test (chain & transaksi siap pakai)."""
+
+from src.blockchain import Blockchain
+from src.tx import Transaction
+from src.wallet import generate_key_pair, Wallet
+
+
+def extend_chain(bc: Blockchain, n: int):
+    """Tambah n block berisi coinbase saja (pakai Blockchain(difficulty=1) agar test cepat)."""
+    for _ in range(n):
+        bc.create_block(nonce=0, previous_hash=bc.last_block.hash, transactions=[], miner_address="miner")
+
+
+def make_signed_tx(amount: float, timestamp: float = None) -> Transaction:
+    priv, pub = generate_key_pair()
+    tx = Transaction(sender=pub, recipient="bob", amount=amount, timestamp=timestamp)
+    tx.sign(Wallet(private_key_hex=priv))
+    return tx
+
+
+def make_payout(wallet: Wallet, payees, fee: float = 0.5) -> Transaction:
+    tx = Transaction(sender=wallet.public_key_hex, outputs=[{"recipient": r, "amount": a} for r, a in payees], fee=fee)
+    tx.sign(wallet)
+    return tx
+
+
+def build_chain():
+    """Chain dengan wallet terdanai dan satu payout multi-output; mengembalikan (bc, wallet, payout)."""
+    wallet = Wallet()
+    bc = Blockchain(difficulty=1)
+    bc.create_block(nonce=0, previous_hash=bc.last_block.hash, transactions=[], miner_address=wallet.public_key_hex)
+    payout = make_payout(wallet, [("alice", 2.0), ("bob", 3.0), ("carol", 5.0)])
+    bc.create_block(nonce=0, previous_hash=bc.last_block.hash, transactions=[payout], miner_address="miner")
+    return bc, wallet, payout
@@ -0,0 +1,34 @@
+# test_admission.py
+
+import pytest
+
+from src.admission import AdmissionController, AdmissionError, TokenBucket, VerificationQueue
+
+
+def test_token_bucket_refills_over_time():
+    bucket = TokenBucket(rate=2.0, capacity=2)
+    assert bucket.consume(now=bucket.last)
+    assert bucket.consume(now=bucket.last)
+    assert not bucket.consume(now=bucket.last)
+    assert bucket.consume(now=bucket.last + 0.5)
+
+def test_verification_queue_sheds_load_per_client():
+    q = VerificationQueue(capacity=3, per_client=2)
+    assert q.try_acquire("noisy")
+    assert q.try_acquire("noisy")
+    # Klien yang sama tidak boleh memonopoli, klien lain masih dilayani
+    assert not q.try_acquire("noisy")
+    assert q.try_acquire("quiet")
+    with pytest.raises(AdmissionError) as exc:
+        with q.slot("other"):
+            pass
+    assert exc.value.status_code == 429
+
+def test_peer_banned_after_repeated_invalid_payloads():
+    ctrl = AdmissionController()
+    for _ in range(5):
+        ctrl.record_invalid("10.0.0.9")
+    with pytest.raises(AdmissionError) as exc:
+        ctrl.check_peer("10.0.0.9")
+    assert exc.value.status_code == 403
+    ctrl.check_peer("10.0.0.10")
@@ -0,0 +1,79 @@
+# test_analytics.py
+
+from unittest import mock
+
+import pytest
+
+from src import analytics as analytics_module
+from src.analytics import ChainAnalytics
+from src.blockchain import Blockchain
+from conftest import build_chain, extend_chain
+
+
+@pytest.fixture(params=["numpy", "array"])
+def backend(request, monkeypatch):
+    """Jalankan test dengan kolom numpy dan dengan fallback array.array (numpy dimatikan)."""
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(analytics_module, "np", None)
+    return request.param
+
+
+def test_aggregates_match_chain_state(backend):
+    bc, wallet, payout = build_chain()
+    extend_chain(bc, 2)
+    analytics = ChainAnalytics()
+    assert analytics.backend == backend
+    assert analytics.sync(bc.chain) == len(bc.chain)
+
+    addresses = [wallet.public_key_hex, "alice", "bob", "carol", "miner"]
+    balances = bc.get_balances(addresses)
+    supply = analytics.supply()
+    assert supply["supply"] == sum(balances.values())
+    assert supply["issued"] == 4 * 50.0 + payout.fee and supply["fees"] == payout.fee
+    assert supply["transactions"] == 1 and supply["holders"] == 5
+
+    top = analytics.top_holders(3)["holders"]
+    assert [h["address"] for h in top] == ["miner", wallet.public_key_hex, "carol"]
+    assert top[0]["balance"] == balances["miner"]
+
+    throughput = analytics.throughput(blocks=3)
+    assert throughput["blocks"] == 3 and throughput["transactions"] == 1
+    assert [b["height"] for b in throughput["per_block"]] == [3, 4, 5]
+    assert throughput["per_block"][0]["interval"] == bc.chain[2].timestamp - bc.chain[1].timestamp
+
+    sizes = analytics.tx_sizes(bins=4)
+    assert sizes["count"] == 1 and sizes["p50"] == payout.size()
+    assert sum(sizes["histogram"]["counts"]) == 1
+
+    miners = analytics.miners(blocks=10)["miners"]
+    assert miners[0] == {"address": "miner", "blocks": 3, "share": 0.75, "rewards": 150.0 + payout.fee}
+
+
+def test_sync_appends_only_new_blocks_and_truncates_on_reorg(backend):
+    bc = Blockchain(difficulty=1)
+    extend_chain(bc, 3)
+    analytics = ChainAnalytics()
+    analytics.sync(bc.chain)
+    with mock.patch.object(ChainAnalytics, "_append", wraps=analytics._append) as append:
+        assert analytics.sync(bc.chain) == 0
+        extend_chain(bc, 1)
+        assert analytics.sync(bc.chain) == 1
+    assert append.call_count == 1
+
+    # Fork dari block #2: dua block terakhir diganti
+    fork = Blockchain(difficulty=1)
+    fork.chain = bc.chain[:2]
+    fork.create_block(nonce=0, previous_hash=fork.last_block.hash, transactions=[], miner_address="other")
+    assert analytics.sync(fork.chain) == 1
+    assert analytics.supply()["issued"] == 100.0
+    shares = {m["address"]: m["blocks"] for m in analytics.miners()["miners"]}
+    assert shares == {"miner": 1, "other": 1}
+
+    # Kolom tumbuh melewati kapasitas awal dan dipotong tanpa kehilangan isi
+    column = analytics_module.Column("q")
+    column.extend(list(range(1500)))
+    column.truncate(1200)
+    column.extend([7])
+    assert len(column) == 1201 and [int(v) for v in column.values(1198)] == [1198, 1199, 7]
@@ -0,0 +1,79 @@
+# test_balances.py
+
+import threading
+import time
+from unittest import mock
+
+from src.blockchain import Blockchain
+from src.store import ChainStore
+from src.tx import Mempool, Transaction
+from conftest import make_signed_tx, extend_chain
+
+
+def build_spend_chain():
+    """Chain dengan satu transfer 3.0 ke bob di block #2 lalu dua block kosong; mengembalikan (bc, tx)."""
+    bc = Blockchain(difficulty=1)
+    tx = make_signed_tx(3.0)
+    bc.create_block(nonce=0, previous_hash=bc.last_block.hash, transactions=[tx], miner_address="miner")
+    extend_chain(bc, 2)
+    return bc, tx
+
+
+def test_account_states_single_pass_cached_per_tip_and_matches_index(tmp_path):
+    bc, tx = build_spend_chain()
+    addresses = [tx.sender, "bob", "miner", "nobody"]
+    with mock.patch.object(Blockchain, "_scan_account_states", wraps=Blockchain._scan_account_states) as scan:
+        (height, tip), states = bc.account_states(addresses)
+        bc.get_balances(addresses)
+    assert scan.call_count == 1
+    assert (height, tip) == (4, bc.last_block.hash)
+    assert states["bob"] == {"balance": 3.0, "last_activity": 2}
+    assert states["miner"]["last_activity"] == 4
+    assert states["nobody"] == {"balance": 0.0, "last_activity": None}
+
+    store = ChainStore(str(tmp_path / "chain.db"))
+    store.publish_chain(bc.chain)
+    indexed = Blockchain(difficulty=1)
+    indexed.chain, indexed.index = list(bc.chain), store
+    with mock.patch.object(Blockchain, "_scan_account_states") as scan:
+        assert indexed.account_states(addresses)[1] == states
+    scan.assert_not_called()
+
+    # Tip baru: cache lama tidak dipakai
+    extend_chain(bc, 1)
+    assert bc.account_states(["miner"])[1]["miner"]["last_activity"] == 5
+
+
+def test_pending_deltas_recomputed_only_when_mempool_changes():
+    mp = Mempool()
+    a = make_signed_tx(2.0)
+    assert mp.add_transaction(a)
+    deltas = mp.pending_deltas()
+    assert deltas[a.sender] == (0.0, 2.0) and deltas["bob"] == (2.0, 0.0)
+    assert mp.pending_deltas() is deltas
+
+    mp.add_transaction(Transaction(sender="coinbase", recipient="bob", amount=1.0, signature="coinbase"))
+    assert mp.pending_deltas()["bob"] == (3.0, 0.0)
+
+
+def test_concurrent_queries_apply_new_block_once():
+    bc = Blockchain(difficulty=1)
+    extend_chain(bc, 3)
+    assert bc.get_balance("miner") == 150.0
+    extend_chain(bc, 1)
+    scan = Blockchain._scan_account_states
+
+    def slow_scan(blocks, states):
+        time.sleep(0.05)  # kedua query membaca state lama sebelum salah satunya selesai
+        return scan(blocks, states)
+
+    results = []
+    query = lambda: results.append(bc.account_states(["miner"])[1]["miner"]["balance"])
+    with mock.patch.object(Blockchain, "_scan_account_states", staticmethod(slow_scan)):
+        threads = [threading.Thread(target=query) for _ in range(2)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    assert results == [200.0, 200.0]
+    assert bc._chain_states[2]["miner"]["balance"] == 200.0
@@ -1,8 +1,5 @@
 # test_blockchain.py
 
-import config
-config.DIFFICULTY = 1  # buat tes lebih cepat
-
 # KOREKSI: Impor semua yang dibutuhkan dan ganti nama fungsi yang salah
 from src.wallet import generate_key_pair, Wallet 
 from src.tx import Transaction, Mempool
@@ -39,7 +36,7 @@ def test_mempool_add_and_remove():
     assert len(mp.all_transactions()) == 0
 
 def test_mine_block_and_chain_properties():
-    bc = Blockchain()
+    bc = Blockchain(difficulty=1)  # buat tes lebih cepat
     # create a simple coinbase-only mining: simulate tx list empty
     txs = []
     nonce, h = bc.proof_of_work(transactions=txs, previous_hash=bc.last_block.hash)
@@ -49,3 +46,22 @@ def test_mine_block_and_chain_properties():
     # check coinbase reward effect
     balance = bc.get_balance("miner-1")
     assert balance == 50.0
+
+def test_block_repeating_last_transaction_is_rejected():
+    wallet = Wallet()
+    bc = Blockchain(difficulty=1)
+    bc.create_block(nonce=0, previous_hash=bc.last_block.hash, transactions=[], miner_address=wallet.public_key_hex)
+    spends = []
+    for amount in (1.0, 2.0):
+        tx = Transaction(sender=wallet.public_key_hex, recipient="bob", amount=amount)
+        sign_tx(tx, wallet.private_key_hex)
+        spends.append(tx)
+    block = bc.prepare_block([bc.create_coinbase("miner")] + spends)
+    block.nonce, block.hash = bc._search_nonce(block)
+
+    # Leaf terakhir diulang: merkle root & hash block tetap sama
+    block.transactions.append(spends[-1])
+    assert block.compute_merkle_root() == block.merkle_root and block.calculate_hash() == block.hash
+    assert not block.validate_block()
+    assert not bc.add_block(block)
+    assert bc.get_balance("bob") == 0
@@ -0,0 +1,56 @@
+# test_chain_io.py
+
+import copy
+import json
+
+import pytest
+
+from src.blockchain import Blockchain
+from src.chain_io import iter_ndjson, iter_lines, StreamImporter
+from conftest import extend_chain
+
+
+def test_ndjson_roundtrip_through_chunked_stream():
+    source = Blockchain(difficulty=1)
+    extend_chain(source, 5)
+    payload = b"".join(iter_ndjson(source.chain))
+    # Potong stream di tengah baris, seperti chunked transfer
+    chunks = [payload[i:i + 37] for i in range(0, len(payload), 37)]
+
+    target = Blockchain(difficulty=1)
+    target.chain = source.chain[:1]
+    importer = StreamImporter(target)
+    assert importer.feed_all(iter_lines(chunks)) == 5
+    assert importer.skipped == 1
+    assert target.last_block.hash == source.last_block.hash
+
+def test_import_stops_at_first_invalid_block():
+    source = Blockchain(difficulty=1)
+    extend_chain(source, 3)
+    lines = [json.loads(line) for line in b"".join(iter_ndjson(source.chain)).splitlines()]
+    lines[2]["nonce"] += 1
+    target = Blockchain(difficulty=1)
+    target.chain = source.chain[:1]
+    importer = StreamImporter(target)
+    with pytest.raises(ValueError):
+        importer.feed_all(json.dumps(b) for b in lines)
+    assert importer.added == 1
+
+def test_resolve_conflicts_stream_prefers_longest_valid_chain():
+    ours = Blockchain(difficulty=1)
+    longer = copy.deepcopy(ours)
+    extend_chain(longer, 4)
+    streams = [iter_lines(iter_ndjson(longer.chain)), [b.to_dict() for b in ours.chain]]
+    assert ours.resolve_conflicts_stream(streams)
+    assert ours.height == 5
+
+def test_import_endpoint_only_for_import_hosts(monkeypatch):
+    from fastapi.testclient import TestClient
+    from src import app as node_app
+    client = TestClient(node_app.app)
+    # Klien TestClient bukan loopback: ditolak sebelum stream dibaca
+    assert client.post("/blocks/import", content=b"").status_code == 403
+    monkeypatch.setattr(node_app, "IMPORT_HOSTS", {"testclient"})
+    assert client.post("/blocks/import", content=b"").json()["added"] == 0
+    oversized = b"x" * (node_app.MAX_BLOCK_PAYLOAD_BYTES + 1)
+    assert client.post("/blocks/import", content=oversized).status_code == 400
@@ -0,0 +1,59 @@
+# test_checkpoints.py
+
+from unittest import mock
+
+from src.blockchain import Blockchain, parse_checkpoints
+from src.wallet import Wallet
+from conftest import make_signed_tx
+
+
+def build_source(forged: bool = False) -> Blockchain:
+    """Chain 4 block berisi transaksi bertanda tangan; block #2 opsional memuat signature palsu."""
+    bc = Blockchain(difficulty=1)
+    for i in range(3):
+        tx = make_signed_tx(1.0 + i)
+        if forged and i == 0:
+            tx.signature = Wallet().sign(tx.get_signing_hash())
+        block = bc.build_candidate([tx], "miner")
+        block.nonce, block.hash = bc._search_nonce(block)
+        bc.chain.append(block)
+    return bc
+
+
+def stream_of(bc: Blockchain):
+    return [b.to_dict() for b in bc.chain]
+
+
+def test_signatures_below_checkpoint_are_skipped_unless_full_verify():
+    source = build_source()
+    local = Blockchain(difficulty=1)
+    local.checkpoints = parse_checkpoints(f"3:{source.chain[2].hash}")
+    with mock.patch("src.wallet.verify_signature", return_value=True) as verify:
+        assert local.resolve_conflicts_stream([stream_of(source)])
+    # Block #2 dan #3 terkonfirmasi checkpoint, hanya #4 yang diverifikasi
+    assert verify.call_count == 1
+    stats = local.verify_stats.to_dict()
+    assert stats["signatures_skipped"] == 2 and stats["signatures_checked"] == 1
+
+    full = Blockchain(difficulty=1)
+    full.checkpoints, full.full_verify = dict(local.checkpoints), True
+    with mock.patch("src.wallet.verify_signature", return_value=True) as verify:
+        assert full.resolve_conflicts_stream([stream_of(source)])
+    assert verify.call_count == 3
+
+
+def test_unconfirmed_or_mismatched_checkpoint_falls_back_to_verification():
+    forged = build_source(forged=True)
+    # Checkpoint di luar chain: signature yang dilewati tetap diperiksa di akhir stream
+    local = Blockchain(difficulty=1)
+    local.checkpoints = {10: "ff" * 32}
+    assert not local.resolve_conflicts_stream([stream_of(forged)])
+    assert local.height == 1
+
+    # Hash checkpoint berbeda: block ditolak dan block sebelumnya yang belum terverifikasi dipotong
+    local.checkpoints = {3: "ff" * 32}
+    assert local.add_block(forged.chain[1])
+    assert local.height == 2
+    assert not local.add_block(forged.chain[2])
+    assert local.verify_stats.checkpoint_rejects == 1
+    assert local.height == 1
@@ -0,0 +1,70 @@
+# test_difficulty.py
+
+import pytest
+
+from src.blockchain import Blockchain
+from src.utils import target_to_hex
+
+
+def mine_at(bc: Blockchain, timestamp: float):
+    block = bc.prepare_block([bc.create_coinbase("miner")], timestamp=timestamp)
+    block.nonce, block.hash = bc._search_nonce(block)
+    assert bc.add_block(block)
+    return block
+
+def test_retarget_follows_observed_block_time():
+    slow, fast = Blockchain(difficulty=1), Blockchain(difficulty=1)
+    for bc in (slow, fast):
+        bc.retarget_interval = 4
+        bc.target_block_time = 10
+    base = slow.last_block.target_value
+    for i in range(1, 8):
+        mine_at(slow, 1000 + i * 20)   # 2x lebih lambat dari target
+        mine_at(fast, 1000 + i * 5)    # 2x lebih cepat dari target
+    # Retarget pertama terjadi setelah jendela yang berisi genesis
+    assert slow.next_target() == base * 2
+    assert fast.next_target() == base // 2
+
+def test_block_with_wrong_target_is_rejected():
+    bc = Blockchain(difficulty=1)
+    block = bc.prepare_block([bc.create_coinbase("miner")])
+    block.target = target_to_hex(block.target_value * 16)  # lebih mudah dari seharusnya
+    block.nonce, block.hash = bc._search_nonce(block)
+    assert block.validate_block()
+    assert not bc.add_block(block)
+    assert not bc.is_valid_chain(bc.chain + [block])
+
+def test_genesis_uses_verified_constants_without_pow(monkeypatch):
+    from src import blockchain
+    from src.config import DIFFICULTY, GENESIS_BLOCKS
+    blockchain.genesis_proof.cache_clear()
+    monkeypatch.setattr(blockchain, "search_nonce", lambda *a, **k: (_ for _ in ()).throw(AssertionError("PoW")))
+    genesis = Blockchain().chain[0]
+    assert (genesis.nonce, genesis.hash) == GENESIS_BLOCKS[DIFFICULTY]
+    assert genesis.validate_block()
+
+    # Konstanta yang salah langsung ditolak saat diverifikasi
+    blockchain.genesis_proof.cache_clear()
+    monkeypatch.setitem(GENESIS_BLOCKS, DIFFICULTY, (0, GENESIS_BLOCKS[DIFFICULTY][1]))
+    with pytest.raises(RuntimeError):
+        Blockchain()
+    blockchain.genesis_proof.cache_clear()
+
+def test_fork_choice_prefers_most_work_over_length():
+    heavy, light = Blockchain(difficulty=1), Blockchain(difficulty=1)
+    for bc in (heavy, light):
+        bc.retarget_interval = 4
+        bc.target_block_time = 10
+    for i in range(1, 12):
+        mine_at(heavy, 1000 + i)        # target turun: tiap block lebih berat
+    for i in range(1, 14):
+        mine_at(light, 1000 + i * 40)   # target naik: lebih panjang tapi lebih ringan
+    assert len(light.chain) > len(heavy.chain)
+    assert heavy.chain_work() > light.chain_work()
+
+    heavy_data = [b.to_dict() for b in heavy.chain]
+    light_data = [b.to_dict() for b in light.chain]
+    assert not heavy.resolve_conflicts([light_data])
+    assert not heavy.resolve_conflicts_stream([light_data])
+    assert light.resolve_conflicts_stream([heavy_data])
+    assert [b.hash for b in light.chain] == [b.hash for b in heavy.chain]
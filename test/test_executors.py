@@ -0,0 +1,42 @@
+# test_executors.py
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import pytest
+from src.admission import AdmissionError
+from src.blockchain import Blockchain, search_nonce
+from src.executors import BoundedExecutor
+
+
+def test_bounded_executor_rejects_when_full():
+    release = threading.Event()
+    executor = BoundedExecutor(lambda: ThreadPoolExecutor(max_workers=1), max_pending=1, name="test")
+
+    async def scenario():
+        first = asyncio.ensure_future(executor.run(release.wait, 5))
+        await asyncio.sleep(0.05)
+        with pytest.raises(AdmissionError) as exc:
+            await executor.run(lambda: None)
+        release.set()
+        await first
+        return exc.value.status_code
+
+    try:
+        assert asyncio.run(scenario()) == 429
+        assert executor.stats()["pending"] == 0
+    finally:
+        executor.shutdown()
+
+
+def test_search_nonce_in_process_pool_produces_valid_block():
+    bc = Blockchain(difficulty=1)
+    block = bc.build_candidate([], "miner")
+    executor = BoundedExecutor(lambda: ProcessPoolExecutor(max_workers=1), max_pending=1, name="mining")
+    try:
+        block.nonce, block.hash = asyncio.run(
+            executor.run(search_nonce, block.header_data(), block.target_value, 0)
+        )
+    finally:
+        executor.shutdown()
+    assert bc.add_block(block)
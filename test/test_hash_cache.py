@@ -0,0 +1,47 @@
+# test_hash_cache.py
+
+from unittest import mock
+
+from src.blockchain import Block, Blockchain
+from src.tx import Transaction
+from conftest import make_signed_tx
+
+
+def test_transaction_id_and_verification_are_cached_until_mutation():
+    tx = make_signed_tx(2.0)
+    restored = Transaction(**tx.model_dump())
+    with mock.patch("src.wallet.verify_signature", return_value=True) as verify:
+        assert restored.validate_tx() and restored.validate_tx()
+    assert verify.call_count == 1
+    assert restored.has_valid_id()
+
+    restored.amount = 200.0
+    assert not restored.has_valid_id()
+    assert not restored.validate_tx()
+
+    # ID & signature disalin ke isi lain: ditolak walaupun (id, signature) sudah pernah lolos
+    forged = Transaction(**{**tx.model_dump(), "recipient": "mallory"})
+    assert forged.id == tx.id and not forged.has_valid_id()
+    with mock.patch("src.wallet.verify_signature", return_value=True):
+        assert not forged.validate_tx()
+    block = Blockchain(difficulty=1).build_candidate([forged], "miner")
+    assert not block.verify_signatures({forged.verification_key()})
+
+
+def test_block_revalidation_reuses_cached_hashes_and_detects_tampering():
+    bc = Blockchain(difficulty=1)
+    tx = make_signed_tx(1.0)
+    bc.mempool.add_transaction(tx)
+    block = Block.from_dict(bc.mine_block("miner").to_dict())
+    assert block.validate_block()
+    with mock.patch("src.blockchain.hash_data") as hash_data, mock.patch("src.blockchain.merkle_root") as root:
+        assert block.validate_block()
+    hash_data.assert_not_called()
+    root.assert_not_called()
+
+    # Mengubah transaksi di dalam list membuat merkle root tidak cocok lagi
+    block.transactions[1].amount = 99.0
+    assert not block.validate_block()
+    block.transactions[1].amount = 1.0
+    block.nonce += 1
+    assert block.calculate_hash() != block.hash
@@ -0,0 +1,55 @@
+# test_httpcache.py
+
+import gzip
+
+from fastapi import FastAPI, Request
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.testclient import TestClient
+
+from src.httpcache import ResponseCache
+
+
+def make_app():
+    app = FastAPI()
+    app.add_middleware(GZipMiddleware, minimum_size=10)
+    cache = ResponseCache()
+    state = {"version": 1, "builds": 0}
+
+    @app.get("/data")
+    def data(request: Request):
+        def build():
+            state["builds"] += 1
+            return {"version": state["version"], "payload": "x" * 5000}
+        return cache.respond(request, ("data",), state["version"], build)
+
+    return TestClient(app), cache, state
+
+
+def test_etag_revalidation_and_single_build_per_version():
+    client, cache, state = make_app()
+    first = client.get("/data")
+    etag = first.headers["etag"]
+    assert first.json()["version"] == 1
+    assert client.get("/data", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/data").headers["etag"] == etag
+    assert state["builds"] == 1
+
+    state["version"] = 2
+    changed = client.get("/data", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+    assert changed.json()["version"] == 2
+    assert cache.stats()["not_modified"] == 1
+
+
+def test_large_bodies_are_compressed_once_without_double_encoding():
+    client, _, _ = make_app()
+    r = client.get("/data", headers={"Accept-Encoding": "gzip"})
+    assert r.headers["content-encoding"] == "gzip"
+    assert int(r.headers["content-length"]) < 500
+    raw = client.get("/data", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in raw.headers
+    # Body yang sudah dikompresi cache tidak dikompresi ulang oleh GZipMiddleware
+    stream = client.stream("GET", "/data", headers={"Accept-Encoding": "gzip"})
+    with stream as response:
+        body = b"".join(response.iter_raw())
+    assert gzip.decompress(body).startswith(b'{"version":1')
@@ -0,0 +1,51 @@
+# test_keystore.py
+
+import time
+
+import pytest
+
+from src import keystore
+from src.keystore import KeyStore
+from src.tx import Transaction
+from src.wallet import generate_key_pair
+
+
+def test_keyfile_roundtrip_and_wrong_passphrase(tmp_path):
+    priv, pub = generate_key_pair()
+    store = KeyStore(str(tmp_path))
+    assert store.save("faucet", priv, "rahasia") == pub
+    assert priv not in (tmp_path / "faucet.json").read_text()
+
+    fresh = KeyStore(str(tmp_path))
+    with pytest.raises(ValueError):
+        fresh.unlock("faucet", "salah")
+    assert fresh.unlock("faucet", "rahasia") == pub
+    assert fresh.wallet("faucet").private_key_hex == priv
+    fresh.sign(Transaction(sender=pub, recipient="bob", amount=1.0))
+    fresh.lock("faucet")
+    assert pub not in fresh._keys and pub not in fresh._signers
+    with pytest.raises(FileExistsError):
+        fresh.save("faucet", priv, "rahasia")
+
+
+@pytest.mark.parametrize("backend,deterministic", [("ecdsa", True), ("cryptography", False)])
+def test_sign_batch_uses_pool_and_produces_valid_signatures(monkeypatch, backend, deterministic):
+    monkeypatch.setattr(keystore, "SIGN_BATCH_MIN", 1)
+    monkeypatch.setattr(keystore, "SIGN_CHUNK_SIZE", 3)
+    store = KeyStore(backend=backend, deterministic=deterministic, processes=2)
+    senders = [store.add_key(generate_key_pair()[0]) for _ in range(2)]
+    now = time.time()
+    txs = [Transaction(sender=senders[i % 2], recipient="bob", amount=1.0, timestamp=now + i) for i in range(8)]
+    try:
+        store.sign_batch(txs)
+        if deterministic:
+            again = Transaction(**dict(txs[0].model_dump(), signature=None))
+            assert store.sign(again).signature == txs[0].signature
+    finally:
+        store.close()
+    assert all(tx.validate_tx() for tx in txs)
+    assert all(tx.has_valid_id() for tx in txs)
+    # close() membuang kunci & signer dari memori
+    assert not store._keys and not store._signers
+    with pytest.raises(KeyError):
+        store.sign(Transaction(sender=senders[0], recipient="bob", amount=1.0))
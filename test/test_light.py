@@ -0,0 +1,94 @@
+# test_light.py
+
+import pytest
+from src.blockchain import Blockchain
+from src.bloom import BloomFilter
+from src.light import FilterRegistry, LightClient, light_sync
+from src.utils import merkle_root, merkle_proof, verify_merkle_proof, hash_data, target_to_hex
+from conftest import make_signed_tx, extend_chain
+
+
+class FakeResponse:
+    def __init__(self, data, status_code=200):
+        self._data = data
+        self.status_code = status_code
+        self.content = repr(data).encode()
+
+    def json(self):
+        return self._data
+
+    def raise_for_status(self):
+        assert self.status_code < 400
+
+
+class FakeSession:
+    """Meniru endpoint /light/* di atas objek Blockchain lokal."""
+    def __init__(self, blockchain):
+        self.blockchain = blockchain
+        self.filters = FilterRegistry()
+
+    def post(self, url, json=None, timeout=None):
+        return FakeResponse({"filter_id": self.filters.register(BloomFilter.from_dict(json["filter"]))})
+
+    def get(self, url, params=None, timeout=None):
+        bloom = self.filters.get(params["filter_id"])
+        return FakeResponse(light_sync(self.blockchain, bloom, params["start"], params["count"]))
+
+
+def test_merkle_proof_for_every_leaf():
+    leaves = [hash_data(str(i)) for i in range(5)]
+    root = merkle_root(leaves)
+    for i, leaf in enumerate(leaves):
+        assert verify_merkle_proof(leaf, merkle_proof(leaves, i), root)
+    assert not verify_merkle_proof(leaves[0], merkle_proof(leaves, 1), root)
+
+
+def test_light_client_tracks_own_balance():
+    bc = Blockchain(difficulty=1)
+    mine = make_signed_tx(4.0)
+    others = [make_signed_tx(1.0) for _ in range(3)]
+    bc.create_block(nonce=0, previous_hash=bc.last_block.hash, transactions=others + [mine], miner_address="miner")
+    extend_chain(bc, 2)
+
+    client = LightClient("", [mine.sender], session=FakeSession(bc), genesis_hash=bc.chain[0].hash)
+    assert client.sync() == bc.height
+    assert client.balance(mine.sender) == bc.get_balance(mine.sender)
+    assert [h["transaction"]["id"] for h in client.history] == [mine.id]
+
+    extend_chain(bc, 1)
+    assert client.sync() == 1
+
+
+def test_light_client_rejects_tampered_transaction():
+    bc = Blockchain(difficulty=1)
+    tx = make_signed_tx(4.0)
+    bc.create_block(nonce=0, previous_hash=bc.last_block.hash, transactions=[tx], miner_address="miner")
+    bloom = BloomFilter.for_capacity(1, 0.01)
+    bloom.add(tx.sender)
+    payload = light_sync(bc, bloom, 1, 10)
+    payload["matches"][0]["transaction"]["amount"] = 400.0
+
+    client = LightClient("", [tx.sender], session=FakeSession(bc))
+    with pytest.raises(ValueError):
+        client.apply(payload)
+
+
+def test_light_client_checks_target_against_retarget_rules():
+    bc = Blockchain(difficulty=1)
+    bc.retarget_interval = 4
+    for i in range(1, 10):
+        block = bc.prepare_block([bc.create_coinbase("miner")], timestamp=1000 + i)  # cepat: target turun
+        block.nonce, block.hash = bc._search_nonce(block)
+        assert bc.add_block(block)
+    assert bc.last_block.target_value < bc.chain[0].target_value
+    client = LightClient("", ["miner"], session=FakeSession(bc), retarget_interval=4)
+    assert client.sync() == bc.height
+
+    # Node curang: header dengan target lebih mudah dari hasil retarget (PoW-nya sah untuk target itu)
+    forged = bc.prepare_block([bc.create_coinbase("miner")])
+    forged.target = target_to_hex(forged.target_value * 16)
+    forged.nonce, forged.hash = bc._search_nonce(forged)
+    bc.chain.append(forged)
+    with pytest.raises(ValueError):
+        client.sync()
+    assert client.height == bc.height - 1
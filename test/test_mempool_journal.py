@@ -0,0 +1,75 @@
+# test_mempool_journal.py
+
+import time
+
+from src.node import Node
+from src.tx import Mempool, Transaction
+from src.journal import MempoolJournal
+from src.wallet import Wallet
+from conftest import make_signed_tx
+
+
+def test_journal_survives_restart(tmp_path):
+    path = str(tmp_path / "mempool.log")
+    mp = Mempool(journal=MempoolJournal(path))
+    tx1, tx2 = make_signed_tx(1.0), make_signed_tx(2.0)
+    assert mp.add_transaction(tx1)
+    assert mp.add_transaction(tx2)
+    mp.remove_transactions([tx1.id])
+
+    # Simulasi restart: mempool baru dari journal yang sama
+    restored = Mempool(journal=MempoolJournal(path))
+    assert restored.restore() == 1
+    assert [t.id for t in restored.all_transactions()] == [tx2.id]
+
+def test_restore_drops_expired_and_tampered(tmp_path):
+    path = str(tmp_path / "mempool.log")
+    journal = MempoolJournal(path)
+    old = make_signed_tx(1.0)
+    tampered = make_signed_tx(3.0)
+    tampered.amount = 300.0
+    # Kedaluwarsa dihitung dari waktu diterima yang tercatat di journal
+    journal.append_add(old, admitted=time.time() - 7200)
+    journal.append_add(tampered)
+    with open(path, "a") as f:
+        f.write('{"op": "add", "tx": {"sender"')  # baris terpotong akibat crash
+
+    mp = Mempool(journal=MempoolJournal(path), max_age=3600)
+    assert mp.restore() == 0
+    assert mp.all_transactions() == []
+
+def test_evict_expired():
+    mp = Mempool(max_age=10)
+    # Timestamp klien diabaikan: yang dimundurkan tetap diterima, yang dimajukan tetap kedaluwarsa
+    backdated = make_signed_tx(1.0, timestamp=time.time() - 7200)
+    postdated = make_signed_tx(2.0, timestamp=time.time() + 10 ** 6)
+    assert mp.add_transaction(backdated) and mp.add_transaction(postdated)
+    now = time.time()
+    assert mp.evict_expired(now=now + 5) == []
+    assert sorted(mp.evict_expired(now=now + 11)) == sorted([backdated.id, postdated.id])
+    assert mp.all_transactions() == []
+
+def test_restart_keeps_funded_txs_until_chain_loaded(tmp_path):
+    path = str(tmp_path / "mempool.log")
+    node = Node(port=5000, mempool_journal=path, difficulty=1)
+    wallet = Wallet()
+    bc = node.blockchain
+    bc.create_block(nonce=0, previous_hash=bc.last_block.hash, transactions=[], miner_address=wallet.public_key_hex)
+    funded = Transaction(sender=wallet.public_key_hex, recipient="bob", amount=1.0)
+    funded.sign(wallet)
+    unfunded = make_signed_tx(1.0)
+    assert node.mempool.add_transaction(funded, bc)
+    assert node.mempool.add_transaction(unfunded)
+
+    # Restart: chain baru berisi genesis saja, journal tidak boleh ikut dikosongkan
+    restarted = Node(port=5000, mempool_journal=path, difficulty=1)
+    assert len(restarted.mempool.all_transactions()) == 2
+    assert len(MempoolJournal(path).replay()) == 2
+
+    # Setelah chain dimuat (mis. dari store), hanya transaksi tanpa saldo yang dibuang
+    restarted.blockchain.chain = list(bc.chain)
+    assert restarted.revalidate_mempool() == 1
+    assert [t.id for t in restarted.mempool.all_transactions()] == [funded.id]
+    assert restarted.mempool.pending.available(wallet.public_key_hex, bc.get_balance(wallet.public_key_hex)) \
+        == bc.get_balance(wallet.public_key_hex) - funded.total_debit
+    assert [tx["id"] for tx, _ in MempoolJournal(path).replay()] == [funded.id]
@@ -0,0 +1,53 @@
+# test_mining_stats.py
+
+from unittest import mock
+
+import pytest
+
+from src.blockchain import Blockchain, StaleWork, search_nonce
+from conftest import extend_chain
+
+
+def test_search_stops_when_tip_changes_mid_search():
+    bc = Blockchain(difficulty=1)
+    block = bc.build_candidate([], "miner")
+    assert search_nonce(block.header_data(), 0, 0, 100) is None
+    block.target = "00" * 32  # target mustahil: pencarian tidak pernah selesai sendiri
+    with mock.patch("src.blockchain.MINING_CHUNK_NONCES", 10), pytest.raises(StaleWork):
+        bc._search_nonce(block, should_stop=lambda: True)
+
+    # Block peer masuk (thread lain) selama PoW: block kita dibuang, bukan membuat fork diam-diam
+    peer = Blockchain(difficulty=1)
+    extend_chain(peer, 1)
+    original = Blockchain._search_nonce
+
+    def search_while_peer_block_arrives(self, *args, **kwargs):
+        found = original(self, *args, **kwargs)
+        self.chain.append(peer.chain[1])
+        return found
+
+    with mock.patch.object(Blockchain, "_search_nonce", search_while_peer_block_arrives):
+        with pytest.raises(StaleWork):
+            bc.create_block(0, bc.last_block.hash, [], "miner")
+    assert bc.chain[1] is peer.chain[1] and bc.height == 2
+    stats = bc.mining_stats.to_dict()
+    assert stats["stale"] == 1 and stats["mined"] == 0 and stats["stale_rate"] == 1.0
+
+
+def test_competing_and_orphaned_blocks_are_kept_as_side_blocks():
+    local, peer = Blockchain(difficulty=1), Blockchain(difficulty=1)
+    extend_chain(local, 1)
+    peer.create_block(0, peer.last_block.hash, [], "other")
+    extend_chain(peer, 1)
+
+    assert local.add_side_block(peer.chain[1])
+    assert not local.add_side_block(peer.chain[1]) and not local.add_side_block(local.chain[1])
+    assert local.stale_stats()["side_blocks"] == 1
+
+    # Chain peer lebih panjang menang: block hasil mining kita menjadi orphan
+    ours = local.chain[1]
+    assert local.resolve_conflicts([[b.to_dict() for b in peer.chain]])
+    assert list(local.side_blocks) == [ours.hash]
+    stats = local.stale_stats()
+    assert stats["mining"]["orphaned"] == 1 and stats["mining"]["mined"] == 1
+    assert stats["stale_rate"] == round(1 / 3, 4)
@@ -0,0 +1,61 @@
+# test_multi_output.py
+
+from unittest import mock
+
+from src.store import ChainStore
+from src.tx import MULTI_RECIPIENT, Mempool, Transaction
+from src.wallet import Wallet
+from conftest import build_chain, make_payout
+
+
+def test_payout_is_one_signature_and_credits_every_output():
+    wallet = Wallet()
+    tx = make_payout(wallet, [("alice", 2.0), ("bob", 3.0)])
+    assert tx.recipient == MULTI_RECIPIENT and tx.amount == 5.0 and tx.total_debit == 5.5
+    with mock.patch("src.wallet.verify_signature", return_value=True) as verify:
+        assert tx.validate_tx()
+    assert verify.call_count == 1
+
+    # Serialisasi & relay: ID tetap, output ikut di-hash
+    relayed = Transaction(**tx.model_dump())
+    assert relayed.id == tx.id and relayed.has_valid_id() and relayed.validate_tx()
+    relayed.outputs = [relayed.outputs[0]]
+    assert relayed.calculate_id() != tx.id and not relayed.is_well_formed()
+    assert "outputs" not in Transaction(sender="a", recipient="b", amount=1.0).model_dump()
+
+    mp = Mempool()
+    assert mp.add_transaction(tx)
+    deltas = mp.pending_deltas()
+    assert deltas["alice"] == (2.0, 0.0) and deltas[wallet.public_key_hex] == (0.0, 5.5)
+    assert MULTI_RECIPIENT not in deltas
+
+    mismatched = Transaction(sender=wallet.public_key_hex, recipient=MULTI_RECIPIENT, amount=9.0,
+                             outputs=[{"recipient": "alice", "amount": 2.0}])
+    negative = Transaction(sender=wallet.public_key_hex, outputs=[{"recipient": "alice", "amount": -1.0},
+                                                              {"recipient": "bob", "amount": 3.0}])
+    duplicate = make_payout(wallet, [("alice", 2.0), ("alice", 3.0)])
+    for bad in (mismatched, negative, duplicate):
+        bad.sign(wallet)
+        assert not bad.validate_tx()
+    coinbase = Transaction(sender="coinbase", outputs=[{"recipient": "alice", "amount": 2.0}], signature="coinbase")
+    assert not coinbase.validate_tx()
+
+
+def test_balances_and_history_match_between_scan_and_store(tmp_path):
+    bc, wallet, payout = build_chain()
+    addresses = [wallet.public_key_hex, "alice", "bob", "carol", MULTI_RECIPIENT]
+    _, states = bc.account_states(addresses)
+    assert states["carol"] == {"balance": 5.0, "last_activity": 3}
+    assert states[wallet.public_key_hex]["balance"] == 39.5
+    assert states[MULTI_RECIPIENT]["balance"] == 0.0
+    assert bc.address_history("bob")[0][0]["id"] == payout.id
+    assert bc.is_valid_chain(bc.chain)
+
+    store = ChainStore(str(tmp_path / "chain.db"))
+    store.publish_chain(bc.chain)
+    assert store.account_states(addresses) == states
+    assert [tx["id"] for tx, _ in store.address_history("alice")] == [payout.id]
+
+    # Reorg: output yang terhapus ikut keluar dari index
+    store.publish_chain(bc.chain[:2])
+    assert store.get_balance("bob") == 0.0 and store.address_history("bob") == []
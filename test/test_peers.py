@@ -0,0 +1,46 @@
+# test_peers.py
+
+from src.peers import PeerManager
+
+
+def test_failing_peer_backs_off_then_is_removed():
+    pm = PeerManager(self_url="http://node8000:8000")
+    pm.add("node8001:8001")
+    pm.add("node8002:8002", bootstrap=True)
+    assert not pm.add("http://node8000:8000")  # diri sendiri diabaikan
+
+    pm.record_failure("http://node8001:8001")
+    assert "http://node8001:8001" not in pm.healthy()
+    for _ in range(4):
+        pm.record_failure("http://node8001:8001")
+    assert "http://node8001:8001" not in pm.urls()
+
+    # Peer bootstrap hanya di-backoff, tidak dihapus
+    for _ in range(10):
+        pm.record_failure("http://node8002:8002")
+    assert pm.urls() == ["http://node8002:8002"]
+
+def test_peers_persist_across_restart(tmp_path):
+    path = str(tmp_path / "peers.json")
+    pm = PeerManager(store_path=path)
+    pm.add("node8001:8001")
+    pm.add("node8002:8002")
+    pm.record_success("http://node8002:8002", latency=0.01)
+    pm.record_failure("http://node8001:8001")
+    pm.save()
+
+    reloaded = PeerManager(store_path=path)
+    assert set(reloaded.urls()) == {"http://node8001:8001", "http://node8002:8002"}
+    # Peer dengan skor tertinggi didahulukan dan backoff lama di-reset
+    assert reloaded.healthy()[0] == "http://node8002:8002"
+    assert len(reloaded.healthy()) == 2
+
+def test_app_cancels_peer_maintenance_on_shutdown(monkeypatch):
+    from fastapi.testclient import TestClient
+    import src.app as node_app
+    from src.node import Node
+    monkeypatch.setattr(node_app, "NODE", Node(port=5000, difficulty=1))
+    with TestClient(node_app.app):
+        (task,) = node_app.BACKGROUND_TASKS
+        assert not task.done()
+    assert task.cancelled() and node_app.BACKGROUND_TASKS == []
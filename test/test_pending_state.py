@@ -0,0 +1,86 @@
+# test_pending_state.py
+
+from src.blockchain import Blockchain
+from src.template import BlockTemplateBuilder
+from src.tx import Mempool, Transaction
+from src.wallet import Wallet
+from conftest import extend_chain
+
+
+def signed(wallet: Wallet, recipient: str, amount: float, fee: float = 0.0) -> Transaction:
+    tx = Transaction(sender=wallet.public_key_hex, recipient=recipient, amount=amount, fee=fee)
+    tx.sign(wallet)
+    return tx
+
+
+def funded_chain():
+    alice, bob = Wallet(), Wallet()
+    bc = Blockchain(difficulty=1)
+    bc.create_block(nonce=0, previous_hash=bc.last_block.hash, transactions=[], miner_address=alice.public_key_hex)
+    return bc, alice, bob
+
+
+def test_pending_credit_is_spendable_and_eviction_cascades():
+    bc, alice, bob = funded_chain()
+    mp = Mempool()
+    parent = signed(alice, bob.public_key_hex, 30.0, fee=1.0)
+    child = signed(bob, "carol", 20.0)
+    assert mp.add_transaction(parent, blockchain=bc)
+    assert mp.add_transaction(child, blockchain=bc)
+    # Sisa kredit pending bob hanya 10
+    assert not mp.add_transaction(signed(bob, "carol", 15.0), blockchain=bc)
+    assert mp.pending.parents[child.id] == {parent.id}
+    assert mp.pending.get(bob.public_key_hex) == (30.0, 20.0)
+    assert mp.pending.available(alice.public_key_hex, 50.0) == 19.0
+
+    # Parent kedaluwarsa: turunannya ikut keluar dan overlay kembali kosong
+    assert set(mp.remove_transactions([parent.id], confirmed=False)) == {parent.id, child.id}
+    assert len(mp.pending) == 0 and mp.pending_deltas() == {}
+    # Overlay tetap konsisten untuk output ganda ke alamat yang sama
+    repeated = Transaction(sender="x", outputs=[{"recipient": "y", "amount": 1.0}, {"recipient": "y", "amount": 2.0}])
+    mp.pending.add(repeated)
+    mp.pending.remove(repeated.id)
+    assert len(mp.pending) == 0 and mp.pending.snapshot() == {}
+
+    # Parent masuk block: dependensi selesai, child tetap pending
+    mp.add_transaction(parent, blockchain=bc)
+    mp.add_transaction(child, blockchain=bc)
+    mp.remove_transactions([parent.id])
+    assert mp.contains(child.id) and child.id not in mp.pending.parents
+    assert mp.pending_deltas() == {bob.public_key_hex: (0.0, 20.0), "carol": (20.0, 0.0)}
+
+
+def test_template_orders_dependents_and_reorg_returns_transactions():
+    bc, alice, bob = funded_chain()
+    mp = Mempool()
+    parent = signed(alice, bob.public_key_hex, 30.0)
+    child = signed(bob, "carol", 20.0, fee=5.0)
+    mp.add_transaction(parent, blockchain=bc)
+    mp.add_transaction(child, blockchain=bc)
+    # Fee rate child lebih tinggi (child-pays-for-parent): child menunggu parent, lalu ikut di block yang sama
+    template = BlockTemplateBuilder(bc, mp)
+    assert [t.id for t in template.get_template()] == [parent.id, child.id]
+    # Parent tidak muat: child tidak boleh masuk tanpa parent
+    small = BlockTemplateBuilder(bc, mp, max_size=child.size())
+    assert small.get_template() == []
+
+    old_chain = list(bc.chain)
+    bc.create_block(nonce=0, previous_hash=bc.last_block.hash, transactions=[parent], miner_address="miner")
+    mp.remove_transactions([parent.id])
+    assert child.id not in mp.pending.parents
+    assert [t.id for t in template.get_template()] == [child.id]
+
+    # Chain kembali ke fork lain tanpa block itu: parent kembali ke mempool dan child bergantung lagi padanya
+    mined = bc.chain[len(old_chain):]
+    bc.chain = old_chain
+    extend_chain(bc, 2)
+    assert mp.reorg(mined, bc.chain[len(old_chain):], bc) == 1
+    assert mp.contains(parent.id) and mp.pending.get(bob.public_key_hex) == (30.0, 25.0)
+    assert mp.pending.parents[child.id] == {parent.id}
+    assert [t.id for t in template.get_template()] == [parent.id, child.id]
+
+    # Transaksi yang kembali tetapi dananya sudah terpakai di chain baru tidak dikembalikan
+    mp.remove_transactions([parent.id], confirmed=False)
+    bc.create_block(nonce=0, previous_hash=bc.last_block.hash, transactions=[signed(alice, "dave", 45.0)],
+                    miner_address="miner")
+    assert mp.reorg(mined, [], bc) == 0 and not mp.contains(parent.id)
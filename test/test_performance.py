@@ -0,0 +1,179 @@
+# test_performance.py
+"""
+Regresi performa. Ukuran diatur lewat env:
+
+    PERF_BLOCKS=10000 PERF_TXS=10000 PERF_GROWTH=4 python -m pytest -q test/test_performance.py
+
+Setiap operasi diukur pada ukuran n/PERF_GROWTH dan n. Yang dibatasi adalah
+rasio waktunya sesuai kompleksitas yang diharapkan (bukan waktu absolut),
+jadi regresi kuadratik tetap gagal walau mesin pengujinya lambat. Setiap
+pengukuran dibuat puluhan milidetik agar rasio tidak didominasi noise.
+"""
+import gc
+import os
+import time
+
+import pytest
+
+from src.blockchain import Blockchain, genesis_proof, search_nonce
+from src.chain_io import iter_ndjson
+from src.httpcache import ResponseCache
+from src.tx import Mempool, Transaction
+from src.utils import hash_meets_target
+
+PERF_BLOCKS = int(os.environ.get("PERF_BLOCKS", "10000"))
+PERF_TXS = int(os.environ.get("PERF_TXS", "10000"))
+GROWTH = int(os.environ.get("PERF_GROWTH", "4"))
+# Rasio waktu maksimum saat ukuran naik GROWTH kali
+FLAT = 2.0                   # O(1) per operasi
+LINEAR = GROWTH ** 1.5       # O(n): titik tengah (skala log) antara GROWTH dan O(n^2) = GROWTH ** 2
+
+
+def best_of(fn, repeat: int = 3) -> float:
+    """Waktu tercepat dari beberapa percobaan (GC dimatikan agar jeda GC tidak ikut terukur)."""
+    times = []
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return min(times)
+
+
+def best_of_fresh(setup, repeat: int = 3) -> float:
+    """Seperti best_of, tetapi `setup()` (tidak diukur) membuat fungsi baru tiap percobaan agar cache tidak terbawa."""
+    times = []
+    for _ in range(repeat):
+        fn = setup()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return min(times)
+
+
+def build_timed_chain(blocks: int) -> Blockchain:
+    """Chain coinbase-only dengan jarak timestamp tepat TARGET_BLOCK_TIME (target tidak berubah)."""
+    bc = Blockchain(difficulty=1)
+    start = time.time() - blocks * bc.target_block_time
+    for i in range(blocks):
+        block = bc.prepare_block([bc.create_coinbase(f"miner-{i % 50}")], timestamp=start + i * bc.target_block_time)
+        block.nonce, block.hash = bc._search_nonce(block)
+        bc.chain.append(block)
+    return bc
+
+
+def clone(chain) -> Blockchain:
+    """Blockchain baru (cache kosong) di atas block yang sama."""
+    bc = Blockchain(difficulty=1)
+    bc.chain = list(chain)
+    return bc
+
+
+def make_txs(count: int, prefix: str):
+    return [Transaction(sender=f"{prefix}{i}", recipient="bob", amount=0.0, signature="sig") for i in range(count)]
+
+
+@pytest.fixture(scope="module")
+def chains():
+    large = build_timed_chain(PERF_BLOCKS)
+    return large.chain[:PERF_BLOCKS // GROWTH + 1], large.chain
+
+
+def test_genesis_uses_constant_instead_of_pow():
+    def create():
+        genesis_proof.cache_clear()
+        Blockchain(difficulty=4)
+    # PoW difficulty 4 butuh ~137 ribu hash; konstanta genesis cukup diverifikasi dengan satu hash,
+    # jadi harus lebih murah daripada 1000 hash (dibandingkan di mesin yang sama, bukan waktu absolut)
+    header = Blockchain(difficulty=1).build_candidate([], "miner").header_data()
+    assert best_of(create, 5) < best_of(lambda: search_nonce(header, 0, 0, 1000), 5)
+
+
+def test_proof_of_work_at_fixed_difficulty_scales_with_nonces():
+    bc = Blockchain(difficulty=1)
+    nonce, block_hash = bc.proof_of_work([], bc.last_block.hash)
+    assert hash_meets_target(block_hash, bc.next_target())
+
+    header = bc.build_candidate([], "miner").header_data()
+    per_chunk = 5000
+    small = best_of(lambda: search_nonce(header, 0, 0, per_chunk))
+    large = best_of(lambda: search_nonce(header, 0, 0, per_chunk * GROWTH))
+    assert large / small < LINEAR
+
+
+def test_mempool_admission_flat_in_mempool_and_chain_size(chains):
+    short, long = chains
+    batch = PERF_TXS // GROWTH
+
+    def admit(chain, count):
+        def setup():
+            bc, mp = clone(chain), Mempool()
+            bc.get_balance("warmup")  # state chain dihitung sekali per tip, bukan per transaksi
+            txs = make_txs(count, "s")
+            return lambda: [mp.add_transaction(tx, blockchain=bc, verified=True) for tx in txs]
+        return setup
+
+    # Chain GROWTH kali lebih panjang: waktu admission per transaksi tetap
+    assert best_of_fresh(admit(long, batch)) / best_of_fresh(admit(short, batch)) < FLAT
+
+    # Batch terakhir dari PERF_TXS transaksi tidak lebih lambat dari batch pertama
+    bc, mp = clone(long), Mempool()
+    bc.get_balance("warmup")
+    txs = make_txs(PERF_TXS, "t")
+    first = best_of(lambda: [mp.add_transaction(tx, blockchain=bc, verified=True) for tx in txs[:batch]], 1)
+    for tx in txs[batch:-batch]:
+        mp.add_transaction(tx, blockchain=bc, verified=True)
+    last = best_of(lambda: [mp.add_transaction(tx, blockchain=bc, verified=True) for tx in txs[-batch:]], 1)
+    assert len(mp.all_transactions()) == PERF_TXS
+    assert last / first < FLAT
+
+
+def test_get_balance_scan_linear_then_flat_per_query(chains):
+    short, long = chains
+    # Query pertama: satu scan chain, linear terhadap panjang chain (10 scan per pengukuran)
+    scans = lambda chain: lambda: [clone(chain).get_balance("miner-1") for _ in range(10)]
+    assert best_of(scans(long), 5) / best_of(scans(short), 5) < LINEAR
+
+    def queries(chain):
+        def setup():
+            bc = clone(chain)
+            bc.get_balance("miner-1")
+            addresses = [f"addr-{i}" for i in range(10_000)] + [f"miner-{i}" for i in range(50)]
+            return lambda: [bc.get_balance(a) for a in addresses]
+        return setup
+    assert best_of_fresh(queries(long)) / best_of_fresh(queries(short)) < FLAT
+
+    bc = clone(long)
+    mined = sum(1 for b in long[1:] if b.transactions[0].recipient == "miner-1")
+    assert bc.get_balance("miner-1") == mined * 50.0
+
+
+def test_resolve_conflicts_linear_in_chain_length(chains):
+    short, long = chains
+    short_data, long_data = [b.to_dict() for b in short], [b.to_dict() for b in long]
+    resolve = lambda data: Blockchain(difficulty=1).resolve_conflicts([data])
+    assert resolve(long_data)
+    assert best_of(lambda: resolve(long_data), 2) / best_of(lambda: resolve(short_data), 2) < LINEAR
+
+
+def test_blocks_serialization_linear_and_cached(chains):
+    short, long = chains
+    build = lambda chain: lambda: {"chain": [b.to_dict() for b in chain], "length": len(chain)}
+
+    def serialize(chain):
+        return lambda: ResponseCache().get(("blocks",), chain[-1].hash, build(chain))
+    assert best_of(serialize(long)) / best_of(serialize(short)) < LINEAR
+    ndjson = lambda chain: lambda: b"".join(iter_ndjson(chain))
+    assert best_of(ndjson(long)) / best_of(ndjson(short)) < LINEAR
+
+    # Poll berikutnya pada tip yang sama tidak menyerialisasi ulang
+    cache = ResponseCache()
+    cache.get(("blocks",), long[-1].hash, build(long))
+    assert best_of(lambda: cache.get(("blocks",), long[-1].hash, build(long))) < best_of(serialize(short)) / 10
@@ -0,0 +1,60 @@
+# test_profiling.py
+
+import threading
+import time
+
+import pytest
+
+from src.profiling import Profiler, SlowOpLog, trace, span, recent_traces, SLOW_OPS
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        sum(range(100))
+
+
+@pytest.fixture
+def slow_ops(monkeypatch):
+    """SLOW_OPS global dipulihkan (ambang & entri) setelah test."""
+    monkeypatch.setattr(SLOW_OPS, "thresholds_ms", dict(SLOW_OPS.thresholds_ms))
+    monkeypatch.setattr(SLOW_OPS, "default_ms", SLOW_OPS.default_ms)
+    monkeypatch.setattr(SLOW_OPS, "entries", SLOW_OPS.entries.copy())
+    return SLOW_OPS
+
+
+def test_trace_records_spans_and_slow_ops(slow_ops):
+    slow_ops.configure({"unit": 10_000, "unit.slow": 0})
+    with trace("unit", kind="test") as t:
+        with span("fast"):
+            pass
+        with span("slow"):
+            busy(0.01)
+    assert [s["name"] for s in t.spans] == ["fast", "slow"]
+    assert recent_traces("unit", limit=1)[0]["id"] == t.id
+    assert slow_ops.entries[-1]["name"] == "unit.slow"
+
+    log = SlowOpLog({"mine": 100}, default_ms=5)
+    assert log.threshold_ms("mine.pow") == 100
+    assert log.threshold_ms("other") == 5
+
+
+def test_sampling_profiler_emits_collapsed_stacks():
+    profiler = Profiler()
+    profiler.start("sampling", interval=0.001)
+    worker = threading.Thread(target=busy, args=(0.1,))
+    worker.start()
+    worker.join()
+    result = profiler.stop()
+    assert result["samples"] > 0
+    assert any("busy (test_profiling.py" in line for line in result["collapsed"].splitlines())
+
+
+def test_cprofile_mode_profiles_span_bodies():
+    profiler = Profiler()
+    profiler.start("cprofile")
+    with profiler.profile_span():
+        busy(0.01)
+    result = profiler.stop()
+    assert result["calls"] > 0
+    assert any(row["function"].startswith("busy") for row in result["top"])
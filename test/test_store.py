@@ -0,0 +1,81 @@
+# test_store.py
+
+import threading
+from src.blockchain import Blockchain
+from src.store import ChainStore, StorePublisher, StoreView
+from src.tx import Mempool
+from conftest import extend_chain
+
+
+class FakeNode:
+    def __init__(self, blockchain=None):
+        self.blockchain = blockchain or Blockchain(difficulty=1)
+        self.mempool = Mempool()
+        self.lock = threading.RLock()
+
+
+def test_reader_sees_appended_blocks_from_writer(tmp_path):
+    path = str(tmp_path / "chain.db")
+    writer = FakeNode()
+    publisher = StorePublisher(ChainStore(path), writer)
+    publisher.load_or_init()
+
+    reader = FakeNode(Blockchain(difficulty=1))
+    view = StoreView(ChainStore(path), reader)
+    assert view.refresh()
+    assert not view.refresh()
+
+    extend_chain(writer.blockchain, 3)
+    publisher.publish()
+    assert view.refresh()
+    assert [b.hash for b in reader.blockchain.chain] == [b.hash for b in writer.blockchain.chain]
+
+
+def test_publish_chain_rewrites_from_fork_point(tmp_path):
+    store = ChainStore(str(tmp_path / "chain.db"))
+    a = Blockchain(difficulty=1)
+    extend_chain(a, 2)
+    assert store.publish_chain(a.chain) == 3
+
+    b = Blockchain(difficulty=1)
+    extend_chain(b, 4)
+    assert store.publish_chain(b.chain) == 4
+    assert store.publish_chain(b.chain) == 0
+    assert [blk.hash for blk in store.load_blocks()] == [blk.hash for blk in b.chain]
+    # Saldo dari block chain lama ikut dibatalkan
+    assert store.get_balance("miner") == b.get_balance("miner")
+
+
+def test_writer_restarts_from_stored_chain(tmp_path):
+    path = str(tmp_path / "chain.db")
+    writer = FakeNode()
+    extend_chain(writer.blockchain, 2)
+    StorePublisher(ChainStore(path), writer).publish()
+
+    restarted = FakeNode()
+    assert StorePublisher(ChainStore(path), restarted).load_or_init() == 3
+    assert restarted.blockchain.last_block.hash == writer.blockchain.last_block.hash
+
+
+def test_indexed_queries_match_chain_scan(tmp_path):
+    from test_mempool_journal import make_signed_tx
+    bc = Blockchain(difficulty=1)
+    tx = make_signed_tx(3.0)
+    bc.create_block(nonce=0, previous_hash=bc.last_block.hash, transactions=[tx], miner_address="miner")
+    extend_chain(bc, 1)
+    expected = {a: bc.get_balance(a) for a in (tx.sender, "bob", "miner")}
+    history = bc.address_history("miner")
+
+    store = ChainStore(str(tmp_path / "chain.db"))
+    store.publish_chain(bc.chain)
+    bc.index = store
+    assert {a: bc.get_balance(a) for a in expected} == expected
+    assert bc.find_transaction(tx.id) == (tx.model_dump(), 2)
+    assert bc.address_history("miner") == history
+
+    # Migrasi store lama: tabel turunan dibangun ulang dari tabel blocks
+    store.conn.execute("DELETE FROM balances")
+    store.conn.execute("DELETE FROM meta WHERE key = 'index_version'")
+    store.conn.commit()
+    reopened = ChainStore(store.path)
+    assert reopened.get_balance("bob") == expected["bob"]
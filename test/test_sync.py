@@ -0,0 +1,66 @@
+# test_sync.py
+
+import copy
+import time
+
+from src.blockchain import Blockchain
+from src.tx import Mempool
+from src.sync import SyncEngine
+from conftest import extend_chain
+
+
+class FakeNode:
+    def __init__(self, blockchain):
+        self.blockchain = blockchain
+        self.mempool = Mempool()
+
+class FakeSyncEngine(SyncEngine):
+    """Peer disimulasikan dari objek Blockchain lokal, tanpa HTTP."""
+    def __init__(self, node, remote, slow=(), broken=(), **kwargs):
+        super().__init__(node, **kwargs)
+        self.remote = remote
+        self.slow = set(slow)
+        self.broken = set(broken)
+        self.served = {}
+
+    def candidate_peers(self):
+        return list(self.remote)
+
+    def penalize(self, peer):
+        pass
+
+    def get_tip(self, peer):
+        bc = self.remote[peer]
+        return bc.height, bc.last_block.hash
+
+    def get_range(self, peer, start, count):
+        if peer in self.slow and start > 1:
+            time.sleep(0.3)
+        if peer in self.broken:
+            raise ConnectionError("peer down")
+        self.served[peer] = self.served.get(peer, 0) + 1
+        return [copy.deepcopy(b) for b in self.remote[peer].get_blocks(start, count)]
+
+def test_parallel_sync_uses_several_peers_and_reassigns():
+    source = Blockchain(difficulty=1)
+    local = copy.deepcopy(source)
+    extend_chain(source, 40)
+
+    peers = {"a": source, "b": source, "slow": source, "down": source}
+    engine = FakeSyncEngine(FakeNode(local), peers, slow=["slow"], broken=["down"],
+                            chunk_size=5, per_peer_inflight=2, chunk_timeout=0.1)
+    result = engine.sync()
+
+    assert result.status == "synced"
+    assert result.added == 40
+    assert local.last_block.hash == source.last_block.hash
+    assert engine.served.get("a") and engine.served.get("b")
+    assert result.reassigned > 0
+
+def test_sync_detects_fork():
+    source = Blockchain(difficulty=1)
+    local = copy.deepcopy(source)
+    extend_chain(source, 3)
+    extend_chain(local, 1)
+    engine = FakeSyncEngine(FakeNode(local), {"a": source})
+    assert engine.sync().status == "fork"
@@ -0,0 +1,63 @@
+# test_template.py
+
+import time
+
+from src.wallet import Wallet
+from src.tx import Transaction, Mempool
+from src.blockchain import Blockchain
+from src.template import BlockTemplateBuilder
+
+
+NOW = time.time()
+
+def signed(wallet: Wallet, amount: float, fee: float, timestamp: float) -> Transaction:
+    tx = Transaction(sender=wallet.public_key_hex, recipient="bob", amount=amount, fee=fee, timestamp=NOW + timestamp)
+    tx.sign(wallet)
+    return tx
+
+def test_template_orders_by_fee_rate_and_keeps_sender_order():
+    bc, mp = Blockchain(difficulty=1), Mempool()
+    alice, carol = Wallet(), Wallet()
+    a1 = signed(alice, 1.0, fee=0.0, timestamp=100)   # fee rendah, tapi membuka a2
+    a2 = signed(alice, 1.0, fee=5.0, timestamp=101)
+    c1 = signed(carol, 1.0, fee=1.0, timestamp=100)
+    for tx in (a2, c1, a1):
+        assert mp.add_transaction(tx)
+
+    builder = BlockTemplateBuilder(bc, mp)
+    ids = [t.id for t in builder.get_template()]
+    assert ids == [c1.id, a1.id, a2.id]
+
+    # Batas ukuran: hanya transaksi dengan fee rate tertinggi yang muat
+    small = BlockTemplateBuilder(bc, mp, max_size=c1.size())
+    assert [t.id for t in small.get_template()] == [c1.id]
+
+def test_incremental_update_and_fees_go_to_miner():
+    bc, mp = Blockchain(difficulty=1), Mempool()
+    builder = BlockTemplateBuilder(bc, mp)
+    assert builder.get_template() == []
+    alice = Wallet()
+    tx = signed(alice, 2.0, fee=0.5, timestamp=100)
+    assert mp.add_transaction(tx)
+    builder.on_new_transaction(tx)
+    assert builder._mempool_version == mp.version
+    assert [t.id for t in builder.get_template()] == [tx.id]
+
+    block = bc.create_block(0, bc.last_block.hash, builder.get_template(), "miner", verified=builder.verified)
+    assert block.transactions[0].amount == 50.5
+    assert bc.get_balance("miner") == 50.5
+    assert bc.get_balance(alice.public_key_hex) == -2.5
+
+def test_verification_cache_is_bound_to_transaction_content():
+    bc, mp = Blockchain(difficulty=1), Mempool()
+    alice = Wallet()
+    tx = signed(alice, 1.0, fee=0.0, timestamp=100)
+    assert mp.add_transaction(tx)
+    builder = BlockTemplateBuilder(bc, mp)
+    builder.get_template()
+    # Salinan dengan ID & signature yang sama tetapi isi berbeda tidak ikut lolos lewat cache
+    forged = Transaction(**{**tx.model_dump(), "recipient": "mallory", "amount": 1000.0})
+    assert forged.id == tx.id and forged.signature == tx.signature
+    assert forged.verification_key() not in builder.verified
+    candidate = bc.build_candidate([forged], "miner")
+    assert not candidate.validate_block(builder.verified)
@@ -0,0 +1,61 @@
+# test_transactions_api.py
+
+import pytest
+from fastapi.testclient import TestClient
+
+import src.app as node_app
+from src.admission import AdmissionController
+from src.node import Node
+from src.template import BlockTemplateBuilder
+from src.tx import Transaction
+from src.wallet import Wallet
+from conftest import make_signed_tx
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Node baru per test (difficulty 1, tanpa journal/store) di balik app FastAPI."""
+    node = Node(port=5000, difficulty=1)
+    monkeypatch.setattr(node_app, "NODE", node)
+    monkeypatch.setattr(node_app, "TEMPLATE", BlockTemplateBuilder(node.blockchain, node.mempool))
+    monkeypatch.setattr(node_app, "ADMISSION", AdmissionController())
+    return TestClient(node_app.app)
+
+
+def test_dummy_mode_reports_rejected_transactions(client, monkeypatch):
+    monkeypatch.setenv("ALLOW_DUMMY_TX", "true")
+    tx = make_signed_tx(1.0)
+    forged = Transaction(**{**tx.model_dump(), "signature": make_signed_tx(1.0).signature})
+    r = client.post("/transactions/new", json=forged.model_dump())
+    assert r.status_code == 200
+    assert r.json() == {"message": "Transaction rejected", "added": False, "tx_id": tx.id}
+    assert node_app.NODE.mempool.all_transactions() == []
+
+    monkeypatch.setenv("ALLOW_DUMMY_TX", "false")
+    assert client.post("/transactions/new", json=forged.model_dump()).status_code == 400
+
+
+def test_new_transaction_checks_funds_and_links_chained_spends(client, monkeypatch):
+    monkeypatch.setenv("ALLOW_DUMMY_TX", "false")
+    alice, bob = Wallet(), Wallet()
+    bc = node_app.NODE.blockchain
+    bc.create_block(nonce=0, previous_hash=bc.last_block.hash, transactions=[], miner_address=alice.public_key_hex)
+
+    def submit(wallet, recipient, amount):
+        tx = Transaction(sender=wallet.public_key_hex, recipient=recipient, amount=amount)
+        tx.sign(wallet)
+        return tx, client.post("/transactions/new", json=tx.model_dump())
+
+    overdraft, r = submit(alice, "carol", bc.get_balance(alice.public_key_hex) + 1)
+    assert r.status_code == 400
+    pay, r = submit(alice, bob.public_key_hex, 10.0)
+    assert r.status_code == 200 and r.json()["added"]
+    # Bob belum punya saldo di chain: hanya bisa membelanjakan kredit pending dari alice
+    child, r = submit(bob, "carol", 4.0)
+    assert r.status_code == 200 and r.json()["added"]
+    assert node_app.NODE.mempool.pending.parents[child.id] == {pay.id}
+    assert submit(bob, "carol", 7.0)[1].status_code == 400
+
+    balances = client.post("/balances", json={"addresses": [bob.public_key_hex]}).json()["balances"]
+    pending = client.get(f"/balance/{bob.public_key_hex}", params={"include_pending": True}).json()
+    assert balances[bob.public_key_hex]["available"] == pending["available"] == 10.0 - child.total_debit